@@ -9,18 +9,34 @@ from time import time
 
 from fastapi import FastAPI, Depends, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
-from fastapi.staticfiles import StaticFiles
 from fastapi_limiter import FastAPILimiter
 from fastapi_limiter.depends import RateLimiter
 
+from redis.asyncio.client import Redis
 from sqlalchemy import select, text
 from sqlalchemy.ext.asyncio import AsyncSession
 import uvicorn
 
 from src.conf.config import settings
-from src.database.connect_db import engine, get_session, redis_db0, pool_redis_db
+from src.database.connect_db import (
+    check_mail_queue_location,
+    engine,
+    get_session,
+    get_redis_db1,
+    redis_db0,
+    pool_redis_db,
+    redis_mail_queue,
+)
+from src.database.models import User
 from src.routes import auth, contacts, users
+from src.services.auth import auth_service
+from src.services.birthday_digest import birthday_digest_scheduler
+from src.services.compression import CompressionMiddleware
+from src.services.contact_events import contact_events_broker
+from src.services.redis_ops import RedisOps, redis_ops
+from src.services.response_cache import get_cache_stats
+from src.services.static_files import ImmutableStaticFiles, PrecompressedStaticFiles
+from src.services.storage import LOCAL_STORAGE_DIR
 
 
 @asynccontextmanager
@@ -42,9 +58,11 @@ async def startup():
     Handles startup events.
 
     """
+    check_mail_queue_location()
     await pool_redis_db.disconnect()
-    await redis_db0.flushall()
+    await redis_db0.flushdb()
     await FastAPILimiter.init(redis_db0)
+    birthday_digest_scheduler.start()
 
 
 async def shutdown():
@@ -52,8 +70,11 @@ async def shutdown():
     Handles shutdown events.
 
     """
+    await birthday_digest_scheduler.stop()
     await pool_redis_db.disconnect()
-    await redis_db0.flushall()
+    await redis_db0.flushdb()
+    await redis_mail_queue.close()
+    await contact_events_broker.close()
     await engine.dispose()
 
 
@@ -65,7 +86,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["ETag", "X-Total-Count", "X-Total-Count-Exact"],
 )
+app.add_middleware(CompressionMiddleware)
 
 
 @app.middleware("http")
@@ -87,6 +110,29 @@ async def add_process_time_header(request: Request, call_next: callable):
     return response
 
 
+@app.middleware("http")
+async def add_redis_ops_headers(request: Request, call_next: callable):
+    """
+    Counts the Redis commands and round trips of a request.
+
+    :param request: The request object.
+    :type request: Request
+    :param call_next: The next request's handler.
+    :type call_next: callable
+    :return: The response.
+    :rtype: starlette.middleware.base._StreamingResponse
+    """
+    ops = RedisOps()
+    token = redis_ops.set(ops)
+    try:
+        response = await call_next(request)
+    finally:
+        redis_ops.reset(token)
+    response.headers["API-Redis-Commands"] = str(ops.commands)
+    response.headers["API-Redis-Round-Trips"] = str(ops.round_trips)
+    return response
+
+
 BASE_API_ROUTE = "/api"
 
 
@@ -165,26 +211,64 @@ async def healthchecker(session: AsyncSession = Depends(get_session)):
     return {"message": "OK"}
 
 
+@app.get(
+    BASE_API_ROUTE + "/cache_stats",
+    dependencies=[
+        Depends(
+            RateLimiter(
+                times=settings.rate_limiter_times,
+                seconds=settings.rate_limiter_seconds,
+            )
+        )
+    ],
+)
+async def cache_stats(
+    user: User = Depends(auth_service.get_current_user),
+    cache: Redis = Depends(get_redis_db1),
+):
+    """
+    Handles a GET-operation to '/api/cache_stats' route and returns the hits and misses of the response cache.
+
+    :param user: The current user.
+    :type user: User
+    :param cache: The Redis client.
+    :type cache: Redis
+    :return: The hits, misses, hit ratio and miss ratio.
+    :rtype: dict
+    """
+    return await get_cache_stats(cache)
+
+
 BASE_DIR = pathlib.Path(__file__).resolve().parent
 STATIC_DIR = BASE_DIR / "static"
 
 
+app.mount(
+    "/static/avatars",
+    ImmutableStaticFiles(directory=LOCAL_STORAGE_DIR, check_dir=False),
+    name="avatars",
+)
+static_files = PrecompressedStaticFiles(directory=STATIC_DIR, exclude=("avatars",))
+
+
 app.mount(
     "/static",
-    StaticFiles(directory=STATIC_DIR),
+    static_files,
     name="static",
 )
 
 
 @app.get("/favicon.ico", include_in_schema=False)
-async def favicon():
+async def favicon(request: Request):
     """
     Handles a GET-operation to get favicon.ico.
 
+    :param request: The http request object.
+    :type request: Request
     :return: The favicon.ico.
-    :rtype: FileResponse
+    :rtype: Response
     """
-    return FileResponse(STATIC_DIR / "images/favicon.ico")
+    return await static_files.get_response("images/favicon.ico", request.scope)
 
 
 @app.get(
@@ -0,0 +1,121 @@
+"""Normalized email and phone
+
+Revision ID: 1ac234a2aa9b
+Revises: 66f987953b0c
+Create Date: 2026-10-19 14:26:39.508172
+
+The columns are backfilled with the same normalization as src.utils.normalize.
+Duplicates which differ only in case or phone formatting must be merged before
+the upgrade, otherwise the unique indexes cannot be built.
+
+The backfill runs online: a trigger normalizes the rows written meanwhile, the
+rows are updated in batches of batch_size by the primary key, each batch in its
+own transaction (alembic -x batch_size=10000 upgrade head), and the indexes are
+built concurrently. users.email_normalized becomes NOT NULL through a validated
+CHECK constraint, so the table is not scanned under an exclusive lock.
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1ac234a2aa9b'
+down_revision: Union[str, None] = '66f987953b0c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+NORMALIZED = {
+    'contacts': {
+        'email_normalized': 'lower(trim({row}email))',
+        'phone_normalized': "NULLIF(regexp_replace(regexp_replace({row}phone, '[^0-9]', '', 'g'), '^00', ''), '')",
+    },
+    'users': {
+        'email_normalized': 'lower(trim({row}email))',
+    },
+}
+
+
+def get_x_argument(name: str, default: int) -> int:
+    return int(context.get_x_argument(as_dictionary=True).get(name, default))
+
+
+def create_normalize_trigger(table: str) -> None:
+    assignments = ' '.join(f'NEW.{column} := {expression.format(row="NEW.")};' for column, expression in NORMALIZED[table].items())
+    op.execute(f'''
+        CREATE FUNCTION {table}_normalize() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            {assignments}
+            RETURN NEW;
+        END $$
+    ''')
+    op.execute(f'CREATE TRIGGER {table}_normalize BEFORE INSERT OR UPDATE ON {table} FOR EACH ROW EXECUTE FUNCTION {table}_normalize()')
+
+
+def create_backfill_procedure(table: str) -> None:
+    assignments = ', '.join(f'{column} = {expression.format(row=f"{table}.")}' for column, expression in NORMALIZED[table].items())
+    op.execute(f'''
+        CREATE PROCEDURE {table}_backfill(batch_size integer) LANGUAGE plpgsql AS $$
+        DECLARE last_id uuid := '00000000-0000-0000-0000-000000000000'; next_id uuid;
+        BEGIN
+            LOOP
+                WITH batch AS (
+                    SELECT id FROM {table} WHERE id > last_id ORDER BY id LIMIT batch_size
+                ), updated AS (
+                    UPDATE {table} SET {assignments} FROM batch WHERE {table}.id = batch.id
+                )
+                SELECT id INTO next_id FROM batch ORDER BY id DESC LIMIT 1;
+                EXIT WHEN next_id IS NULL;
+                last_id := next_id;
+                COMMIT;
+            END LOOP;
+        END $$
+    ''')
+
+
+def drop_backfill(table: str) -> None:
+    op.execute(f'DROP TRIGGER {table}_normalize ON {table}')
+    op.execute(f'DROP FUNCTION {table}_normalize()')
+    op.execute(f'DROP PROCEDURE {table}_backfill(integer)')
+
+
+def upgrade() -> None:
+    op.add_column('contacts', sa.Column('email_normalized', sa.String(length=254), nullable=True))
+    op.add_column('contacts', sa.Column('phone_normalized', sa.String(length=38), nullable=True))
+    op.add_column('users', sa.Column('email_normalized', sa.String(length=254), nullable=True))
+    for table in NORMALIZED:
+        create_normalize_trigger(table)
+        create_backfill_procedure(table)
+    batch_size = get_x_argument('batch_size', 10000)
+    with op.get_context().autocommit_block():
+        for table in NORMALIZED:
+            op.execute(f'CALL {table}_backfill({batch_size})')
+        op.create_index('uix_contacts_user_id_email_normalized', 'contacts', ['user_id', 'email_normalized'], unique=True, postgresql_concurrently=True)
+        op.create_index('uix_contacts_user_id_phone_normalized', 'contacts', ['user_id', 'phone_normalized'], unique=True, postgresql_concurrently=True)
+        op.create_index('ix_users_email_normalized', 'users', ['email_normalized'], unique=True, postgresql_concurrently=True)
+        op.drop_index('ix_users_email_lower', table_name='users', postgresql_concurrently=True)
+    op.execute('ALTER TABLE users ADD CONSTRAINT ck_users_email_normalized_not_null CHECK (email_normalized IS NOT NULL) NOT VALID')
+    with op.get_context().autocommit_block():
+        op.execute('ALTER TABLE users VALIDATE CONSTRAINT ck_users_email_normalized_not_null')
+    op.alter_column('users', 'email_normalized', existing_type=sa.String(length=254), nullable=False)
+    op.drop_constraint('ck_users_email_normalized_not_null', 'users', type_='check')
+    for table in NORMALIZED:
+        drop_backfill(table)
+    op.drop_constraint('uix_email', 'contacts', type_='unique')
+    op.drop_constraint('uix_phone', 'contacts', type_='unique')
+
+
+def downgrade() -> None:
+    op.create_unique_constraint('uix_phone', 'contacts', ['user_id', 'phone'])
+    op.create_unique_constraint('uix_email', 'contacts', ['user_id', 'email'])
+    with op.get_context().autocommit_block():
+        op.create_index('ix_users_email_lower', 'users', [sa.text('lower(email)')], unique=False, postgresql_concurrently=True)
+        op.drop_index('ix_users_email_normalized', table_name='users', postgresql_concurrently=True)
+        op.drop_index('uix_contacts_user_id_phone_normalized', table_name='contacts', postgresql_concurrently=True)
+        op.drop_index('uix_contacts_user_id_email_normalized', table_name='contacts', postgresql_concurrently=True)
+    op.drop_column('users', 'email_normalized')
+    op.drop_column('contacts', 'phone_normalized')
+    op.drop_column('contacts', 'email_normalized')
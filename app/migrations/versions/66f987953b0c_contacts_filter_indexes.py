@@ -0,0 +1,36 @@
+"""Contacts filter indexes
+
+Revision ID: 66f987953b0c
+Revises: 8e41d0c6f3a2
+Create Date: 2026-10-19 13:41:07.284516
+
+The indexes are created with CREATE INDEX CONCURRENTLY, which cannot run inside a
+transaction, so each one runs in an autocommit block and the tables stay writable.
+If a build fails, PostgreSQL leaves an INVALID index: drop it and run the upgrade again.
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '66f987953b0c'
+down_revision: Union[str, None] = '8e41d0c6f3a2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index('ix_contacts_user_id_last_name_first_name', 'contacts', ['user_id', 'last_name', 'first_name'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_contacts_user_id_created_at', 'contacts', ['user_id', 'created_at'], unique=False, postgresql_concurrently=True)
+        op.create_index('ix_users_email_lower', 'users', [sa.text('lower(email)')], unique=False, postgresql_concurrently=True)
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_users_email_lower', table_name='users', postgresql_concurrently=True)
+        op.drop_index('ix_contacts_user_id_created_at', table_name='contacts', postgresql_concurrently=True)
+        op.drop_index('ix_contacts_user_id_last_name_first_name', table_name='contacts', postgresql_concurrently=True)
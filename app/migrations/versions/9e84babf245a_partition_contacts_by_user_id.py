@@ -0,0 +1,145 @@
+"""Partition contacts by user_id
+
+Revision ID: 9e84babf245a
+Revises: 1ac234a2aa9b
+Create Date: 2026-10-19 15:08:12.730954
+
+The contacts are moved online to a table partitioned by HASH (user_id). The number
+of partitions is CONTACTS_PARTITIONS, or the partitions argument:
+alembic -x partitions=32 -x batch_size=10000 upgrade head.
+
+1. The new table is created empty with its partitions, constraints and indexes, and
+   a trigger on the old table mirrors every write into it.
+2. The rows are copied in batches of batch_size by the primary key, each batch in
+   its own transaction, so the writes only wait for the rows of the current batch.
+3. The tables are swapped under a short ACCESS EXCLUSIVE lock (lock_timeout is 5s,
+   run the upgrade again if it expires): nothing is left to copy at this point.
+
+Unique indexes of a partitioned table must include the partition key, so the
+primary key becomes (user_id, id), and the user's contacts can be read by it in the
+order of their IDs; the other indexes already lead on user_id.
+
+"""
+from typing import Sequence, Union
+
+from alembic import context, op
+
+from src.conf.config import settings
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9e84babf245a'
+down_revision: Union[str, None] = '1ac234a2aa9b'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+COLUMNS = ['id', 'first_name', 'last_name', 'email', 'phone', 'email_normalized', 'phone_normalized', 'birthday', 'address', 'created_at', 'updated_at', 'user_id']
+INDEXES = [
+    ('uix_contacts_user_id_email_normalized', ['user_id', 'email_normalized'], True),
+    ('uix_contacts_user_id_phone_normalized', ['user_id', 'phone_normalized'], True),
+    ('ix_contacts_user_id_updated_at_id', ['user_id', 'updated_at', 'id'], False),
+    ('ix_contacts_user_id_last_name_first_name', ['user_id', 'last_name', 'first_name'], False),
+    ('ix_contacts_user_id_created_at', ['user_id', 'created_at'], False),
+]
+
+
+def get_x_argument(name: str, default: int) -> int:
+    return int(context.get_x_argument(as_dictionary=True).get(name, default))
+
+
+def create_table(table: str, primary_key: Sequence[str], partitions: int | None) -> None:
+    if partitions is None:
+        op.execute(f'CREATE TABLE {table} (LIKE contacts INCLUDING DEFAULTS)')
+    else:
+        op.execute(f'CREATE TABLE {table} (LIKE contacts INCLUDING DEFAULTS) PARTITION BY HASH (user_id)')
+        for remainder in range(partitions):
+            op.execute(
+                f'CREATE TABLE contacts_p{remainder} PARTITION OF {table} '
+                f'FOR VALUES WITH (MODULUS {partitions}, REMAINDER {remainder})'
+            )
+    op.create_primary_key(f'{table}_pkey', table, primary_key)
+    op.create_foreign_key(f'{table}_user_id_fkey', table, 'users', ['user_id'], ['id'], onupdate='CASCADE')
+    for name, columns, unique in INDEXES:
+        op.create_index(f'{name}_{table}', table, columns, unique=unique)
+
+
+def create_mirror_trigger(table: str, primary_key: Sequence[str]) -> None:
+    columns = ', '.join(COLUMNS)
+    updates = ', '.join(f'{column} = EXCLUDED.{column}' for column in COLUMNS if column not in primary_key)
+    keys = ' AND '.join(f'{column} = OLD.{column}' for column in primary_key)
+    op.execute(f'''
+        CREATE FUNCTION {table}_mirror() RETURNS trigger LANGUAGE plpgsql AS $$
+        BEGIN
+            IF TG_OP = 'DELETE' THEN
+                DELETE FROM {table} WHERE {keys};
+            ELSE
+                INSERT INTO {table} ({columns}) SELECT {columns} FROM (SELECT NEW.*) AS new_row
+                ON CONFLICT ({', '.join(primary_key)}) DO UPDATE SET {updates};
+            END IF;
+            RETURN NULL;
+        END $$
+    ''')
+    op.execute(
+        f'CREATE TRIGGER {table}_mirror AFTER INSERT OR UPDATE OR DELETE ON contacts '
+        f'FOR EACH ROW EXECUTE FUNCTION {table}_mirror()'
+    )
+
+
+def copy_rows(table: str, primary_key: Sequence[str], source_key: Sequence[str], batch_size: int) -> None:
+    columns = ', '.join(COLUMNS)
+    last = [f'last_{column}' for column in source_key]
+    following = [f'next_{column}' for column in source_key]
+    declarations = ''.join(f"{name} uuid := '00000000-0000-0000-0000-000000000000'; {next_name} uuid; " for name, next_name in zip(last, following))
+    op.execute(f'''
+        CREATE PROCEDURE {table}_copy(batch_size integer) LANGUAGE plpgsql AS $$
+        DECLARE {declarations}
+        BEGIN
+            LOOP
+                WITH batch AS (
+                    SELECT {columns} FROM contacts WHERE ({', '.join(source_key)}) > ({', '.join(last)})
+                    ORDER BY {', '.join(source_key)} LIMIT batch_size FOR SHARE
+                ), copied AS (
+                    INSERT INTO {table} ({columns}) SELECT {columns} FROM batch
+                    ON CONFLICT ({', '.join(primary_key)}) DO NOTHING
+                )
+                SELECT {', '.join(source_key)} INTO {', '.join(following)} FROM batch
+                ORDER BY {', '.join(f'{column} DESC' for column in source_key)} LIMIT 1;
+                EXIT WHEN {following[-1]} IS NULL;
+                {' '.join(f'{name} := {next_name};' for name, next_name in zip(last, following))}
+                COMMIT;
+            END LOOP;
+        END $$
+    ''')
+    with op.get_context().autocommit_block():
+        op.execute(f'CALL {table}_copy({batch_size})')
+
+
+def swap_tables(table: str) -> None:
+    op.execute("SET LOCAL lock_timeout = '5s'")
+    op.execute('LOCK TABLE contacts IN ACCESS EXCLUSIVE MODE')
+    op.execute('DROP TABLE contacts')
+    op.execute(f'DROP FUNCTION {table}_mirror()')
+    op.execute(f'DROP PROCEDURE {table}_copy(integer)')
+    op.rename_table(table, 'contacts')
+    op.execute(f'ALTER TABLE contacts RENAME CONSTRAINT {table}_pkey TO contacts_pkey')
+    op.execute(f'ALTER TABLE contacts RENAME CONSTRAINT {table}_user_id_fkey TO contacts_user_id_fkey')
+    for name, columns, unique in INDEXES:
+        op.execute(f'ALTER INDEX {name}_{table} RENAME TO {name}')
+
+
+def move_contacts(table: str, primary_key: Sequence[str], source_key: Sequence[str], partitions: int | None) -> None:
+    create_table(table, primary_key, partitions)
+    create_mirror_trigger(table, primary_key)
+    copy_rows(table, primary_key, source_key, get_x_argument('batch_size', 10000))
+    swap_tables(table)
+    with op.get_context().autocommit_block():
+        op.execute('ANALYZE contacts')
+
+
+def upgrade() -> None:
+    move_contacts('contacts_partitioned', ['user_id', 'id'], ['id'], get_x_argument('partitions', settings.contacts_partitions))
+
+
+def downgrade() -> None:
+    move_contacts('contacts_plain', ['id'], ['user_id', 'id'], None)
@@ -19,8 +19,14 @@ class Settings(BaseSettings):
     algorithm: str
     sqlalchemy_database_url_sync: str
     sqlalchemy_database_url_async: str
+    sqlalchemy_database_url_replica: str | None = None
+    replica_max_lag: float = 1
+    replica_check_interval: float = 1
+    read_your_writes_seconds: int = 5
     redis_url: str
     redis_expire: int
+    cache_early_expiration_beta: float = 1
+    cache_lock_timeout: float = 5
     rate_limiter_times: int
     rate_limiter_seconds: int
     mail_server: str
@@ -29,9 +35,33 @@ class Settings(BaseSettings):
     mail_password: str
     mail_from: str
     mail_from_name: str
+    mail_queue_redis_url: str | None = None
+    mail_queue_redis_db: int = 2
+    mail_queue_batch_size: int = 50
+    mail_queue_connections: int = 2
+    mail_queue_max_attempts: int = 5
+    mail_queue_backoff_seconds: float = 5
     cloudinary_cloud_name: str
     cloudinary_api_key: str
     cloudinary_api_secret: str
+    avatar_storage: str = "cloudinary"
+    avatar_max_size: int = 10 * 1024 * 1024
+    compression_minimum_size: int = 1024
+    compression_thread_size: int = 64 * 1024
+    compression_gzip_level: int = 6
+    compression_brotli_quality: int = 4
+    response_cache_expire: int = 300
+    static_files_max_age: int = 300
+    contacts_batch_max_size: int = 100
+    contacts_stats_sample_size: int = 10000
+    contacts_exact_count_max: int = 10000
+    contacts_partitions: int = 16
+    contact_changes_lag: float = 5
+    contact_events_max_streams: int = 1000
+    contact_events_heartbeat: float = 15
+    contact_events_maxlen: int = 1000
+    birthday_digest_interval: float = 300
+    birthday_digest_batch_size: int = 500
     test: bool
 
 
@@ -3,9 +3,15 @@ Module with declaring of connections to PostgreSQL and Redis
 """
 
 
-from fastapi import HTTPException, status
+import asyncio
+import time
+from typing import Tuple
+
+from fastapi import Depends, HTTPException, status
 import redis.asyncio as redis
-from sqlalchemy.exc import SQLAlchemyError
+from redis.asyncio.client import Redis
+from sqlalchemy import text
+from sqlalchemy.exc import InterfaceError, OperationalError, SQLAlchemyError
 from sqlalchemy.ext.asyncio import (
     create_async_engine,
     AsyncSession,
@@ -14,6 +20,7 @@ from sqlalchemy.ext.asyncio import (
 )
 
 from src.conf.config import settings
+from src.services.redis_ops import InstrumentedRedis
 
 
 engine: AsyncEngine = create_async_engine(
@@ -40,17 +47,280 @@ async def get_session():
         await session.close()
 
 
-redis_db0 = redis.from_url(
+REPLICA_LAG_SQL = text(
+    "SELECT CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0 "
+    "ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+REPLICA_ERRORS = (SQLAlchemyError, OSError, TimeoutError, asyncio.TimeoutError)
+
+
+class ReplicaMonitor:
+    """
+    The state of a read replica, which is available while it answers and lags behind the primary by no more than the maximum lag.
+    """
+
+    def __init__(
+        self, engine: AsyncEngine, max_lag: float, check_interval: float
+    ) -> None:
+        """
+        Initializes the monitor of a read replica.
+
+        :param engine: The engine of the replica.
+        :type engine: AsyncEngine
+        :param max_lag: The maximum lag of the replica in seconds.
+        :type max_lag: float
+        :param check_interval: The interval between checks of the replica in seconds.
+        :type check_interval: float
+        :return: None.
+        :rtype: None
+        """
+        self.engine = engine
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.checked_at = float("-inf")
+        self.available = False
+
+    async def is_available(self) -> bool:
+        """
+        Checks whether the replica is available, querying its lag at most once per check interval.
+
+        :return: Whether the replica is available.
+        :rtype: bool
+        """
+        if time.monotonic() - self.checked_at >= self.check_interval:
+            self.checked_at = time.monotonic()
+            try:
+                async with self.engine.connect() as conn:
+                    lag = await conn.scalar(REPLICA_LAG_SQL)
+            except REPLICA_ERRORS:
+                self.available = False
+            else:
+                self.available = lag is not None and lag <= self.max_lag
+        return self.available
+
+    def mark_unavailable(self) -> None:
+        """
+        Marks the replica as unavailable until the next check after a failed connection or query.
+
+        :return: None.
+        :rtype: None
+        """
+        self.available = False
+        self.checked_at = time.monotonic()
+
+
+if settings.sqlalchemy_database_url_replica:
+    replica_engine: AsyncEngine | None = create_async_engine(
+        settings.sqlalchemy_database_url_replica,
+        echo=False,
+    )
+    AsyncReplicaDBSession = async_sessionmaker(
+        replica_engine, autoflush=False, expire_on_commit=False, class_=AsyncSession
+    )
+    replica_monitor: ReplicaMonitor | None = ReplicaMonitor(
+        replica_engine, settings.replica_max_lag, settings.replica_check_interval
+    )
+else:
+    replica_engine = None
+    AsyncReplicaDBSession = None
+    replica_monitor = None
+
+
+def get_read_your_writes_key(email: str) -> str:
+    """
+    Gets the key of the marker of the recent writes of a specific user, whose reads go to the primary while it exists.
+
+    :param email: The email of the user.
+    :type email: str
+    :return: The key of the marker.
+    :rtype: str
+    """
+    return f"read_your_writes: {email}"
+
+
+async def open_replica_session(email: str, cache: Redis) -> AsyncSession | None:
+    """
+    Opens a session of the read replica for the reads of a specific user.
+
+    :param email: The email of the user.
+    :type email: str
+    :param cache: The Redis client.
+    :type cache: Redis
+    :return: The session with a connection to the replica, or None if there is no replica, it lags or fails, or the user has written recently and must read from the primary.
+    :rtype: AsyncSession | None
+    """
+    if replica_monitor is None or not await replica_monitor.is_available():
+        return None
+    if await cache.exists(get_read_your_writes_key(email)):
+        return None
+    session = AsyncReplicaDBSession()
+    try:
+        await session.connection()
+    except REPLICA_ERRORS:
+        await session.close()
+        replica_monitor.mark_unavailable()
+        return None
+    return session
+
+
+class ReplicaSession:
+    """
+    A session for reads which queries the read replica, and on a failure of the replica retries the query and runs all the following ones on the primary.
+    """
+
+    def __init__(self, replica: AsyncSession, primary: AsyncSession) -> None:
+        """
+        Initializes the session for reads.
+
+        :param replica: The session of the read replica.
+        :type replica: AsyncSession
+        :param primary: The session of the primary.
+        :type primary: AsyncSession
+        :return: None.
+        :rtype: None
+        """
+        self.replica: AsyncSession | None = replica
+        self.primary = primary
+
+    @property
+    def current(self) -> AsyncSession:
+        """
+        Gets the session which runs the queries: of the replica until it fails, then of the primary.
+
+        :return: The session.
+        :rtype: AsyncSession
+        """
+        return self.primary if self.replica is None else self.replica
+
+    async def run(self, method: str, *args, **kwargs):
+        """
+        Runs a query method of the session on the replica, and once more on the primary if the replica fails to answer.
+
+        :param method: The name of the method of AsyncSession.
+        :type method: str
+        :param args: The positional arguments of the method.
+        :param kwargs: The keyword arguments of the method.
+        :return: The result of the method.
+        """
+        if self.replica is not None:
+            try:
+                return await getattr(self.replica, method)(*args, **kwargs)
+            except (InterfaceError, OperationalError):
+                await self.replica.close()
+                self.replica = None
+                replica_monitor.mark_unavailable()
+        return await getattr(self.primary, method)(*args, **kwargs)
+
+    async def execute(self, *args, **kwargs):
+        """
+        Runs AsyncSession.execute on the replica, or on the primary if the replica fails.
+
+        :return: The result of AsyncSession.execute.
+        """
+        return await self.run("execute", *args, **kwargs)
+
+    async def scalar(self, *args, **kwargs):
+        """
+        Runs AsyncSession.scalar on the replica, or on the primary if the replica fails.
+
+        :return: The result of AsyncSession.scalar.
+        """
+        return await self.run("scalar", *args, **kwargs)
+
+    async def scalars(self, *args, **kwargs):
+        """
+        Runs AsyncSession.scalars on the replica, or on the primary if the replica fails.
+
+        :return: The result of AsyncSession.scalars.
+        """
+        return await self.run("scalars", *args, **kwargs)
+
+    async def get(self, *args, **kwargs):
+        """
+        Runs AsyncSession.get on the replica, or on the primary if the replica fails.
+
+        :return: The result of AsyncSession.get.
+        """
+        return await self.run("get", *args, **kwargs)
+
+    async def close(self) -> None:
+        """
+        Closes the session of the replica, the session of the primary is closed by its own dependency.
+
+        :return: None.
+        :rtype: None
+        """
+        if self.replica is not None:
+            await self.replica.close()
+
+    def __getattr__(self, name: str):
+        """
+        Gets the other attributes of AsyncSession from the current session.
+
+        :param name: The name of the attribute.
+        :type name: str
+        :return: The attribute of the current session.
+        """
+        return getattr(self.current, name)
+
+
+redis_db0 = InstrumentedRedis.from_url(
     settings.redis_url,
     db=0,
     encoding="utf-8",
     decode_responses=True,
 )
 pool_redis_db = redis.ConnectionPool.from_url(settings.redis_url)
+redis_mail_queue = redis.from_url(
+    settings.mail_queue_redis_url or settings.redis_url,
+    db=settings.mail_queue_redis_db,
+    encoding="utf-8",
+    decode_responses=True,
+)
+
+
+def get_redis_location(pool: redis.ConnectionPool) -> Tuple:
+    """
+    Gets the server and the database of a Redis connection pool.
+
+    :param pool: The connection pool.
+    :type pool: redis.ConnectionPool
+    :return: The host, port, socket path and database number.
+    :rtype: Tuple
+    """
+    kwargs = pool.connection_kwargs
+    return (
+        kwargs.get("host"),
+        kwargs.get("port"),
+        kwargs.get("path"),
+        kwargs.get("db", 0),
+    )
+
+
+def check_mail_queue_location() -> None:
+    """
+    Checks that the email queue is not stored in a Redis database of the cache, which is flushed on startup and shutdown.
+
+    A database number in the path of REDIS_URL takes precedence over MAIL_QUEUE_REDIS_DB, so the queue may end up there.
+
+    :return: None.
+    :rtype: None
+    :raises RuntimeError: If the email queue shares a database with the cache.
+    """
+    location = get_redis_location(redis_mail_queue.connection_pool)
+    if location in (
+        get_redis_location(redis_db0.connection_pool),
+        get_redis_location(pool_redis_db),
+    ):
+        raise RuntimeError(
+            "The email queue shares a Redis database with the cache, "
+            "set MAIL_QUEUE_REDIS_URL or MAIL_QUEUE_REDIS_DB"
+        )
 
 
 async def get_redis_db1():
-    client = redis.Redis(
+    client = InstrumentedRedis(
         connection_pool=pool_redis_db,
         db=1,
         encoding="utf-8",
@@ -65,3 +335,19 @@ async def get_redis_db1():
         )
     finally:
         await client.close()
+
+
+async def get_cache_writes(cache: Redis = Depends(get_redis_db1)):
+    """
+    Gets a pipeline which buffers the writes to Redis of a request, so that they are sent in one round trip by its execute.
+
+    :param cache: The Redis client.
+    :type cache: Redis
+    :return: The pipeline.
+    :rtype: Pipeline
+    """
+    writes = cache.pipeline(transaction=False)
+    try:
+        yield writes
+    finally:
+        await writes.reset()
@@ -0,0 +1,47 @@
+"""
+Module of SQL functions compiled for each dialect
+"""
+
+
+from sqlalchemy import Date
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.sql.base import Executable
+from sqlalchemy.sql.elements import ClauseElement
+from sqlalchemy.sql.functions import FunctionElement
+
+
+class week_start(FunctionElement):
+    """
+    The date of the Monday of the week of a timestamp in UTC, whatever the time zone of the session.
+    """
+
+    type = Date()
+    inherit_cache = True
+
+
+@compiles(week_start)
+def compile_week_start(element, compiler, **kw):
+    return "CAST(date_trunc('week', %s AT TIME ZONE 'UTC') AS DATE)" % (
+        compiler.process(element.clauses, **kw)
+    )
+
+
+@compiles(week_start, "sqlite")
+def compile_week_start_sqlite(element, compiler, **kw):
+    return "date(%s, 'weekday 0', '-6 days')" % compiler.process(element.clauses, **kw)
+
+
+class explain(Executable, ClauseElement):
+    """
+    The estimated plan of a statement in JSON, with the same bound parameters.
+    """
+
+    inherit_cache = False
+
+    def __init__(self, statement):
+        self.statement = statement
+
+
+@compiles(explain, "postgresql")
+def compile_explain(element, compiler, **kw):
+    return "EXPLAIN (FORMAT JSON) %s" % compiler.process(element.statement, **kw)
@@ -7,27 +7,40 @@ from datetime import datetime, date
 import enum
 
 from sqlalchemy import (
+    DDL,
     UUID,
+    BigInteger,
     ForeignKey,
+    Index,
     Integer,
+    PrimaryKeyConstraint,
     String,
     DateTime,
     Date,
     Boolean,
     Enum,
-    UniqueConstraint,
+    event,
     func,
     text,
 )
+from sqlalchemy.dialects import sqlite
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import Mapped, declarative_base, mapped_column, relationship
 
 from src.conf.config import settings
+from src.utils.normalize import normalize_email
 
 
 Base = declarative_base()
 
 
+# SQLite sets CURRENT_TIMESTAMP without microseconds, so bound timestamps are stored
+# and compared in the same format there (e.g. in "WHERE updated_at = :updated_at").
+Timestamp = DateTime(timezone=True).with_variant(
+    sqlite.DATETIME(truncate_microseconds=True), "sqlite"
+)
+
+
 class Role(enum.Enum):
     administrator: str = "administrator"
     moderator: str = "moderator"
@@ -38,8 +51,32 @@ class Contact(Base):
     __tablename__ = "contacts"
     __mapper_args__ = {"eager_defaults": True}
     __table_args__ = (
-        UniqueConstraint("user_id", "email", name="uix_email"),
-        UniqueConstraint("user_id", "phone", name="uix_phone"),
+        Index(
+            "uix_contacts_user_id_email_normalized",
+            "user_id",
+            "email_normalized",
+            unique=True,
+        ),
+        Index(
+            "uix_contacts_user_id_phone_normalized",
+            "user_id",
+            "phone_normalized",
+            unique=True,
+        ),
+        Index("ix_contacts_user_id_updated_at_id", "user_id", "updated_at", "id"),
+        Index(
+            "ix_contacts_user_id_last_name_first_name",
+            "user_id",
+            "last_name",
+            "first_name",
+        ),
+        Index("ix_contacts_user_id_created_at", "user_id", "created_at"),
+        *(
+            ()
+            if settings.test
+            else (PrimaryKeyConstraint("user_id", "id", name="contacts_pkey"),)
+        ),
+        {"postgresql_partition_by": "HASH (user_id)"},
     )
     id: Mapped[UUID | int] = (
         mapped_column(Integer, primary_key=True)
@@ -52,21 +89,26 @@ class Contact(Base):
     last_name: Mapped[str] = mapped_column(String(254), nullable=False)
     email: Mapped[str] = mapped_column(String(254), nullable=True)
     phone: Mapped[str] = mapped_column(String(38), nullable=True)
+    email_normalized: Mapped[str] = mapped_column(String(254), nullable=True)
+    phone_normalized: Mapped[str] = mapped_column(String(38), nullable=True)
     birthday: Mapped[date] = mapped_column(Date())
     address: Mapped[str] = mapped_column(String(254), nullable=True)
-    created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), server_default=func.now()
-    )
+    created_at: Mapped[datetime] = mapped_column(Timestamp, server_default=func.now())
     updated_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True),
+        Timestamp,
         server_default=func.now(),
         onupdate=func.now(),
     )
+    # The partition key leads the primary key on PostgreSQL, so the ORM's updates and
+    # deletes by the primary key are pruned to one partition too, and the user's
+    # contacts can be read in the order of their IDs by the primary key.
     user_id: Mapped[UUID | int] = (
         mapped_column(Integer, ForeignKey("users.id", onupdate="CASCADE"))
         if settings.test
         else mapped_column(
-            UUID(as_uuid=True), ForeignKey("users.id", onupdate="CASCADE")
+            UUID(as_uuid=True),
+            ForeignKey("users.id", onupdate="CASCADE"),
+            primary_key=True,
         )
     )
     user: Mapped["User"] = relationship("User", back_populates="contacts")
@@ -76,6 +118,46 @@ class Contact(Base):
         return self.first_name + " " + self.last_name
 
 
+for remainder in range(settings.contacts_partitions):
+    event.listen(
+        Contact.__table__,
+        "after_create",
+        DDL(
+            f"CREATE TABLE contacts_p{remainder} PARTITION OF contacts "
+            f"FOR VALUES WITH (MODULUS {settings.contacts_partitions}, "
+            f"REMAINDER {remainder})"
+        ).execute_if(dialect="postgresql"),
+    )
+
+
+class ContactDeletion(Base):
+    __tablename__ = "contact_deletions"
+    __table_args__ = (
+        Index(
+            "ix_contact_deletions_user_id_deleted_at_id",
+            "user_id",
+            "deleted_at",
+            "id",
+        ),
+    )
+    id: Mapped[int] = mapped_column(
+        BigInteger().with_variant(Integer, "sqlite"), primary_key=True
+    )
+    contact_id: Mapped[UUID | int] = (
+        mapped_column(Integer, nullable=False)
+        if settings.test
+        else mapped_column(UUID(as_uuid=True), nullable=False)
+    )
+    user_id: Mapped[UUID | int] = (
+        mapped_column(Integer, ForeignKey("users.id", onupdate="CASCADE"))
+        if settings.test
+        else mapped_column(
+            UUID(as_uuid=True), ForeignKey("users.id", onupdate="CASCADE")
+        )
+    )
+    deleted_at: Mapped[datetime] = mapped_column(Timestamp, server_default=func.now())
+
+
 class User(Base):
     __tablename__ = "users"
     __mapper_args__ = {"eager_defaults": True}
@@ -88,6 +170,15 @@ class User(Base):
     )
     username: Mapped[str] = mapped_column(String(254), nullable=False, unique=True)
     email: Mapped[str] = mapped_column(String(254), nullable=False, unique=True)
+    email_normalized: Mapped[str] = mapped_column(
+        String(254),
+        nullable=False,
+        unique=True,
+        index=True,
+        default=lambda context: normalize_email(
+            context.get_current_parameters()["email"]
+        ),
+    )
     password: Mapped[str] = mapped_column(String(60), nullable=False)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now()
@@ -98,6 +189,9 @@ class User(Base):
         onupdate=func.now(),
     )
     avatar: Mapped[str] = mapped_column(String(254), nullable=True)
+    timezone: Mapped[str] = mapped_column(
+        String(64), default="UTC", server_default="UTC"
+    )
     role: Mapped[Role] = mapped_column(Enum(Role), default=Role.user)
     refresh_token: Mapped[str] = mapped_column(String(1024), nullable=True)
     is_email_confirmed: Mapped[bool] = mapped_column(Boolean, default=False)
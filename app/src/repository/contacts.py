@@ -4,17 +4,214 @@ Module of contacts' CRUD
 
 
 from collections import defaultdict
-from datetime import date, timedelta
+from datetime import date, datetime, time, timedelta, timezone
+import json
 from pydantic import UUID4
-from typing import List
+from time import time_ns
+from typing import Any, Dict, Iterable, List, Mapping, Sequence, Tuple
 
-from sqlalchemy import select, and_, or_
-from sqlalchemy.engine.result import ScalarResult
+from redis.asyncio.client import Redis
+
+from sqlalchemy import (
+    Select,
+    select,
+    insert,
+    update,
+    delete,
+    and_,
+    or_,
+    tuple_,
+    case,
+    extract,
+    func,
+)
+from sqlalchemy.engine import RowMapping
+from sqlalchemy.engine.result import MappingResult
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from src.database.models import Contact, User
-from src.schemas.contacts import ContactModel
+from src.conf.config import settings
+from src.database.connect_db import get_read_your_writes_key
+from src.database.functions import explain, week_start
+from src.database.models import Contact, ContactDeletion, User
+from src.schemas.contacts import ContactModel, ContactResponse, ContactUpdateModel
+from src.services.birthday_index import add_birthdays, remove_birthdays
+from src.services.contact_events import add_contact_events
 from src.utils.is_leap_year import is_leap_year
+from src.utils.normalize import normalize_email, normalize_phone
+
+
+CONTACT_RESPONSE_COLUMNS = [
+    getattr(Contact, name) for name in ContactResponse.model_fields
+]
+
+COUNT_DELTAS = {"created": 1, "deleted": -1}
+
+# The number of the contacts is only adjusted once it is counted, so a write never
+# creates a partial counter.
+INCRBY_IF_EXISTS = """
+if redis.call("EXISTS", KEYS[1]) == 1 then
+    return redis.call("INCRBY", KEYS[1], ARGV[1])
+end
+"""
+
+
+def select_contact_rows(fields: Sequence[str] | None = None) -> Select:
+    """
+    Creates a read-only select of the ContactResponse columns of contacts.
+
+    The rows are plain tuples: they are not added to the session's identity map and have no instance state or change tracking.
+
+    :param fields: The names of the ContactResponse fields to select, all of them if None.
+    :type fields: Sequence[str] | None
+    :return: The select statement.
+    :rtype: Select
+    """
+    if fields is None:
+        return select(*CONTACT_RESPONSE_COLUMNS)
+    return select(*(getattr(Contact, name) for name in fields))
+
+
+def get_contacts_version_key(user_id: UUID4 | int) -> str:
+    """
+    Gets the cache key of the version of the contacts of a user.
+
+    :param user_id: The ID of the user.
+    :type user_id: UUID4 | int
+    :return: The cache key.
+    :rtype: str
+    """
+    return f"contacts_version: {user_id}"
+
+
+def get_contacts_count_key(user_id: UUID4 | int) -> str:
+    """
+    Gets the cache key of the number of the contacts of a user.
+
+    :param user_id: The ID of the user.
+    :type user_id: UUID4 | int
+    :return: The cache key.
+    :rtype: str
+    """
+    return f"contacts_count: {user_id}"
+
+
+async def get_contacts_version(user: User, cache: Redis) -> int:
+    """
+    Gets the version of the contacts of a specific user, which changes on every write of the contacts.
+
+    A missing version is initialized from the current time, so versions are not repeated after the cache is flushed.
+
+    :param user: The user to get the version for.
+    :type user: User
+    :param cache: The Redis client.
+    :type cache: Redis
+    :return: The version of the user's contacts.
+    :rtype: int
+    """
+    key = get_contacts_version_key(user.id)
+    version = await cache.get(key)
+    if version is None:
+        await cache.set(key, time_ns(), nx=True)
+        version = await cache.get(key)
+    return int(version)
+
+
+async def bump_contacts_version(
+    user: User,
+    cache: Redis,
+    event: str | None = None,
+    contact_ids: Sequence[UUID4 | int] = (),
+    birthdays: Mapping[UUID4 | int, date] | None = None,
+) -> int:
+    """
+    Atomically increments the version of the contacts of a specific user, publishes the contacts' events and updates the birthday index and the number of the contacts.
+
+    With a read replica the user's reads are also sent to the primary for a while, so that the new version is not cached with the contacts of a lagging replica.
+
+    :param user: The user to increment the version for.
+    :type user: User
+    :param cache: The Redis client.
+    :type cache: Redis
+    :param event: The event of the changed contacts (created, updated or deleted), None to publish no events.
+    :type event: str | None
+    :param contact_ids: The IDs of the changed contacts.
+    :type contact_ids: Sequence[UUID4 | int]
+    :param birthdays: The birthdays of the created or updated contacts by their IDs.
+    :type birthdays: Mapping[UUID4 | int, date] | None
+    :return: The new version of the user's contacts.
+    :rtype: int
+    """
+    key = get_contacts_version_key(user.id)
+    async with cache.pipeline(transaction=True) as pipe:
+        pipe.set(key, time_ns(), nx=True)
+        pipe.incr(key)
+        if event is not None:
+            add_contact_events(pipe, user.id, event, contact_ids)
+        if event == "deleted":
+            remove_birthdays(pipe, user.id, contact_ids)
+        elif birthdays:
+            add_birthdays(pipe, user.id, birthdays)
+        if event in COUNT_DELTAS and contact_ids:
+            pipe.eval(
+                INCRBY_IF_EXISTS,
+                1,
+                get_contacts_count_key(user.id),
+                COUNT_DELTAS[event] * len(contact_ids),
+            )
+        if settings.sqlalchemy_database_url_replica:
+            pipe.set(
+                get_read_your_writes_key(user.email),
+                1,
+                ex=settings.read_your_writes_seconds,
+            )
+        results = await pipe.execute()
+    return results[1]
+
+
+def filter_contacts(
+    stmt: Select, first_name: str, last_name: str, email: str, user: User
+) -> Select:
+    """
+    Filters a select of contacts by the user and the search by first name, last name and email.
+
+    :param stmt: The select statement.
+    :type stmt: Select
+    :param first_name: The string to search by first name.
+    :type first_name: str
+    :param last_name: The string to search by last name.
+    :type last_name: str
+    :param email: The string to search by email.
+    :type email: str
+    :param user: The user to retrieve contacts for.
+    :type user: User
+    :return: The filtered select statement.
+    :rtype: Select
+    """
+    stmt = stmt.filter(Contact.user_id == user.id)
+    if first_name:
+        stmt = stmt.filter(Contact.first_name.like(f"%{first_name}%"))
+    if last_name:
+        stmt = stmt.filter(Contact.last_name.like(f"%{last_name}%"))
+    if email:
+        stmt = stmt.filter(Contact.email.like(f"%{email}%"))
+    return stmt
+
+
+def normalize_contact_fields(values: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Adds the normalized email and phone to the values of a contact's fields, for the ones which are set.
+
+    :param values: The values of the contact's fields.
+    :type values: Dict[str, Any]
+    :return: The values with the normalized email and phone.
+    :rtype: Dict[str, Any]
+    """
+    values = dict(values)
+    if "email" in values:
+        values["email_normalized"] = normalize_email(values["email"])
+    if "phone" in values:
+        values["phone_normalized"] = normalize_phone(values["phone"])
+    return values
 
 
 async def read_contacts(
@@ -25,10 +222,13 @@ async def read_contacts(
     email: str,
     user: User,
     session: AsyncSession,
-) -> ScalarResult:
+    fields: Sequence[str] | None = None,
+) -> MappingResult:
     """
     Reads a list of contacts for a specific user with specified pagination parameters and search by first name, last name and email.
 
+    Only the columns of ContactResponse are selected, as plain rows instead of ORM instances.
+
     :param offset: The number of contacts to skip.
     :type offset: int
     :param limit: The maximum number of contacts to return.
@@ -43,61 +243,123 @@ async def read_contacts(
     :type user: User
     :param session: The database session.
     :type session: AsyncSession
-    :return: A list of contacts or None.
-    :rtype: ScalarResult
+    :param fields: The names of the ContactResponse fields to select, all of them if None.
+    :type fields: Sequence[str] | None
+    :return: A list of contacts' rows.
+    :rtype: MappingResult
     """
-    stmt = select(Contact).filter(Contact.user_id == user.id)
-    if first_name:
-        stmt = stmt.filter(Contact.first_name.like(f"%{first_name}%"))
-    if last_name:
-        stmt = stmt.filter(Contact.last_name.like(f"%{last_name}%"))
-    if email:
-        stmt = stmt.filter(Contact.email.like(f"%{email}%"))
+    stmt = filter_contacts(
+        select_contact_rows(fields), first_name, last_name, email, user
+    )
     stmt = stmt.offset(offset).limit(limit)
     contacts = await session.execute(stmt)
-    return contacts.scalars()
+    return contacts.mappings()
 
 
-async def read_contacts_with_birthdays_in_n_days(
-    n: int,
-    offset: int,
-    limit: int,
+async def count_contacts(
+    first_name: str,
+    last_name: str,
+    email: str,
     user: User,
     session: AsyncSession,
-) -> List[Contact] | None:
+    cache: Redis,
+) -> Tuple[int, bool]:
     """
-    Reads a list of contacts with birthdays in n day(s) for a specific user with specified pagination parameters.
+    Counts the contacts for a specific user with search by first name, last name and email.
 
-    :param n: The number of days to find contacts' birthdays (1 - only for today)
-    :type n: int
-    :param offset: The number of contacts to skip.
-    :type offset: int
-    :param limit: The maximum number of contacts to return.
-    :type limit: int
-    :param user: The user to retrieve contacts for.
+    The contacts are counted exactly with COUNT(*) if the user has at most contacts_exact_count_max contacts.
+    Above it all contacts are counted by the maintained counter, and the found contacts are estimated by the PostgreSQL planner.
+
+    :param first_name: The string to search by first name.
+    :type first_name: str
+    :param last_name: The string to search by last name.
+    :type last_name: str
+    :param email: The string to search by email.
+    :type email: str
+    :param user: The user to count contacts for.
     :type user: User
     :param session: The database session.
     :type session: AsyncSession
-    :return: A list of contacts with birthdays in n day(s) or None.
-    :rtype: List[Contact] | None
+    :param cache: The Redis client.
+    :type cache: Redis
+    :return: The number of the contacts and whether it is exact.
+    :rtype: Tuple[int, bool]
+    """
+    total = await get_contacts_count(user, session, cache)
+    if total > settings.contacts_exact_count_max:
+        if not (first_name or last_name or email):
+            return total, False
+        if session.get_bind().dialect.name == "postgresql":
+            stmt = filter_contacts(
+                select(Contact.id), first_name, last_name, email, user
+            )
+            plan = await session.execute(explain(stmt))
+            plan = plan.scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            return min(int(plan[0]["Plan"]["Plan Rows"]), total), False
+    stmt = filter_contacts(
+        select(func.count()).select_from(Contact), first_name, last_name, email, user
+    )
+    count = await session.execute(stmt)
+    return count.scalar(), True
+
+
+async def get_contacts_count(user: User, session: AsyncSession, cache: Redis) -> int:
+    """
+    Gets the number of the contacts of a specific user from the counter, which is counted with COUNT(*) if it is missing.
+
+    The counter is adjusted on every creation and deletion, and expires to repair any drift.
+
+    :param user: The user to count contacts for.
+    :type user: User
+    :param session: The database session.
+    :type session: AsyncSession
+    :param cache: The Redis client.
+    :type cache: Redis
+    :return: The number of the user's contacts.
+    :rtype: int
+    """
+    key = get_contacts_count_key(user.id)
+    count = await cache.get(key)
+    if count is None:
+        stmt = select(func.count()).filter(Contact.user_id == user.id)
+        count = await session.execute(stmt)
+        count = count.scalar()
+        await cache.set(key, count, ex=settings.redis_expire, nx=True)
+    return int(count)
+
+
+def get_upcoming_birthdays(
+    contacts: Iterable[Mapping], today: date, n: int
+) -> List[Tuple[int, Mapping]]:
+    """
+    Selects the contacts with birthdays in n day(s) from today and sorts them by the number of days to the birthday.
+
+    In a non-leap year the birthdays on February 29 are on March 1, before the other birthdays of the day.
+
+    :param contacts: The contacts' rows with the birthday field.
+    :type contacts: Iterable[Mapping]
+    :param today: The first day.
+    :type today: date
+    :param n: The number of days to find contacts' birthdays (1 - only for today)
+    :type n: int
+    :return: The numbers of days to the birthdays and the contacts' rows.
+    :rtype: List[Tuple[int, Mapping]]
     """
-    stmt = select(Contact).filter(Contact.user_id == user.id)
-    contacts = await session.execute(stmt)
-    contacts = contacts.scalars()
     tmp = defaultdict(list)
     tmp_leap_day = defaultdict(list)
-    today_date = date.today()
-    is_leap_year_flag = is_leap_year(today_date.year)
+    is_leap_year_flag = is_leap_year(today.year)
     number_of_days_in_the_year = 365 + is_leap_year_flag
-    last_date = today_date + timedelta(days=n - 1)
-    is_includes_next_year_flag = bool(last_date.year - today_date.year)
+    last_date = today + timedelta(days=n - 1)
+    is_includes_next_year_flag = bool(last_date.year - today.year)
     for contact in contacts:
-        birthday = contact.birthday
+        birthday = contact["birthday"]
         if not is_leap_year_flag and birthday.month == 2 and birthday.day == 29:
-            date_delta = date(year=today_date.year, month=3, day=1) - today_date
+            date_delta = date(year=today.year, month=3, day=1) - today
             is_leap_day = True
         else:
-            date_delta = birthday.replace(year=today_date.year) - today_date
+            date_delta = birthday.replace(year=today.year) - today
             is_leap_day = False
         delta_days = date_delta.days
         if is_includes_next_year_flag and delta_days < n - number_of_days_in_the_year:
@@ -107,16 +369,217 @@ async def read_contacts_with_birthdays_in_n_days(
                 tmp_leap_day[delta_days].append(contact)
             else:
                 tmp[delta_days].append(contact)
-    if tmp_leap_day and tmp:
-        for delta_days in range(n):
-            if tmp_leap_day.get(delta_days):
-                tmp[delta_days] = tmp_leap_day[delta_days] + tmp[delta_days]
     result = []
-    if tmp:
-        for delta_days in range(n):
-            if tmp.get(delta_days):
-                result = result + tmp[delta_days]
-    return result[offset : offset + limit]
+    for delta_days in range(n):
+        for contact in tmp_leap_day.get(delta_days, ()):
+            result.append((delta_days, contact))
+        for contact in tmp.get(delta_days, ()):
+            result.append((delta_days, contact))
+    return result
+
+
+async def read_contacts_by_ids(
+    contact_ids: Sequence[UUID4 | int], user: User, session: AsyncSession
+) -> List[RowMapping]:
+    """
+    Reads the contacts with the specified IDs for a specific user in one query.
+
+    :param contact_ids: The IDs of the contacts to retrieve.
+    :type contact_ids: Sequence[UUID4 | int]
+    :param user: The user to retrieve contacts for.
+    :type user: User
+    :param session: The database session.
+    :type session: AsyncSession
+    :return: The rows of the found contacts.
+    :rtype: List[RowMapping]
+    """
+    stmt = select_contact_rows().filter(
+        and_(Contact.user_id == user.id, Contact.id.in_(contact_ids))
+    )
+    contacts = await session.execute(stmt)
+    return contacts.mappings().all()
+
+
+async def read_contact_stats(
+    since: date,
+    weeks: int,
+    approximate: bool,
+    user: User,
+    session: AsyncSession,
+    cache: Redis,
+) -> Dict[str, Any]:
+    """
+    Reads the statistics of the contacts for a specific user with one GROUP BY query.
+
+    The contacts are grouped by the birth month and by the week of creation since the specified date, and the groups are summed up here.
+    In the approximate mode, for a user with more than contacts_exact_count_max contacts, only the first contacts_stats_sample_size of the user's contacts in the order of the random IDs are read by the primary key on (user_id, id), the total is taken from the maintained counter and the other counts are scaled up to it.
+
+    :param since: The first day of the first week of the growth.
+    :type since: date
+    :param weeks: The number of weeks of the growth.
+    :type weeks: int
+    :param approximate: Whether the counts may be estimated from a sample.
+    :type approximate: bool
+    :param user: The user to retrieve the statistics for.
+    :type user: User
+    :param session: The database session.
+    :type session: AsyncSession
+    :param cache: The Redis client.
+    :type cache: Redis
+    :return: The total, the numbers of contacts without email and phone, the counts by birth month, the counts by week and whether they are estimated.
+    :rtype: Dict[str, Any]
+    """
+    table = Contact.__table__
+    if approximate:
+        contacts_count = await get_contacts_count(user, session, cache)
+        approximate = contacts_count > settings.contacts_exact_count_max
+    if approximate:
+        table = (
+            select(table)
+            .filter(table.c.user_id == user.id)
+            .order_by(table.c.id)
+            .limit(settings.contacts_stats_sample_size)
+            .subquery()
+        )
+    stmt = (
+        select(
+            extract("month", table.c.birthday).label("month"),
+            case(
+                (
+                    table.c.created_at >= datetime.combine(since, time(), timezone.utc),
+                    week_start(table.c.created_at),
+                )
+            ).label("week"),
+            func.count().label("count"),
+            func.count(
+                case((or_(table.c.email.is_(None), table.c.email == ""), 1))
+            ).label("missing_email"),
+            func.count(
+                case((or_(table.c.phone.is_(None), table.c.phone == ""), 1))
+            ).label("missing_phone"),
+        )
+        .filter(table.c.user_id == user.id)
+        .group_by("month", "week")
+    )
+    rows = await session.execute(stmt)
+    total = missing_email = missing_phone = 0
+    by_birth_month = dict.fromkeys(range(1, 13), 0)
+    by_week = dict.fromkeys((since + timedelta(weeks=i) for i in range(weeks)), 0)
+    for row in rows.mappings():
+        total += row["count"]
+        missing_email += row["missing_email"]
+        missing_phone += row["missing_phone"]
+        by_birth_month[int(row["month"])] += row["count"]
+        if row["week"] is not None:
+            by_week[row["week"]] = by_week.get(row["week"], 0) + row["count"]
+    scale = contacts_count / total if approximate and total else 1
+    return {
+        "total": round(total * scale),
+        "missing_email": round(missing_email * scale),
+        "missing_phone": round(missing_phone * scale),
+        "by_birth_month": {
+            month: round(count * scale) for month, count in by_birth_month.items()
+        },
+        "growth_per_week": [
+            {"week": week, "count": round(count * scale)}
+            for week, count in sorted(by_week.items())
+        ],
+        "approximate": approximate,
+    }
+
+
+async def read_changes_horizon(session: AsyncSession) -> datetime:
+    """
+    Reads the horizon of the change feed: the database time minus CONTACT_CHANGES_LAG seconds.
+
+    updated_at and deleted_at are the start times of the writing transactions, not their commit times, so a change which is
+    committed later may be stamped before a change which is already read. Only the changes stamped before the horizon are
+    read, so a transaction shorter than the lag is never skipped by a cursor.
+
+    :param session: The database session.
+    :type session: AsyncSession
+    :return: The horizon.
+    :rtype: datetime
+    """
+    now = await session.scalar(select(func.now()))
+    return now - timedelta(seconds=settings.contact_changes_lag)
+
+
+async def read_contact_changes(
+    contacts_after: Tuple[datetime, UUID4 | int] | None,
+    deletions_after: Tuple[datetime, int] | None,
+    until: datetime,
+    limit: int,
+    user: User,
+    session: AsyncSession,
+) -> Tuple[List[RowMapping], List[RowMapping]]:
+    """
+    Reads the contacts created or updated and the tombstones of the contacts deleted after the specified positions and up to the horizon for a specific user.
+
+    Both are read by keyset from the indexes on (user_id, updated_at, id) and (user_id, deleted_at, id), so the cost depends on the number of changes only.
+    Up to limit + 1 rows of each are returned, the extra row shows that there are more changes.
+
+    :param contacts_after: The (updated_at, id) of the last read contact, or None to read from the beginning.
+    :type contacts_after: Tuple[datetime, UUID4 | int] | None
+    :param deletions_after: The (deleted_at, id) of the last read tombstone, or None to read from the beginning.
+    :type deletions_after: Tuple[datetime, int] | None
+    :param until: The horizon from read_changes_horizon, the later changes are left for the next read.
+    :type until: datetime
+    :param limit: The maximum number of contacts and tombstones to return.
+    :type limit: int
+    :param user: The user to retrieve changes for.
+    :type user: User
+    :param session: The database session.
+    :type session: AsyncSession
+    :return: The changed contacts' rows and the tombstones' rows (id, contact_id, deleted_at).
+    :rtype: Tuple[List[RowMapping], List[RowMapping]]
+    """
+    stmt = select_contact_rows().filter(
+        Contact.user_id == user.id, Contact.updated_at <= until
+    )
+    if contacts_after is not None:
+        stmt = stmt.filter(tuple_(Contact.updated_at, Contact.id) > contacts_after)
+    stmt = stmt.order_by(Contact.updated_at, Contact.id).limit(limit + 1)
+    contacts = await session.execute(stmt)
+    stmt = select(
+        ContactDeletion.id, ContactDeletion.contact_id, ContactDeletion.deleted_at
+    ).filter(ContactDeletion.user_id == user.id, ContactDeletion.deleted_at <= until)
+    if deletions_after is not None:
+        stmt = stmt.filter(
+            tuple_(ContactDeletion.deleted_at, ContactDeletion.id) > deletions_after
+        )
+    stmt = stmt.order_by(ContactDeletion.deleted_at, ContactDeletion.id).limit(
+        limit + 1
+    )
+    deletions = await session.execute(stmt)
+    return contacts.mappings().all(), deletions.mappings().all()
+
+
+async def read_last_contact_deletion(
+    until: datetime, user: User, session: AsyncSession
+) -> RowMapping | None:
+    """
+    Reads the last tombstone up to the horizon of the contacts deleted for a specific user.
+
+    :param until: The horizon from read_changes_horizon.
+    :type until: datetime
+    :param user: The user to retrieve the tombstone for.
+    :type user: User
+    :param session: The database session.
+    :type session: AsyncSession
+    :return: The tombstone's row (id, contact_id, deleted_at), or None if no contacts were deleted.
+    :rtype: RowMapping | None
+    """
+    stmt = (
+        select(
+            ContactDeletion.id, ContactDeletion.contact_id, ContactDeletion.deleted_at
+        )
+        .filter(ContactDeletion.user_id == user.id, ContactDeletion.deleted_at <= until)
+        .order_by(ContactDeletion.deleted_at.desc(), ContactDeletion.id.desc())
+        .limit(1)
+    )
+    deletion = await session.execute(stmt)
+    return deletion.mappings().first()
 
 
 async def read_contact(
@@ -141,8 +604,67 @@ async def read_contact(
     return contact.scalar()
 
 
+async def read_contact_updated_at(
+    contact_id: UUID4 | int, user: User, session: AsyncSession
+) -> datetime | None:
+    """
+    Reads only the time of the last update of a single contact with the specified ID for a specific user.
+
+    :param contact_id: The ID of the contact to check.
+    :type contact_id: UUID4 | int
+    :param user: The user to check contacts for.
+    :type user: User
+    :param session: The database session.
+    :type session: AsyncSession
+    :return: The time of the last update of the contact, or None if it does not exist.
+    :rtype: datetime | None
+    """
+    stmt = select(Contact.updated_at).filter(
+        and_(Contact.id == contact_id, Contact.user_id == user.id)
+    )
+    updated_at = await session.execute(stmt)
+    return updated_at.scalar()
+
+
+async def exists_duplicate_contact(
+    email: str | None,
+    phone: str | None,
+    user: User,
+    session: AsyncSession,
+    contact_id: UUID4 | int | None = None,
+) -> bool:
+    """
+    Checks by the normalized columns whether another contact of a specific user already has the email or the phone.
+
+    :param email: The email to check, not checked if None.
+    :type email: str | None
+    :param phone: The phone to check, not checked if None.
+    :type phone: str | None
+    :param user: The user to check contacts for.
+    :type user: User
+    :param session: The database session.
+    :type session: AsyncSession
+    :param contact_id: The ID of the contact being updated, which is not a duplicate of itself.
+    :type contact_id: UUID4 | int | None
+    :return: Whether a duplicate exists.
+    :rtype: bool
+    """
+    conditions = []
+    if normalize_email(email) is not None:
+        conditions.append(Contact.email_normalized == normalize_email(email))
+    if normalize_phone(phone) is not None:
+        conditions.append(Contact.phone_normalized == normalize_phone(phone))
+    if not conditions:
+        return False
+    stmt = select(Contact.id).filter(and_(Contact.user_id == user.id, or_(*conditions)))
+    if contact_id is not None:
+        stmt = stmt.filter(Contact.id != contact_id)
+    contacts = await session.execute(stmt.limit(1))
+    return contacts.first() is not None
+
+
 async def create_contact(
-    body: ContactModel, user: User, session: AsyncSession
+    body: ContactModel, user: User, session: AsyncSession, cache: Redis
 ) -> Contact | None:
     """
     Creates a new contact for a specific user.
@@ -153,28 +675,30 @@ async def create_contact(
     :type user: User
     :param session: The database session.
     :type session: AsyncSession
+    :param cache: The Redis client.
+    :type cache: Redis
     :return: The newly created contact or None if creation failed.
     :rtype: Contact | None
     """
-    stmt = select(Contact).filter(
-        and_(
-            or_(Contact.email == body.email, Contact.phone == body.phone),
-            Contact.user_id == user.id,
-        )
-    )
-    contacts = await session.execute(stmt)
-    contacts = contacts.scalars()
-    for contact in contacts:
+    values = normalize_contact_fields(body.model_dump())
+    if await exists_duplicate_contact(body.email, body.phone, user, session):
         return None
-    contact = Contact(**body.model_dump(), user_id=user.id)
+    contact = Contact(**values, user_id=user.id)
     session.add(contact)
     await session.commit()
     await session.refresh(contact)
+    await bump_contacts_version(
+        user, cache, "created", [contact.id], {contact.id: contact.birthday}
+    )
     return contact
 
 
 async def update_contact(
-    contact_id: UUID4 | int, body: ContactModel, user: User, session: AsyncSession
+    contact_id: UUID4 | int,
+    body: ContactModel,
+    user: User,
+    session: AsyncSession,
+    cache: Redis,
 ) -> Contact | None:
     """
     Updates a single contact with the specified ID for a specific user.
@@ -187,6 +711,8 @@ async def update_contact(
     :type user: User
     :param session: The database session.
     :type session: AsyncSession
+    :param cache: The Redis client.
+    :type cache: Redis
     :return: The updated contact or None if it does not exist.
     :rtype: Contact | None
     """
@@ -200,17 +726,72 @@ async def update_contact(
         contact.last_name = body.last_name
         contact.email = body.email
         contact.phone = body.phone
+        contact.email_normalized = normalize_email(body.email)
+        contact.phone_normalized = normalize_phone(body.phone)
         contact.birthday = body.birthday
         contact.address = body.address
         await session.commit()
+        await bump_contacts_version(
+            user, cache, "updated", [contact.id], {contact.id: contact.birthday}
+        )
+    return contact
+
+
+async def patch_contact(
+    contact_id: UUID4 | int,
+    body: ContactUpdateModel,
+    user: User,
+    session: AsyncSession,
+    cache: Redis,
+    updated_at: List[datetime] | None = None,
+) -> RowMapping | None:
+    """
+    Partially updates a single contact with the specified ID for a specific user.
+
+    Only the columns which are set in the body are updated. The version check is done in the same UPDATE statement, which returns the updated row.
+
+    :param contact_id: The ID of the contact to update
+    :type contact_id: UUID4 | int
+    :param body: The request body with the fields of the contact to update.
+    :type body: ContactUpdateModel
+    :param user: The user to update the contact for.
+    :type user: User
+    :param session: The database session.
+    :type session: AsyncSession
+    :param cache: The Redis client.
+    :type cache: Redis
+    :param updated_at: The times of the last update which the client expects the contact to have, any if None.
+    :type updated_at: List[datetime] | None
+    :return: The updated contact's row or None if it does not exist or has another time of the last update.
+    :rtype: RowMapping | None
+    """
+    stmt = update(Contact).filter(
+        and_(Contact.id == contact_id, Contact.user_id == user.id)
+    )
+    if updated_at is not None:
+        stmt = stmt.filter(Contact.updated_at.in_(updated_at))
+    stmt = stmt.values(
+        **normalize_contact_fields(body.model_dump(exclude_unset=True))
+    ).returning(*CONTACT_RESPONSE_COLUMNS)
+    contact = await session.execute(stmt)
+    contact = contact.mappings().first()
+    await session.commit()
+    if contact:
+        await bump_contacts_version(
+            user,
+            cache,
+            "updated",
+            [contact["id"]],
+            {contact["id"]: contact["birthday"]},
+        )
     return contact
 
 
 async def delete_contact(
-    contact_id: UUID4 | int, user: User, session: AsyncSession
+    contact_id: UUID4 | int, user: User, session: AsyncSession, cache: Redis
 ) -> Contact | None:
     """
-    Deletes a single contact with the specified ID for a specific user.
+    Deletes a single contact with the specified ID for a specific user and logs its tombstone for the delta sync.
 
     :param contact_id: The ID of the contact to delete
     :type contact_id: UUID4 | int
@@ -218,6 +799,8 @@ async def delete_contact(
     :type user: User
     :param session: The database session.
     :type session: AsyncSession
+    :param cache: The Redis client.
+    :type cache: Redis
     :return: The deleted contact or None if it did not exist.
     :rtype: Contact | None
     """
@@ -228,5 +811,42 @@ async def delete_contact(
     contact = contact.scalar()
     if contact:
         await session.delete(contact)
+        session.add(ContactDeletion(contact_id=contact.id, user_id=user.id))
         await session.commit()
+        await bump_contacts_version(user, cache, "deleted", [contact.id])
     return contact
+
+
+async def delete_contacts_by_ids(
+    contact_ids: Sequence[UUID4 | int], user: User, session: AsyncSession, cache: Redis
+) -> List[UUID4 | int]:
+    """
+    Deletes the contacts with the specified IDs for a specific user in one statement and logs their tombstones for the delta sync.
+
+    :param contact_ids: The IDs of the contacts to delete.
+    :type contact_ids: Sequence[UUID4 | int]
+    :param user: The user to delete contacts for.
+    :type user: User
+    :param session: The database session.
+    :type session: AsyncSession
+    :param cache: The Redis client.
+    :type cache: Redis
+    :return: The IDs of the deleted contacts.
+    :rtype: List[UUID4 | int]
+    """
+    stmt = (
+        delete(Contact)
+        .filter(and_(Contact.user_id == user.id, Contact.id.in_(contact_ids)))
+        .returning(Contact.id)
+    )
+    deleted = await session.execute(stmt)
+    deleted = deleted.scalars().all()
+    if deleted:
+        await session.execute(
+            insert(ContactDeletion),
+            [{"contact_id": contact_id, "user_id": user.id} for contact_id in deleted],
+        )
+    await session.commit()
+    if deleted:
+        await bump_contacts_version(user, cache, "deleted", deleted)
+    return deleted
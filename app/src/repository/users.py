@@ -5,7 +5,6 @@ Module of users' CRUD
 
 import pickle
 
-from libgravatar import Gravatar
 from pydantic import EmailStr
 from redis.asyncio.client import Redis
 from sqlalchemy import select
@@ -14,42 +13,27 @@ from sqlalchemy.ext.asyncio import AsyncSession
 from src.conf.config import settings
 from src.database.models import Role, User
 from src.schemas.users import UserModel
+from src.services.avatars import get_gravatar_url
+from src.utils.normalize import normalize_email
 
 
 async def set_user_in_cache(user: User, cache: Redis) -> None:
     """
-    Sets an user in cache.
+    Sets an user in cache with its time to live in one command.
 
     :param user: The user to set in cache.
     :type user: User
-    :param cache: The Redis client.
+    :param cache: The Redis client, or a pipeline to buffer the write in.
     :type cache: Redis
     :return: None.
     :rtype: None
     """
-    await cache.set(f"user: {user.email}", pickle.dumps(user))
-    await cache.expire(f"user: {user.email}", settings.redis_expire)
-
-
-async def get_user_by_email_from_cache(email: EmailStr, cache: Redis) -> User | None:
-    """
-    Gets an user with the specified email from cache.
-
-    :param email: The email of the user to get.
-    :type email: EmailStr
-    :param cache: The Redis client.
-    :type cache: Redis
-    :return: The user with the specified email, or None if it does not exist in cache.
-    :rtype: User | None
-    """
-    user = await cache.get(f"user: {email}")
-    if user:
-        return pickle.loads(user)
+    await cache.set(f"user: {user.email}", pickle.dumps(user), ex=settings.redis_expire)
 
 
 async def get_user_by_email(email: EmailStr, session: AsyncSession) -> User | None:
     """
-    Gets an user with the specified email.
+    Gets an user with the specified email, case-insensitively by the index on the normalized email.
 
     :param email: The email of the user to get.
     :type email: EmailStr
@@ -58,7 +42,7 @@ async def get_user_by_email(email: EmailStr, session: AsyncSession) -> User | No
     :return: The user with the specified email, or None if it does not exist.
     :rtype: User | None
     """
-    stmt = select(User).filter(User.email == email)
+    stmt = select(User).filter(User.email_normalized == normalize_email(email))
     user = await session.execute(stmt)
     return user.scalar()
 
@@ -82,12 +66,7 @@ async def create_user(body: UserModel, session: AsyncSession, cache: Redis) -> U
         role = Role.user
     else:
         role = Role.administrator
-    avatar = None
-    try:
-        g = Gravatar(body.email)
-        avatar = g.get_image()
-    except Exception:
-        pass
+    avatar = get_gravatar_url(body.email)
     user = User(**body.model_dump(), avatar=avatar, role=role)
     session.add(user)
     await session.commit()
@@ -3,22 +3,144 @@ Module of contacts' routes
 """
 
 
+from datetime import datetime, timedelta, timezone
 from pydantic import UUID4
-from typing import List
+from typing import List, Tuple
 
-from fastapi import APIRouter, HTTPException, Depends, Query, Path, status
+from fastapi import (
+    APIRouter,
+    HTTPException,
+    Depends,
+    Header,
+    Query,
+    Path,
+    Response,
+    status,
+)
+from fastapi.responses import StreamingResponse
+from redis.asyncio.client import Pipeline, Redis
 from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.background import BackgroundTask
 
-from src.database.connect_db import get_session
+from src.database.connect_db import get_session, get_redis_db1, get_cache_writes
 from src.database.models import User
 from src.repository import contacts as repository_contacts
-from src.schemas.contacts import ContactModel, ContactResponse
-from src.services.auth import auth_service
+from src.schemas.contacts import (
+    ContactBatchDeleteResponse,
+    ContactBatchResponse,
+    ContactChangesResponse,
+    ContactIdsModel,
+    ContactModel,
+    ContactResponse,
+    ContactStatsResponse,
+    ContactUpdateModel,
+)
+from src.services.auth import auth_service, get_read_session
+from src.services.birthday_digest import get_local_today, read_birthday_digest
+from src.services.birthday_index import read_upcoming_birthday_ids
+from src.services.contact_events import TooManyStreams, contact_events_broker
+from src.services.response_cache import (
+    get_cached_response,
+    make_response_cache_key,
+    set_cached_response,
+)
+from src.services.serializers import serialize_contacts
+from src.utils.cursors import decode_cursor, encode_cursor
+from src.utils.etags import is_etag_matched, make_weak_etag, parse_etags
 
 
 router = APIRouter(prefix="/contacts", tags=["contacts"])
 
 
+def parse_contact_fields(
+    fields: str = Query(default=None),
+) -> Tuple[str, ...] | None:
+    """
+    Parses and validates a comma-separated list of contact's fields to return.
+
+    :param fields: The comma-separated names of ContactResponse fields.
+    :type fields: str
+    :return: The names of the fields in the order of ContactResponse, or None for all fields.
+    :rtype: Tuple[str, ...] | None
+    """
+    if not fields:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    invalid = requested - ContactResponse.model_fields.keys()
+    if invalid:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Invalid fields: {', '.join(sorted(invalid))}",
+        )
+    return tuple(name for name in ContactResponse.model_fields if name in requested)
+
+
+def parse_if_match(if_match: str | None) -> List[datetime] | None:
+    """
+    Parses an If-Match header to the times of the last update of a contact which the client expects.
+
+    :param if_match: The value of the If-Match header.
+    :type if_match: str | None
+    :return: The times of the last update, or None if any version matches.
+    :rtype: List[datetime] | None
+    """
+    if not if_match or if_match.strip() == "*":
+        return None
+    updated_at = []
+    for value in parse_etags(if_match):
+        try:
+            updated_at.append(datetime.fromisoformat(value))
+        except ValueError:
+            pass
+    return updated_at
+
+
+async def check_duplicate_contact(
+    contact_id: UUID4 | int,
+    body: ContactModel | ContactUpdateModel,
+    user: User,
+    session: AsyncSession,
+) -> None:
+    """
+    Checks that no other contact of a specific user has the email or the phone of a contact to update, raising 409 if one has, or 404 if the contact does not exist.
+
+    :param contact_id: The ID of the contact to update.
+    :type contact_id: UUID4 | int
+    :param body: The request body with the fields of the contact to update.
+    :type body: ContactModel | ContactUpdateModel
+    :param user: The user to update the contact for.
+    :type user: User
+    :param session: The database session.
+    :type session: AsyncSession
+    :return: None.
+    :rtype: None
+    """
+    if not await repository_contacts.exists_duplicate_contact(
+        body.email, body.phone, user, session, contact_id
+    ):
+        return
+    if await repository_contacts.read_contact_updated_at(contact_id, user, session):
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="The contact's email and/or phone already exist",
+        )
+    raise HTTPException(
+        status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found"
+    )
+
+
+def not_modified_response(etag: str) -> Response:
+    """
+    Creates a 304 Not Modified response for a representation which the client already has.
+
+    :param etag: The current entity tag of the representation.
+    :type etag: str
+    :return: The response without a body.
+    :rtype: Response
+    """
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+
 @router.get("", response_model=List[ContactResponse])
 async def read_contacts(
     offset: int = Query(default=0, ge=0),
@@ -26,12 +148,19 @@ async def read_contacts(
     first_name: str = Query(default=None),
     last_name: str = Query(default=None),
     email: str = Query(default=None),
+    fields: Tuple[str, ...] | None = Depends(parse_contact_fields),
+    with_total: bool = Query(default=False),
+    if_none_match: str = Header(default=None),
     user: User = Depends(auth_service.get_current_user),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
+    cache: Redis = Depends(get_redis_db1),
+    writes: Pipeline = Depends(get_cache_writes),
 ):
     """
     Handles a GET-operation to contacts route and reads a list of contacts for a specific user with specified pagination parameters and search by first name, last name and email.
 
+    With with_total the number of the found contacts is returned in the X-Total-Count header, and X-Total-Count-Exact shows whether it is exact or estimated for a large account.
+
     :param offset: The number of contacts to skip (default = 0, min value = 0).
     :type offset: int
     :param limit: The maximum number of contacts to return (default = 10, min value = 1, max value = 1000).
@@ -42,16 +171,67 @@ async def read_contacts(
     :type last_name: str
     :param email: The string to search by email.
     :type email: str
+    :param fields: The names of the fields to return (comma-separated in the query, all fields by default).
+    :type fields: Tuple[str, ...] | None
+    :param with_total: Whether to return the number of the found contacts (default = False).
+    :type with_total: bool
+    :param if_none_match: The entity tag of the list which the client already has.
+    :type if_none_match: str
     :param user: The user to retrieve contacts for.
     :type user: User
-    :param session: The database session.
+    :param session: The database session, of the read replica if it is available.
     :type session: AsyncSession
-    :return: A list of contacts or None.
-    :rtype: ScalarResult
+    :param cache: The Redis client.
+    :type cache: Redis
+    :param writes: The pipeline of the writes to cache, sent in one round trip.
+    :type writes: Pipeline
+    :return: The JSON response with a list of contacts from cache or the database, or 304 if the client's list is up to date.
+    :rtype: Response
     """
-    return await repository_contacts.read_contacts(
-        offset, limit, first_name, last_name, email, user, session
+    version = await repository_contacts.get_contacts_version(user, cache)
+    etag = make_weak_etag(version)
+    if is_etag_matched(if_none_match, etag):
+        return not_modified_response(etag)
+    key = make_response_cache_key(
+        "contacts",
+        user,
+        version,
+        {
+            "offset": offset,
+            "limit": limit,
+            "first_name": first_name,
+            "last_name": last_name,
+            "email": email,
+            "fields": ",".join(fields) if fields else None,
+        },
     )
+    body = await get_cached_response(key, cache, writes)
+    if body is None:
+        contacts = await repository_contacts.read_contacts(
+            offset, limit, first_name, last_name, email, user, session, fields
+        )
+        body = serialize_contacts(contacts, fields)
+        await set_cached_response(key, body, writes)
+    headers = {"ETag": etag}
+    if with_total:
+        key = make_response_cache_key(
+            "contacts_count",
+            user,
+            version,
+            {"first_name": first_name, "last_name": last_name, "email": email},
+        )
+        total = await get_cached_response(key, cache, writes)
+        if total is None:
+            count, exact = await repository_contacts.count_contacts(
+                first_name, last_name, email, user, session, cache
+            )
+            total = f"{count} {str(exact).lower()}".encode()
+            await set_cached_response(key, total, writes)
+        count, exact = total.decode().split()
+        headers["X-Total-Count"] = count
+        headers["X-Total-Count-Exact"] = exact
+    await writes.execute()
+    return Response(content=body, media_type="application/json", headers=headers)
 
 
 @router.get("/birthdays_in_{n}_days", response_model=List[ContactResponse])
@@ -59,53 +239,263 @@ async def read_contacts_with_birthdays_in_n_days(
     n: int = Path(ge=1, le=31),
     offset: int = Query(default=0, ge=0),
     limit: int = Query(default=10, ge=1, le=1000),
+    if_none_match: str = Header(default=None),
     user: User = Depends(auth_service.get_current_user),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
+    cache: Redis = Depends(get_redis_db1),
+    writes: Pipeline = Depends(get_cache_writes),
 ):
     """
     Handles a GET-operation to '/birthdays_in_{n}_days' contacts subroute and reads a list of contacts with birthdays in n day(s) for a specific user with specified pagination parameters.
 
+    The contacts are taken from the user's precomputed list of birthdays in the next 31 days, or from the Redis index of birthdays if the list is stale.
+
     :param n: The number of days to find contacts' birthdays (min value = 1, max value = 31, 1 - only for today)
     :type n: int
     :param offset: The number of contacts to skip (default = 0, min value = 0).
     :type offset: int
     :param limit: The maximum number of contacts to return (default = 10, min value = 1, max value = 1000).
     :type limit: int
+    :param if_none_match: The entity tag of the list which the client already has.
+    :type if_none_match: str
     :param user: The user to retrieve contacts for.
     :type user: User
+    :param session: The database session, of the read replica if it is available.
+    :type session: AsyncSession
+    :param cache: The Redis client.
+    :type cache: Redis
+    :param writes: The pipeline of the writes to cache, sent in one round trip.
+    :type writes: Pipeline
+    :return: The JSON response with a list of contacts with birthdays in n day(s) from cache or the database, or 304 if the client's list is up to date.
+    :rtype: Response
+    """
+    version = await repository_contacts.get_contacts_version(user, cache)
+    today = get_local_today(user.timezone)
+    etag = make_weak_etag(version, today.isoformat())
+    if is_etag_matched(if_none_match, etag):
+        return not_modified_response(etag)
+    key = make_response_cache_key(
+        "contacts_birthdays",
+        user,
+        version,
+        {"n": n, "offset": offset, "limit": limit, "today": today.isoformat()},
+    )
+    body = await get_cached_response(key, cache, writes)
+    if body is None:
+        digest = await read_birthday_digest(user, today, version, cache)
+        if digest is None:
+            contact_ids = await read_upcoming_birthday_ids(
+                user, today, n, session, cache
+            )
+        else:
+            contact_ids = [
+                contact_id for delta_days, contact_id in digest if delta_days < n
+            ]
+        contact_ids = contact_ids[offset : offset + limit]
+        contacts = await repository_contacts.read_contacts_by_ids(
+            contact_ids, user, session
+        )
+        contacts = {contact["id"]: contact for contact in contacts}
+        body = serialize_contacts(
+            contacts[contact_id] for contact_id in contact_ids if contact_id in contacts
+        )
+        await set_cached_response(key, body, writes)
+    await writes.execute()
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
+@router.get("/changes", response_model=ContactChangesResponse)
+async def read_contact_changes(
+    since: str = Query(default=None),
+    limit: int = Query(default=100, ge=1, le=1000),
+    user: User = Depends(auth_service.get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Handles a GET-operation to '/changes' contacts subroute and reads the contacts created or updated and the IDs of the contacts deleted since the cursor for a specific user.
+
+    Without a cursor all contacts are returned and no tombstones. The returned cursor is passed as since in the next request, until has_more is False.
+    The changes of the last CONTACT_CHANGES_LAG seconds are returned by a later request, so the changes committed out of order are not skipped.
+    The tombstones are never deleted, so a client can resume from a cursor of any age.
+
+    :param since: The cursor returned by the previous request.
+    :type since: str
+    :param limit: The maximum number of contacts and deleted IDs to return (default = 100, min value = 1, max value = 1000).
+    :type limit: int
+    :param user: The user to retrieve changes for.
+    :type user: User
+    :param session: The database session.
+    :type session: AsyncSession
+    :return: The changed contacts, the deleted contacts' IDs, the next cursor and whether there are more changes.
+    :rtype: dict
+    """
+    until = await repository_contacts.read_changes_horizon(session)
+    if since is None:
+        contacts_after = None
+        deletion = await repository_contacts.read_last_contact_deletion(
+            until, user, session
+        )
+        deletions_after = (
+            None if deletion is None else (deletion["deleted_at"], deletion["id"])
+        )
+    else:
+        try:
+            positions = decode_cursor(since)
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail="Invalid cursor",
+            )
+        contacts_after = positions.get("contacts")
+        deletions_after = positions.get("deleted")
+    contacts, deletions = await repository_contacts.read_contact_changes(
+        contacts_after, deletions_after, until, limit, user, session
+    )
+    has_more = len(contacts) > limit or len(deletions) > limit
+    contacts, deletions = contacts[:limit], deletions[:limit]
+    if contacts:
+        contacts_after = (contacts[-1]["updated_at"], contacts[-1]["id"])
+    if deletions:
+        deletions_after = (deletions[-1]["deleted_at"], deletions[-1]["id"])
+    return {
+        "contacts": [dict(contact) for contact in contacts],
+        "deleted": [deletion["contact_id"] for deletion in deletions],
+        "cursor": encode_cursor(
+            {"contacts": contacts_after, "deleted": deletions_after}
+        ),
+        "has_more": has_more,
+    }
+
+
+@router.get("/stats", response_model=ContactStatsResponse)
+async def read_contact_stats(
+    weeks: int = Query(default=12, ge=1, le=104),
+    approximate: bool = Query(default=False),
+    if_none_match: str = Header(default=None),
+    user: User = Depends(auth_service.get_current_user),
+    session: AsyncSession = Depends(get_session),
+    cache: Redis = Depends(get_redis_db1),
+    writes: Pipeline = Depends(get_cache_writes),
+):
+    """
+    Handles a GET-operation to '/stats' contacts subroute and reads the statistics of the contacts for a specific user.
+
+    :param weeks: The number of the last weeks of the growth, including the current one (default = 12, min value = 1, max value = 104).
+    :type weeks: int
+    :param approximate: Whether the counts may be estimated from a sample, for large accounts (default = False).
+    :type approximate: bool
+    :param if_none_match: The entity tag of the statistics which the client already has.
+    :type if_none_match: str
+    :param user: The user to retrieve the statistics for.
+    :type user: User
     :param session: The database session.
     :type session: AsyncSession
-    :return: A list of contacts with birthdays in n day(s) or None.
-    :rtype: List[Contact] | None
+    :param cache: The Redis client.
+    :type cache: Redis
+    :param writes: The pipeline of the writes to cache, sent in one round trip.
+    :type writes: Pipeline
+    :return: The JSON response with the statistics from cache or the database, or 304 if the client's statistics are up to date.
+    :rtype: Response
     """
-    return await repository_contacts.read_contacts_with_birthdays_in_n_days(
-        n, offset, limit, user, session
+    today = datetime.now(timezone.utc).date()
+    since = today - timedelta(days=today.weekday(), weeks=weeks - 1)
+    version = await repository_contacts.get_contacts_version(user, cache)
+    etag = make_weak_etag(version, since, approximate)
+    if is_etag_matched(if_none_match, etag):
+        return not_modified_response(etag)
+    key = make_response_cache_key(
+        "contacts_stats",
+        user,
+        version,
+        {"since": since, "weeks": weeks, "approximate": approximate},
+    )
+    body = await get_cached_response(key, cache, writes)
+    if body is None:
+        stats = await repository_contacts.read_contact_stats(
+            since, weeks, approximate, user, session, cache
+        )
+        body = ContactStatsResponse(**stats).model_dump_json().encode()
+        await set_cached_response(key, body, writes)
+    await writes.execute()
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
+
+@router.get("/events", response_class=StreamingResponse)
+async def read_contact_events(
+    last_event_id: str = Header(default=None),
+    user: User = Depends(auth_service.get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Handles a GET-operation to '/events' contacts subroute and streams the server-sent events of the created, updated and deleted contacts of a specific user.
+
+    The events have the IDs of the contacts only. A heartbeat comment is sent when there are no events, and the stream resumes after the Last-Event-ID header on reconnection.
+
+    :param last_event_id: The ID of the last event the client has received.
+    :type last_event_id: str
+    :param user: The user to stream events for.
+    :type user: User
+    :param session: The database session, which is closed before streaming.
+    :type session: AsyncSession
+    :return: The stream of the server-sent events.
+    :rtype: StreamingResponse
+    """
+    try:
+        wake = contact_events_broker.open(user.id)
+    except TooManyStreams:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many event streams",
+        )
+    await session.close()
+    return StreamingResponse(
+        contact_events_broker.events(user.id, wake, last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        background=BackgroundTask(contact_events_broker.close_stream, user.id, wake),
     )
 
 
 @router.get("/{contact_id}", response_model=ContactResponse)
 async def read_contact(
     contact_id: UUID4 | int,
+    response: Response,
+    if_none_match: str = Header(default=None),
     user: User = Depends(auth_service.get_current_user),
-    session: AsyncSession = Depends(get_session),
+    session: AsyncSession = Depends(get_read_session),
 ):
     """
     Handles a GET-operation to '/{contact_id}' contacts subroute and reads a single contact with the specified ID for a specific user.
 
+    With an If-None-Match header only the time of the last update of the contact is queried and 304 is returned if it is not changed.
+
     :param contact_id: The ID of the contact to retrieve
     :type contact_id: UUID4 | int
+    :param response: The response to set the ETag header for.
+    :type response: Response
+    :param if_none_match: The entity tag of the contact which the client already has.
+    :type if_none_match: str
     :param user: The user to retrieve contacts for.
     :type user: User
-    :param session: The database session.
+    :param session: The database session, of the read replica if it is available.
     :type session: AsyncSession
     :return: The contact with the specified ID.
     :rtype: Contact
     """
+    if if_none_match:
+        updated_at = await repository_contacts.read_contact_updated_at(
+            contact_id, user, session
+        )
+        if updated_at is not None:
+            etag = make_weak_etag(updated_at.isoformat())
+            if is_etag_matched(if_none_match, etag):
+                return not_modified_response(etag)
     contact = await repository_contacts.read_contact(contact_id, user, session)
     if contact is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found"
         )
+    response.headers["ETag"] = make_weak_etag(contact.updated_at.isoformat())
     return contact
 
 
@@ -114,6 +504,7 @@ async def create_contact(
     body: ContactModel,
     user: User = Depends(auth_service.get_current_user),
     session: AsyncSession = Depends(get_session),
+    cache: Redis = Depends(get_redis_db1),
 ):
     """
     Handles a POST-operation to contacts route and creates a new contact for a specific user.
@@ -124,10 +515,12 @@ async def create_contact(
     :type user: User
     :param session: The database session.
     :type session: AsyncSession
+    :param cache: The Redis client.
+    :type cache: Redis
     :return: The newly created contact.
     :rtype: Contact
     """
-    contact = await repository_contacts.create_contact(body, user, session)
+    contact = await repository_contacts.create_contact(body, user, session, cache)
     if contact is None:
         raise HTTPException(
             status_code=status.HTTP_409_CONFLICT,
@@ -136,12 +529,82 @@ async def create_contact(
     return contact
 
 
+@router.post("/batch_get", response_model=ContactBatchResponse)
+async def read_contacts_by_ids(
+    body: ContactIdsModel,
+    user: User = Depends(auth_service.get_current_user),
+    session: AsyncSession = Depends(get_session),
+):
+    """
+    Handles a POST-operation to '/batch_get' contacts subroute and reads the contacts with the specified IDs for a specific user in one query.
+
+    :param body: The request body with the IDs of the contacts to retrieve.
+    :type body: ContactIdsModel
+    :param user: The user to retrieve contacts for.
+    :type user: User
+    :param session: The database session.
+    :type session: AsyncSession
+    :return: The found contacts in the order of the IDs and the IDs of the missing ones.
+    :rtype: dict
+    """
+    contact_ids = list(dict.fromkeys(body.ids))
+    contacts = await repository_contacts.read_contacts_by_ids(
+        contact_ids, user, session
+    )
+    contacts = {contact["id"]: contact for contact in contacts}
+    return {
+        "found": [
+            dict(contacts[contact_id])
+            for contact_id in contact_ids
+            if contact_id in contacts
+        ],
+        "missing": [
+            contact_id for contact_id in contact_ids if contact_id not in contacts
+        ],
+    }
+
+
+@router.post("/batch_delete", response_model=ContactBatchDeleteResponse)
+async def delete_contacts_by_ids(
+    body: ContactIdsModel,
+    user: User = Depends(auth_service.get_current_user),
+    session: AsyncSession = Depends(get_session),
+    cache: Redis = Depends(get_redis_db1),
+):
+    """
+    Handles a POST-operation to '/batch_delete' contacts subroute and deletes the contacts with the specified IDs for a specific user in one statement.
+
+    :param body: The request body with the IDs of the contacts to delete.
+    :type body: ContactIdsModel
+    :param user: The user to delete contacts for.
+    :type user: User
+    :param session: The database session.
+    :type session: AsyncSession
+    :param cache: The Redis client.
+    :type cache: Redis
+    :return: The IDs of the deleted contacts and of the missing ones.
+    :rtype: dict
+    """
+    contact_ids = list(dict.fromkeys(body.ids))
+    deleted = await repository_contacts.delete_contacts_by_ids(
+        contact_ids, user, session, cache
+    )
+    deleted = set(deleted)
+    return {
+        "deleted": [contact_id for contact_id in contact_ids if contact_id in deleted],
+        "missing": [
+            contact_id for contact_id in contact_ids if contact_id not in deleted
+        ],
+    }
+
+
 @router.put("/{contact_id}", response_model=ContactResponse)
 async def update_contact(
     contact_id: UUID4 | int,
     body: ContactModel,
     user: User = Depends(auth_service.get_current_user),
     session: AsyncSession = Depends(get_session),
+    cache: Redis = Depends(get_redis_db1),
 ):
     """
     Handles a PUT-operation to '/{contact_id}' contacts subroute and updates a single contact with the specified ID for a specific user.
@@ -154,14 +617,77 @@ async def update_contact(
     :type user: User
     :param session: The database session.
     :type session: AsyncSession
+    :param cache: The Redis client.
+    :type cache: Redis
     :return: The updated contact.
     :rtype: Contact
     """
-    contact = await repository_contacts.update_contact(contact_id, body, user, session)
+    await check_duplicate_contact(contact_id, body, user, session)
+    contact = await repository_contacts.update_contact(
+        contact_id, body, user, session, cache
+    )
+    if contact is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found"
+        )
+    return contact
+
+
+@router.patch("/{contact_id}", response_model=ContactResponse)
+async def patch_contact(
+    contact_id: UUID4 | int,
+    body: ContactUpdateModel,
+    response: Response,
+    if_match: str = Header(default=None),
+    user: User = Depends(auth_service.get_current_user),
+    session: AsyncSession = Depends(get_session),
+    cache: Redis = Depends(get_redis_db1),
+):
+    """
+    Handles a PATCH-operation to '/{contact_id}' contacts subroute and partially updates a single contact with the specified ID for a specific user.
+
+    With an If-Match header the contact is updated only if its ETag is not changed, otherwise 412 is returned.
+
+    An email or phone which another contact of the user already has returns 409.
+
+    :param contact_id: The ID of the contact to update
+    :type contact_id: UUID4 | int
+    :param body: The request body with the fields of the contact to update.
+    :type body: ContactUpdateModel
+    :param response: The response to set the ETag header for.
+    :type response: Response
+    :param if_match: The entity tag of the contact which the client has updated.
+    :type if_match: str
+    :param user: The user to update the contact for.
+    :type user: User
+    :param session: The database session.
+    :type session: AsyncSession
+    :param cache: The Redis client.
+    :type cache: Redis
+    :return: The updated contact.
+    :rtype: RowMapping
+    """
+    if not body.model_fields_set:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="No fields to update",
+        )
+    await check_duplicate_contact(contact_id, body, user, session)
+    contact = await repository_contacts.patch_contact(
+        contact_id, body, user, session, cache, parse_if_match(if_match)
+    )
     if contact is None:
+        if if_match and await repository_contacts.read_contact_updated_at(
+            contact_id, user, session
+        ):
+            raise HTTPException(
+                status_code=status.HTTP_412_PRECONDITION_FAILED,
+                detail="The contact has been changed",
+            )
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found"
         )
+    response.headers["ETag"] = make_weak_etag(contact["updated_at"].isoformat())
     return contact
 
 
@@ -170,6 +696,7 @@ async def delete_contact(
     contact_id: UUID4 | int,
     user: User = Depends(auth_service.get_current_user),
     session: AsyncSession = Depends(get_session),
+    cache: Redis = Depends(get_redis_db1),
 ):
     """
     Handles a DELETE-operation to '/{contact_id}' contacts subroute and deletes a single contact with the specified ID for a specific user.
@@ -180,10 +707,12 @@ async def delete_contact(
     :type user: User
     :param session: The database session.
     :type session: AsyncSession
+    :param cache: The Redis client.
+    :type cache: Redis
     :return: None.
     :rtype: None
     """
-    contact = await repository_contacts.delete_contact(contact_id, user, session)
+    contact = await repository_contacts.delete_contact(contact_id, user, session, cache)
     if contact is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Contact not found"
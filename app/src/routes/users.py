@@ -3,8 +3,6 @@ Module of users' routes
 """
 
 
-import cloudinary
-import cloudinary.uploader
 from fastapi import APIRouter, HTTPException, Depends, UploadFile, File, status
 from redis.asyncio.client import Redis
 from sqlalchemy.ext.asyncio import AsyncSession
@@ -13,6 +11,8 @@ from src.database.connect_db import get_session, get_redis_db1
 from src.database.models import User
 from src.repository import users as repository_users
 from src.services.auth import auth_service
+from src.services.avatars import process_avatar
+from src.services.storage import AvatarStorage, get_avatar_storage
 from src.conf.config import settings
 from src.schemas.users import UserDb
 
@@ -39,6 +39,7 @@ async def update_avatar(
     user: User = Depends(auth_service.get_current_user),
     session: AsyncSession = Depends(get_session),
     cache: Redis = Depends(get_redis_db1),
+    storage: AvatarStorage = Depends(get_avatar_storage),
 ):
     """
     Handles a PATCH-operation to '/avatar' users subroute and updates an user's avatar.
@@ -51,25 +52,19 @@ async def update_avatar(
     :type session: AsyncSession
     :param cache: The Redis client.
     :type cache: Redis
+    :param storage: The avatar storage.
+    :type storage: AvatarStorage
     :return: The updated user.
     :rtype: User
     """
-    cloudinary.config(
-        cloud_name=settings.cloudinary_cloud_name,
-        api_key=settings.cloudinary_api_key,
-        api_secret=settings.cloudinary_api_secret,
-        secure=True,
-    )
     api_name = settings.api_name.replace(" ", "_")
     try:
-        r = cloudinary.uploader.upload(
-            file.file,
-            public_id=f"{api_name}/{user.username}",
-            overwrite=True,
-        )
-        src_url = cloudinary.CloudinaryImage(f"{api_name}/{user.username}").build_url(
-            width=250, height=250, crop="fill", version=r.get("version")
-        )
+        digest, avatar = await process_avatar(file, user.avatar)
+        if avatar is None:
+            return user
+        src_url = await storage.save(f"{api_name}/{digest}", avatar)
+    except HTTPException:
+        raise
     except Exception as error_message:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
@@ -4,7 +4,11 @@ Module of contacts' schemas
 
 
 from datetime import datetime, date
-from pydantic import BaseModel, Field, EmailStr, UUID4, ConfigDict
+from pydantic import BaseModel, Field, EmailStr, UUID4, ConfigDict, field_validator
+from typing import Dict, List
+from typing_extensions import TypedDict
+
+from src.conf.config import settings
 
 
 class ContactModel(BaseModel):
@@ -16,6 +20,22 @@ class ContactModel(BaseModel):
     address: str = Field(max_length=254)
 
 
+class ContactUpdateModel(BaseModel):
+    first_name: str | None = Field(default=None, min_length=2, max_length=254)
+    last_name: str | None = Field(default=None, min_length=2, max_length=254)
+    email: EmailStr | None = None
+    phone: str | None = Field(default=None, max_length=38)
+    birthday: date | None = None
+    address: str | None = Field(default=None, max_length=254)
+
+    @field_validator("first_name", "last_name", "birthday")
+    @classmethod
+    def validate_not_null(cls, value):
+        if value is None:
+            raise ValueError("The field can not be null")
+        return value
+
+
 class ContactResponse(ContactModel):
     model_config = ConfigDict(from_attributes=True)
 
@@ -23,3 +43,46 @@ class ContactResponse(ContactModel):
     created_at: datetime
     updated_at: datetime
     user_id: UUID4 | int
+
+
+class ContactIdsModel(BaseModel):
+    ids: List[UUID4 | int] = Field(
+        min_length=1, max_length=settings.contacts_batch_max_size
+    )
+
+
+class ContactBatchResponse(BaseModel):
+    found: List[ContactResponse]
+    missing: List[UUID4 | int]
+
+
+class ContactBatchDeleteResponse(BaseModel):
+    deleted: List[UUID4 | int]
+    missing: List[UUID4 | int]
+
+
+class ContactChangesResponse(BaseModel):
+    contacts: List[ContactResponse]
+    deleted: List[UUID4 | int]
+    cursor: str
+    has_more: bool
+
+
+class ContactWeekCount(BaseModel):
+    week: date
+    count: int
+
+
+class ContactStatsResponse(BaseModel):
+    total: int
+    missing_email: int
+    missing_phone: int
+    by_birth_month: Dict[int, int]
+    growth_per_week: List[ContactWeekCount]
+    approximate: bool
+
+
+ContactRow = TypedDict(
+    "ContactRow",
+    {name: field.annotation for name, field in ContactResponse.model_fields.items()},
+)
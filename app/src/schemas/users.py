@@ -4,13 +4,32 @@ Module of users' schemas
 
 
 from datetime import datetime
-from pydantic import BaseModel, Field, EmailStr, HttpUrl, UUID4, ConfigDict
+from pydantic import (
+    BaseModel,
+    Field,
+    EmailStr,
+    HttpUrl,
+    UUID4,
+    ConfigDict,
+    field_validator,
+)
+from zoneinfo import ZoneInfo
 
 
 class UserModel(BaseModel):
     username: str = Field(min_length=2, max_length=254)
     email: EmailStr
     password: str = Field(min_length=8, max_length=72)
+    timezone: str = Field(default="UTC", max_length=64)
+
+    @field_validator("timezone")
+    @classmethod
+    def validate_timezone(cls, value: str) -> str:
+        try:
+            ZoneInfo(value)
+        except (ValueError, KeyError):
+            raise ValueError("Unknown timezone")
+        return value
 
 
 class UserRequestEmail(BaseModel):
@@ -30,6 +49,7 @@ class UserDb(BaseModel):
     created_at: datetime
     updated_at: datetime
     avatar: HttpUrl
+    timezone: str
     role: str
 
 
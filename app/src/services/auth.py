@@ -5,6 +5,7 @@ Module of authentication class and methods
 
 from datetime import datetime, timedelta, timezone
 from os import urandom
+import pickle
 from typing import Optional
 
 from jose import JWTError, jwt
@@ -12,11 +13,19 @@ from fastapi import HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordBearer
 from passlib.context import CryptContext
 from redis.asyncio.client import Redis
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.conf.config import settings
-from src.database.connect_db import get_session, get_redis_db1
+from src.database.connect_db import (
+    get_session,
+    get_redis_db1,
+    open_replica_session,
+    ReplicaSession,
+)
+from src.database.models import User
 from src.repository import users as repository_users
+from src.services.cache_loader import CacheLoader
 
 
 class Auth:
@@ -24,6 +33,9 @@ class Auth:
     SECRET_KEY = urandom(settings.secret_key_length)
     ALGORITHM = settings.algorithm
     oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/auth/login")
+    cache_loader = CacheLoader(
+        settings.cache_early_expiration_beta, settings.cache_lock_timeout
+    )
 
     def verify_password(self, plain_password: str, hashed_password: str):
         """
@@ -318,7 +330,9 @@ class Auth:
         cache: Redis = Depends(get_redis_db1),
     ):
         """
-        Gets the current user.
+        Gets the current user from cache, or from the read replica if it is available, and from the primary if the user is not found on the replica.
+
+        Concurrent misses of the user in cache are coalesced, so the user is loaded from the database once and the other requests await it.
 
         :param access_token: The access token to decode.
         :type access_token: str
@@ -347,13 +361,63 @@ class Auth:
                 raise credentials_exception
         except JWTError:
             raise credentials_exception
-        user = await repository_users.get_user_by_email_from_cache(email, cache)
-        if user is None:
-            user = await repository_users.get_user_by_email(email, session)
+
+        async def load_user() -> bytes | None:
+            user = None
+            replica_session = await open_replica_session(email, cache)
+            if replica_session is not None:
+                read_session = ReplicaSession(replica_session, session)
+                try:
+                    user = await repository_users.get_user_by_email(email, read_session)
+                finally:
+                    await read_session.close()
             if user is None:
-                raise credentials_exception
-            await repository_users.set_user_in_cache(user, cache)
-        return user
+                user = await repository_users.get_user_by_email(email, session)
+            if user is not None:
+                return pickle.dumps(user)
+
+        user = await self.cache_loader.get(
+            f"user: {email}", load_user, cache, settings.redis_expire
+        )
+        if user is None:
+            raise credentials_exception
+        return pickle.loads(user)
 
 
 auth_service = Auth()
+
+
+async def get_read_session(
+    user: User = Depends(auth_service.get_current_user),
+    session: AsyncSession = Depends(get_session),
+    cache: Redis = Depends(get_redis_db1),
+):
+    """
+    Gets a session for the reads of the current user: of the read replica if it is available and the user has not written recently, otherwise of the primary.
+
+    A query which fails on the replica is retried on the primary, so a failure of the replica does not fail the request.
+
+    :param user: The current user.
+    :type user: User
+    :param session: The database session of the primary.
+    :type session: AsyncSession
+    :param cache: The Redis client.
+    :type cache: Redis
+    :return: The database session.
+    :rtype: AsyncSession
+    """
+    replica_session = await open_replica_session(user.email, cache)
+    if replica_session is None:
+        yield session
+        return
+    read_session = ReplicaSession(replica_session, session)
+    try:
+        yield read_session
+    except SQLAlchemyError as error_message:
+        await read_session.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Database error: {str(error_message)}",
+        )
+    finally:
+        await read_session.close()
@@ -0,0 +1,111 @@
+"""
+Module of avatar processing functions
+"""
+
+
+import asyncio
+from functools import lru_cache
+from hashlib import sha256
+import io
+from tempfile import SpooledTemporaryFile
+from typing import BinaryIO, Tuple
+
+from fastapi import HTTPException, UploadFile, status
+from libgravatar import Gravatar
+from PIL import Image, ImageOps
+
+from src.conf.config import settings
+
+
+AVATAR_SIZE = (250, 250)
+CHUNK_SIZE = 64 * 1024
+SPOOL_MAX_SIZE = 1024 * 1024
+
+
+@lru_cache(maxsize=1024)
+def get_gravatar_url(email: str) -> str | None:
+    """
+    Gets the Gravatar url for an email.
+
+    :param email: The email.
+    :type email: str
+    :return: The Gravatar url or None.
+    :rtype: str | None
+    """
+    try:
+        return Gravatar(email).get_image()
+    except Exception:
+        return None
+
+
+async def spool_upload(
+    file: UploadFile, max_size: int = settings.avatar_max_size
+) -> Tuple[SpooledTemporaryFile, str]:
+    """
+    Streams an uploaded file to a spooled temporary file by chunks and hashes it on the way.
+
+    :param file: The uploaded file.
+    :type file: UploadFile
+    :param max_size: The maximum size of the file in bytes.
+    :type max_size: int
+    :return: The spooled temporary file rewound to the start and the SHA-256 hex digest of the file.
+    :rtype: Tuple[SpooledTemporaryFile, str]
+    """
+    spooled = SpooledTemporaryFile(max_size=SPOOL_MAX_SIZE)
+    digest = sha256()
+    size = 0
+    while chunk := await file.read(CHUNK_SIZE):
+        size += len(chunk)
+        if size > max_size:
+            spooled.close()
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail="The file is too large",
+            )
+        digest.update(chunk)
+        spooled.write(chunk)
+    spooled.seek(0)
+    return spooled, digest.hexdigest()
+
+
+def resize_avatar(file: BinaryIO) -> bytes:
+    """
+    Crops and resizes an image to the avatar size and encodes it to PNG.
+
+    :param file: The image file.
+    :type file: BinaryIO
+    :return: The PNG-encoded avatar.
+    :rtype: bytes
+    """
+    with Image.open(file) as image:
+        image.draft("RGB", (AVATAR_SIZE[0] * 2, AVATAR_SIZE[1] * 2))
+        avatar = ImageOps.fit(ImageOps.exif_transpose(image), AVATAR_SIZE)
+    if avatar.mode not in ("1", "L", "LA", "P", "RGB", "RGBA"):
+        avatar = avatar.convert("RGB")
+    buffer = io.BytesIO()
+    avatar.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+
+async def process_avatar(
+    file: UploadFile, current_avatar: str | None = None
+) -> Tuple[str, bytes | None]:
+    """
+    Spools and hashes an uploaded image and resizes it to the avatar in a worker thread.
+
+    The image is not decoded when its digest is already part of the current avatar's url.
+
+    :param file: The uploaded image.
+    :type file: UploadFile
+    :param current_avatar: The url of the current avatar.
+    :type current_avatar: str | None
+    :return: The digest of the image and the PNG-encoded avatar, or None if the avatar is unchanged.
+    :rtype: Tuple[str, bytes | None]
+    """
+    spooled, digest = await spool_upload(file)
+    try:
+        if current_avatar and digest in current_avatar:
+            return digest, None
+        return digest, await asyncio.to_thread(resize_avatar, spooled)
+    finally:
+        spooled.close()
@@ -0,0 +1,87 @@
+"""
+Module of the batch computation of upcoming birthdays over columnar arrays
+"""
+
+
+from array import array
+from datetime import date, timedelta
+from functools import lru_cache
+from itertools import compress
+from typing import Iterable, Tuple
+
+from src.repository.contacts import get_upcoming_birthdays
+from src.services.birthday_index import LAST_SCORE
+
+
+MISSING = 0xFFFF
+DAYS_BEFORE_MONTH = (0, 0, 31, 60, 91, 121, 152, 182, 213, 244, 274, 305, 335)
+
+
+def encode_birthdays(birthdays: Iterable[date]) -> array:
+    """
+    Encodes birthdays as a column of their days of the year in a leap year, so February 29 has its own day 60.
+
+    :param birthdays: The birthdays.
+    :type birthdays: Iterable[date]
+    :return: The days of the year from 1 to 366.
+    :rtype: array
+    """
+    return array(
+        "H",
+        (DAYS_BEFORE_MONTH[birthday.month] + birthday.day for birthday in birthdays),
+    )
+
+
+@lru_cache(maxsize=64)
+def get_birthday_ranks(today: date, n: int) -> Tuple[bytes, array, array]:
+    """
+    Computes the order and the numbers of days to the birthdays of every day of the year in n day(s) from today.
+
+    The table is computed with get_upcoming_birthdays from one birthday of every day, so the batch computation has the same leap day semantics.
+
+    :param today: The first day.
+    :type today: date
+    :param n: The number of days (1 - only for today).
+    :type n: int
+    :return: The flags of the days in the window, the ranks and the numbers of days by the days of the year.
+    :rtype: Tuple[bytes, array, array]
+    """
+    window = bytearray(LAST_SCORE + 1)
+    ranks = array("H", [MISSING]) * (LAST_SCORE + 1)
+    deltas = array("H", [MISSING]) * (LAST_SCORE + 1)
+    days = [
+        {"birthday": date(2000, 1, 1) + timedelta(days=score - 1), "score": score}
+        for score in range(1, LAST_SCORE + 1)
+    ]
+    for rank, (delta_days, day) in enumerate(get_upcoming_birthdays(days, today, n)):
+        window[day["score"]] = 1
+        ranks[day["score"]] = rank
+        deltas[day["score"]] = delta_days
+    return bytes(window), ranks, deltas
+
+
+def get_upcoming_birthdays_batch(
+    scores: array, today: date, n: int
+) -> Tuple[array, array]:
+    """
+    Selects the birthdays in n day(s) from today from a column of days of the year and sorts them by the number of days to the birthday.
+
+    The order is the same as of get_upcoming_birthdays for the same rows, but the rows are only filtered through a lookup table
+    with builtins, without a Python loop, and only the selected rows are sorted.
+
+    :param scores: The days of the year of the birthdays, as returned by encode_birthdays.
+    :type scores: array
+    :param today: The first day.
+    :type today: date
+    :param n: The number of days to find birthdays (1 - only for today)
+    :type n: int
+    :return: The numbers of days to the birthdays and the positions of the selected rows.
+    :rtype: Tuple[array, array]
+    """
+    window, ranks, deltas = get_birthday_ranks(today, n)
+    positions = list(compress(range(len(scores)), map(window.__getitem__, scores)))
+    positions.sort(key=lambda position: ranks[scores[position]])
+    return (
+        array("H", (deltas[scores[position]] for position in positions)),
+        array("L", positions),
+    )
@@ -0,0 +1,315 @@
+"""
+Module of the precomputed lists of upcoming birthdays
+"""
+
+
+import asyncio
+from collections import defaultdict
+from datetime import date, datetime
+import json
+import logging
+from time import time_ns
+from typing import Dict, List, Sequence, Tuple
+from uuid import UUID
+from zoneinfo import ZoneInfo
+
+import redis.asyncio as redis
+from redis.asyncio.client import Redis
+from redis.asyncio.lock import Lock
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.conf.config import settings
+from src.database.connect_db import AsyncDBSession, pool_redis_db
+from src.database.models import Contact, User
+from src.repository.contacts import get_contacts_version_key, get_upcoming_birthdays
+
+
+logger = logging.getLogger(__name__)
+
+DIGEST_DAYS = 31
+DIGEST_EXPIRE = 2 * 24 * 60 * 60
+LEADER_KEY = "birthday_digest: leader"
+TIMEZONES_KEY = "birthday_digest: timezones"
+
+Digest = List[Tuple[int, UUID | int]]
+
+
+def get_digest_key(user_id) -> str:
+    """
+    Gets the cache key of the birthday digest of a user.
+
+    :param user_id: The ID of the user.
+    :type user_id: UUID4 | int
+    :return: The cache key.
+    :rtype: str
+    """
+    return f"birthday_digest: {user_id}"
+
+
+def get_local_today(timezone: str | None) -> date:
+    """
+    Gets the current date in a timezone.
+
+    :param timezone: The name of the timezone, UTC if it is None or unknown.
+    :type timezone: str | None
+    :return: The current date in the timezone.
+    :rtype: date
+    """
+    try:
+        return datetime.now(ZoneInfo(timezone or "UTC")).date()
+    except (ValueError, KeyError):
+        return datetime.now(ZoneInfo("UTC")).date()
+
+
+def dump_digest(today: date, version: int, digest: Digest) -> str:
+    """
+    Serializes a birthday digest compactly, as the numbers of days to the birthdays and the contacts' IDs.
+
+    :param today: The first day of the digest.
+    :type today: date
+    :param version: The version of the user's contacts the digest is computed from.
+    :type version: int
+    :param digest: The numbers of days to the birthdays and the contacts' IDs.
+    :type digest: Digest
+    :return: The JSON of the digest.
+    :rtype: str
+    """
+    return json.dumps(
+        {
+            "date": today.isoformat(),
+            "version": version,
+            "days": [delta_days for delta_days, _ in digest],
+            "ids": [
+                contact_id if isinstance(contact_id, int) else str(contact_id)
+                for _, contact_id in digest
+            ],
+        },
+        separators=(",", ":"),
+    )
+
+
+def load_digest(data: str | bytes, today: date, version: int) -> Digest | None:
+    """
+    Deserializes a birthday digest if it is computed for the day and the version.
+
+    :param data: The JSON of the digest.
+    :type data: str | bytes
+    :param today: The first day of the digest.
+    :type today: date
+    :param version: The current version of the user's contacts.
+    :type version: int
+    :return: The numbers of days to the birthdays and the contacts' IDs, or None if the digest is stale.
+    :rtype: Digest | None
+    """
+    data = json.loads(data)
+    if data["date"] != today.isoformat() or data["version"] != version:
+        return None
+    return [
+        (delta_days, contact_id if isinstance(contact_id, int) else UUID(contact_id))
+        for delta_days, contact_id in zip(data["days"], data["ids"])
+    ]
+
+
+async def read_birthday_digest(
+    user: User, today: date, version: int, cache: Redis
+) -> Digest | None:
+    """
+    Reads the birthday digest of a user from cache.
+
+    :param user: The user to read the digest for.
+    :type user: User
+    :param today: The current date in the user's timezone.
+    :type today: date
+    :param version: The current version of the user's contacts.
+    :type version: int
+    :param cache: The Redis client.
+    :type cache: Redis
+    :return: The numbers of days to the birthdays and the contacts' IDs, or None if it is missing or stale.
+    :rtype: Digest | None
+    """
+    data = await cache.get(get_digest_key(user.id))
+    if data is None:
+        return None
+    return load_digest(data, today, version)
+
+
+async def build_birthday_digests(
+    users: Sequence[Tuple[UUID | int, date]], session: AsyncSession, cache: Redis
+) -> Dict[UUID | int, Digest]:
+    """
+    Computes the birthday digests for the next 31 days of users with one query and stores them in cache.
+
+    :param users: The IDs of the users and the current dates in their timezones.
+    :type users: Sequence[Tuple[UUID | int, date]]
+    :param session: The database session.
+    :type session: AsyncSession
+    :param cache: The Redis client.
+    :type cache: Redis
+    :return: The digests by the users' IDs.
+    :rtype: Dict[UUID | int, Digest]
+    """
+    if not users:
+        return {}
+    keys = [get_contacts_version_key(user_id) for user_id, _ in users]
+    async with cache.pipeline(transaction=False) as pipe:
+        for key in keys:
+            pipe.set(key, time_ns(), nx=True)
+        pipe.mget(keys)
+        *_, versions = await pipe.execute()
+    versions = {user_id: int(version) for (user_id, _), version in zip(users, versions)}
+    stmt = select(Contact.id, Contact.user_id, Contact.birthday).filter(
+        Contact.user_id.in_([user_id for user_id, _ in users])
+    )
+    rows = await session.execute(stmt)
+    contacts = defaultdict(list)
+    for contact in rows.mappings():
+        contacts[contact["user_id"]].append(contact)
+    digests = {}
+    async with cache.pipeline(transaction=False) as pipe:
+        for user_id, today in users:
+            digest = [
+                (delta_days, contact["id"])
+                for delta_days, contact in get_upcoming_birthdays(
+                    contacts[user_id], today, DIGEST_DAYS
+                )
+            ]
+            digests[user_id] = digest
+            pipe.set(
+                get_digest_key(user_id),
+                dump_digest(today, versions[user_id], digest),
+                ex=DIGEST_EXPIRE,
+            )
+        await pipe.execute()
+    return digests
+
+
+class BirthdayDigestScheduler:
+    """
+    Precomputes the birthday digests of all users once a day, after midnight in their timezones.
+
+    Every worker runs the scheduler, but only the holder of the leader lock in Redis computes the digests.
+    The digests of a timezone are computed when its date changes, in batches of users.
+    """
+
+    def __init__(
+        self,
+        session_maker: async_sessionmaker = AsyncDBSession,
+        cache: Redis | None = None,
+        interval: float = settings.birthday_digest_interval,
+        batch_size: int = settings.birthday_digest_batch_size,
+    ):
+        self.session_maker = session_maker
+        self.cache = cache or redis.Redis(connection_pool=pool_redis_db)
+        self.interval = interval
+        self.batch_size = batch_size
+        self.lock = Lock(self.cache, LEADER_KEY, timeout=2 * interval)
+        self.task: asyncio.Task | None = None
+
+    async def is_leader(self) -> bool:
+        """
+        Acquires or extends the leader lock.
+
+        :return: True if this worker is the leader, otherwise False.
+        :rtype: bool
+        """
+        if await self.lock.owned():
+            return await self.lock.reacquire()
+        return await self.lock.acquire(blocking=False)
+
+    async def build_timezone(self, timezone: str, today: date) -> int:
+        """
+        Computes the birthday digests of the users in a timezone.
+
+        :param timezone: The name of the timezone.
+        :type timezone: str
+        :param today: The current date in the timezone.
+        :type today: date
+        :return: The number of the users.
+        :rtype: int
+        """
+        count = 0
+        last_id = None
+        async with self.session_maker() as session:
+            while True:
+                stmt = select(User.id).filter(User.timezone == timezone)
+                if last_id is not None:
+                    stmt = stmt.filter(User.id > last_id)
+                user_ids = await session.execute(
+                    stmt.order_by(User.id).limit(self.batch_size)
+                )
+                user_ids = user_ids.scalars().all()
+                if not user_ids:
+                    return count
+                await build_birthday_digests(
+                    [(user_id, today) for user_id in user_ids], session, self.cache
+                )
+                count += len(user_ids)
+                last_id = user_ids[-1]
+
+    async def run_once(self) -> int:
+        """
+        Computes the digests of the timezones whose date has changed since the last run, if this worker is the leader.
+
+        :return: The number of the users whose digests are computed.
+        :rtype: int
+        """
+        if not await self.is_leader():
+            return 0
+        async with self.session_maker() as session:
+            timezones = await session.execute(select(User.timezone).distinct())
+            timezones = timezones.scalars().all()
+        built = await self.cache.hgetall(TIMEZONES_KEY)
+        count = 0
+        for timezone in timezones:
+            today = get_local_today(timezone).isoformat()
+            if built.get(timezone.encode()) == today.encode():
+                continue
+            count += await self.build_timezone(timezone, date.fromisoformat(today))
+            await self.cache.hset(TIMEZONES_KEY, timezone, today)
+        return count
+
+    async def run(self) -> None:
+        """
+        Runs the scheduler until it is stopped.
+
+        :return: None.
+        :rtype: None
+        """
+        while True:
+            try:
+                await self.run_once()
+            except Exception:
+                logger.exception("Birthday digest failed")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        """
+        Starts the scheduler in a background task.
+
+        :return: None.
+        :rtype: None
+        """
+        self.task = asyncio.create_task(self.run())
+
+    async def stop(self) -> None:
+        """
+        Stops the scheduler and releases the leader lock.
+
+        :return: None.
+        :rtype: None
+        """
+        if self.task is not None:
+            self.task.cancel()
+            try:
+                await self.task
+            except asyncio.CancelledError:
+                pass
+        try:
+            if await self.lock.owned():
+                await self.lock.release()
+        except redis.RedisError:
+            pass
+
+
+birthday_digest_scheduler = BirthdayDigestScheduler()
@@ -0,0 +1,234 @@
+"""
+Module of the Redis index of contacts' birthdays by the day of the year
+"""
+
+
+import asyncio
+from collections import defaultdict
+from datetime import date, timedelta
+from typing import Iterable, List, Mapping, Sequence, Tuple
+from uuid import UUID
+
+import redis.asyncio as redis
+from redis.asyncio.client import Pipeline, Redis
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.conf.config import settings
+from src.database.connect_db import AsyncDBSession, pool_redis_db
+from src.database.models import Contact, User
+from src.utils.is_leap_year import is_leap_year
+
+
+BUILT_MEMBER = "built"
+LEAP_DAY_SCORE = 60
+LAST_SCORE = 366
+
+
+def get_birthday_index_key(user_id) -> str:
+    """
+    Gets the key of the sorted set of the contacts' birthdays of a user.
+
+    :param user_id: The ID of the user.
+    :type user_id: UUID4 | int
+    :return: The key of the sorted set.
+    :rtype: str
+    """
+    return f"birthdays: {user_id}"
+
+
+def get_birthday_score(birthday: date) -> int:
+    """
+    Gets the day of the year of a birthday in a leap year, so February 29 has its own score between February 28 and March 1.
+
+    :param birthday: The birthday.
+    :type birthday: date
+    :return: The day of the year from 1 to 366.
+    :rtype: int
+    """
+    return date(2000, birthday.month, birthday.day).timetuple().tm_yday
+
+
+def get_birthday_windows(today: date, n: int) -> List[Tuple[int, int]]:
+    """
+    Gets the ranges of scores of the birthdays in n day(s) from today.
+
+    In a non-leap year the birthdays on February 29 are on March 1, so the score of February 29 is included with March 1.
+    A window over the end of the year is split in two ranges.
+
+    :param today: The first day.
+    :type today: date
+    :param n: The number of days (1 - only for today).
+    :type n: int
+    :return: The inclusive ranges of scores in the order of the days.
+    :rtype: List[Tuple[int, int]]
+    """
+    last_date = today + timedelta(days=n - 1)
+    start = get_birthday_score(today)
+    if start == LEAP_DAY_SCORE + 1 and not is_leap_year(today.year):
+        start = LEAP_DAY_SCORE
+    end = get_birthday_score(last_date)
+    if last_date.year == today.year:
+        return [(start, end)]
+    return [(start, LAST_SCORE), (1, end)]
+
+
+def parse_contact_id(member: str | bytes) -> UUID | int:
+    """
+    Parses a member of the sorted set to the contact's ID.
+
+    :param member: The member.
+    :type member: str | bytes
+    :return: The contact's ID.
+    :rtype: UUID | int
+    """
+    if isinstance(member, bytes):
+        member = member.decode()
+    return int(member) if member.isdigit() else UUID(member)
+
+
+def add_birthdays(pipe: Pipeline, user_id, birthdays: Mapping) -> None:
+    """
+    Queues the indexing of contacts' birthdays on a pipeline.
+
+    :param pipe: The Redis pipeline.
+    :type pipe: Pipeline
+    :param user_id: The ID of the user.
+    :type user_id: UUID4 | int
+    :param birthdays: The birthdays by the contacts' IDs.
+    :type birthdays: Mapping
+    :return: None.
+    :rtype: None
+    """
+    if birthdays:
+        pipe.zadd(
+            get_birthday_index_key(user_id),
+            {
+                str(contact_id): get_birthday_score(birthday)
+                for contact_id, birthday in birthdays.items()
+            },
+        )
+
+
+def remove_birthdays(pipe: Pipeline, user_id, contact_ids: Iterable) -> None:
+    """
+    Queues the removal of contacts from the index on a pipeline.
+
+    :param pipe: The Redis pipeline.
+    :type pipe: Pipeline
+    :param user_id: The ID of the user.
+    :type user_id: UUID4 | int
+    :param contact_ids: The IDs of the contacts.
+    :type contact_ids: Iterable
+    :return: None.
+    :rtype: None
+    """
+    members = [str(contact_id) for contact_id in contact_ids]
+    if members:
+        pipe.zrem(get_birthday_index_key(user_id), *members)
+
+
+async def rebuild_birthday_index(
+    user_ids: Sequence, session: AsyncSession, cache: Redis
+) -> None:
+    """
+    Rebuilds the birthday indexes of users from the database, to repair any drift.
+
+    :param user_ids: The IDs of the users.
+    :type user_ids: Sequence
+    :param session: The database session.
+    :type session: AsyncSession
+    :param cache: The Redis client.
+    :type cache: Redis
+    :return: None.
+    :rtype: None
+    """
+    stmt = select(Contact.id, Contact.user_id, Contact.birthday).filter(
+        Contact.user_id.in_(user_ids)
+    )
+    rows = await session.execute(stmt)
+    birthdays = defaultdict(dict)
+    for contact_id, user_id, birthday in rows:
+        birthdays[user_id][contact_id] = birthday
+    async with cache.pipeline(transaction=True) as pipe:
+        for user_id in user_ids:
+            key = get_birthday_index_key(user_id)
+            pipe.delete(key)
+            pipe.zadd(key, {BUILT_MEMBER: 0})
+            add_birthdays(pipe, user_id, birthdays[user_id])
+        await pipe.execute()
+
+
+async def read_upcoming_birthday_ids(
+    user: User, today: date, n: int, session: AsyncSession, cache: Redis
+) -> List[UUID | int]:
+    """
+    Reads the IDs of the contacts with birthdays in n day(s) from today from the index, sorted by the days to the birthdays.
+
+    The index is checked and read in one round trip, with one or two ZRANGEBYSCORE calls.
+    A missing or partial index is rebuilt first.
+
+    :param user: The user to retrieve contacts for.
+    :type user: User
+    :param today: The first day.
+    :type today: date
+    :param n: The number of days to find contacts' birthdays (1 - only for today)
+    :type n: int
+    :param session: The database session.
+    :type session: AsyncSession
+    :param cache: The Redis client.
+    :type cache: Redis
+    :return: The contacts' IDs.
+    :rtype: List[UUID | int]
+    """
+    key = get_birthday_index_key(user.id)
+    windows = get_birthday_windows(today, n)
+    for _ in range(2):
+        async with cache.pipeline(transaction=False) as pipe:
+            pipe.zscore(key, BUILT_MEMBER)
+            for start, end in windows:
+                pipe.zrangebyscore(key, start, end)
+            built, *ranges = await pipe.execute()
+        if built is not None:
+            break
+        await rebuild_birthday_index([user.id], session, cache)
+    return [parse_contact_id(member) for members in ranges for member in members]
+
+
+async def rebuild_all(
+    session_maker: async_sessionmaker = AsyncDBSession,
+    cache: Redis | None = None,
+    batch_size: int = settings.birthday_digest_batch_size,
+) -> int:
+    """
+    Rebuilds the birthday indexes of all users in batches.
+
+    :param session_maker: The factory of database sessions.
+    :type session_maker: async_sessionmaker
+    :param cache: The Redis client.
+    :type cache: Redis | None
+    :param batch_size: The number of users in a batch.
+    :type batch_size: int
+    :return: The number of the users.
+    :rtype: int
+    """
+    cache = cache or redis.Redis(connection_pool=pool_redis_db)
+    count = 0
+    last_id = None
+    async with session_maker() as session:
+        while True:
+            stmt = select(User.id)
+            if last_id is not None:
+                stmt = stmt.filter(User.id > last_id)
+            user_ids = await session.execute(stmt.order_by(User.id).limit(batch_size))
+            user_ids = user_ids.scalars().all()
+            if not user_ids:
+                return count
+            await rebuild_birthday_index(user_ids, session, cache)
+            count += len(user_ids)
+            last_id = user_ids[-1]
+
+
+if __name__ == "__main__":
+    count = asyncio.run(rebuild_all())
+    print(f"Rebuilt the birthday indexes of {count} users")
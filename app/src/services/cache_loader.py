@@ -0,0 +1,203 @@
+"""
+Module of the single-flight loading of values missing in Redis
+"""
+
+
+import asyncio
+from math import log
+from random import random
+import time
+from typing import Awaitable, Callable, Dict
+
+from redis.asyncio.client import Redis
+from redis.asyncio.lock import Lock
+from redis.exceptions import LockError
+
+
+Loader = Callable[[], Awaitable[bytes | None]]
+
+
+class CacheLoader:
+    """
+    Loads values missing in Redis once for all concurrent requests.
+
+    Concurrent misses of a key in a worker await a single load, and the workers share a short lock in Redis, so only its holder loads the value while the others wait for it to appear in Redis. Hot keys are refreshed before they expire by probabilistic early expiration.
+    """
+
+    def __init__(
+        self, beta: float = 1, lock_timeout: float = 5, poll_interval: float = 0.05
+    ) -> None:
+        """
+        Initializes the loader.
+
+        :param beta: The factor of early expiration, the larger it is the earlier keys are refreshed (0 disables early expiration).
+        :type beta: float
+        :param lock_timeout: The time to live of the lock of a key being loaded in seconds, and the maximum time to wait for the value loaded by another worker.
+        :type lock_timeout: float
+        :param poll_interval: The interval of checks of the value loaded by another worker in seconds.
+        :type poll_interval: float
+        :return: None.
+        :rtype: None
+        """
+        self.beta = beta
+        self.lock_timeout = lock_timeout
+        self.poll_interval = poll_interval
+        self.load_time = 0.0
+        self.flights: Dict[str, asyncio.Future] = {}
+
+    def is_expiring(self, ttl: int) -> bool:
+        """
+        Decides randomly whether a value should be refreshed before it expires, with the probability growing as its time to live comes closer to the time of loading it.
+
+        :param ttl: The remaining time to live of the value in milliseconds (negative if it does not expire).
+        :type ttl: int
+        :return: Whether to refresh the value.
+        :rtype: bool
+        """
+        if ttl < 0:
+            return False
+        return -self.load_time * self.beta * log(1 - random()) * 1000 >= ttl
+
+    async def get(
+        self, key: str, load: Loader, cache: Redis, expire: int
+    ) -> bytes | None:
+        """
+        Gets a value from Redis, loading and caching it if it is missing or expiring.
+
+        The load runs with the session and the Redis client of the request which started it, so it is cancelled with that request,
+        and the requests waiting for it retry with their own ones. A cancelled waiter does not cancel the load.
+
+        :param key: The key of the value.
+        :type key: str
+        :param load: The function which loads the value, or None if it does not exist.
+        :type load: Loader
+        :param cache: The Redis client.
+        :type cache: Redis
+        :param expire: The time to live of the loaded value in seconds.
+        :type expire: int
+        :return: The value, or None if it does not exist.
+        :rtype: bytes | None
+        """
+        async with cache.pipeline(transaction=False) as pipe:
+            pipe.get(key)
+            pipe.pttl(key)
+            value, ttl = await pipe.execute()
+        if value is not None and not self.is_expiring(ttl):
+            return value
+        flight = self.flights.get(key)
+        if flight is None:
+            flight = asyncio.ensure_future(
+                self.load_once(key, value, load, cache, expire)
+            )
+            self.flights[key] = flight
+            flight.add_done_callback(lambda done: self.forget(key, done))
+            return await flight
+        if value is not None:
+            return value
+        try:
+            return await asyncio.shield(flight)
+        except asyncio.CancelledError:
+            if asyncio.current_task().cancelling() or not flight.cancelled():
+                raise
+        return await self.get(key, load, cache, expire)
+
+    def forget(self, key: str, flight: asyncio.Future) -> None:
+        """
+        Removes a finished load of a key, unless another load of the key has already replaced it.
+
+        :param key: The key of the value.
+        :type key: str
+        :param flight: The finished load.
+        :type flight: asyncio.Future
+        :return: None.
+        :rtype: None
+        """
+        if self.flights.get(key) is flight:
+            del self.flights[key]
+
+    async def load_once(
+        self, key: str, stale: bytes | None, load: Loader, cache: Redis, expire: int
+    ) -> bytes | None:
+        """
+        Loads a value by the worker which holds the lock of its key, while the other workers return the stale value or wait for the loaded one.
+
+        :param key: The key of the value.
+        :type key: str
+        :param stale: The expiring value, or None if it is missing.
+        :type stale: bytes | None
+        :param load: The function which loads the value.
+        :type load: Loader
+        :param cache: The Redis client.
+        :type cache: Redis
+        :param expire: The time to live of the loaded value in seconds.
+        :type expire: int
+        :return: The value, or None if it does not exist.
+        :rtype: bytes | None
+        """
+        lock = Lock(cache, f"lock: {key}", timeout=self.lock_timeout)
+        if not await lock.acquire(blocking=False):
+            if stale is not None:
+                return stale
+            value = await self.wait(key, lock, cache)
+            if value is not None:
+                return value
+            return await self.load_and_set(key, load, cache, expire)
+        try:
+            return await self.load_and_set(key, load, cache, expire)
+        finally:
+            try:
+                await lock.release()
+            except LockError:
+                pass
+
+    async def wait(self, key: str, lock: Lock, cache: Redis) -> bytes | None:
+        """
+        Waits for a value loaded by another worker until its lock is released or expires.
+
+        :param key: The key of the value.
+        :type key: str
+        :param lock: The lock of the key.
+        :type lock: Lock
+        :param cache: The Redis client.
+        :type cache: Redis
+        :return: The loaded value, or None if it has not appeared.
+        :rtype: bytes | None
+        """
+        deadline = time.monotonic() + self.lock_timeout
+        while time.monotonic() < deadline:
+            await asyncio.sleep(self.poll_interval)
+            async with cache.pipeline(transaction=False) as pipe:
+                pipe.get(key)
+                pipe.exists(lock.name)
+                value, locked = await pipe.execute()
+            if value is not None or not locked:
+                return value
+        return None
+
+    async def load_and_set(
+        self, key: str, load: Loader, cache: Redis, expire: int
+    ) -> bytes | None:
+        """
+        Loads a value, caches it and updates the average time of loading.
+
+        :param key: The key of the value.
+        :type key: str
+        :param load: The function which loads the value.
+        :type load: Loader
+        :param cache: The Redis client.
+        :type cache: Redis
+        :param expire: The time to live of the loaded value in seconds.
+        :type expire: int
+        :return: The value, or None if it does not exist.
+        :rtype: bytes | None
+        """
+        started = time.monotonic()
+        value = await load()
+        load_time = time.monotonic() - started
+        if self.load_time:
+            self.load_time = 0.8 * self.load_time + 0.2 * load_time
+        else:
+            self.load_time = load_time
+        if value is not None:
+            await cache.set(key, value, ex=expire)
+        return value
@@ -0,0 +1,137 @@
+"""
+Module of response compression
+"""
+
+
+import asyncio
+import gzip
+from typing import Dict
+
+import brotli
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.conf.config import settings
+
+
+ENCODINGS = ("br", "gzip")
+
+
+def parse_accept_encoding(accept_encoding: str) -> Dict[str, float]:
+    """
+    Parses an Accept-Encoding header to the quality values of the encodings.
+
+    :param accept_encoding: The value of the header.
+    :type accept_encoding: str
+    :return: The quality values by encodings.
+    :rtype: Dict[str, float]
+    """
+    qualities = {}
+    for item in accept_encoding.split(","):
+        encoding, _, params = item.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if encoding:
+            qualities[encoding.strip().lower()] = quality
+    return qualities
+
+
+def select_encoding(accept_encoding: str) -> str | None:
+    """
+    Selects the preferred supported encoding of a request.
+
+    :param accept_encoding: The value of the Accept-Encoding header.
+    :type accept_encoding: str
+    :return: The encoding or None if no supported encoding is accepted.
+    :rtype: str | None
+    """
+    qualities = parse_accept_encoding(accept_encoding)
+    wildcard = qualities.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for encoding in ENCODINGS:
+        quality = qualities.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    """
+    Compresses a body with the encoding.
+
+    :param body: The body to compress.
+    :type body: bytes
+    :param encoding: The encoding (br or gzip).
+    :type encoding: str
+    :return: The compressed body.
+    :rtype: bytes
+    """
+    if encoding == "br":
+        return brotli.compress(body, quality=settings.compression_brotli_quality)
+    return gzip.compress(body, compresslevel=settings.compression_gzip_level, mtime=0)
+
+
+class CompressionMiddleware:
+    """
+    Compresses JSON responses above the minimum size with brotli or gzip, as negotiated by Accept-Encoding.
+
+    Bodies from the thread size up are compressed in a worker thread, so they do not block the event loop.
+    Streamed responses and responses which already have a Content-Encoding are passed as is.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        minimum_size: int = settings.compression_minimum_size,
+        thread_size: int = settings.compression_thread_size,
+    ):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.thread_size = thread_size
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = select_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+        start_message: Message | None = None
+
+        async def send_compressed(message: Message) -> None:
+            nonlocal start_message
+            if message["type"] == "http.response.start":
+                start_message = message
+                return
+            if start_message is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+            start, start_message = start_message, None
+            headers = MutableHeaders(raw=start["headers"])
+            body = message.get("body", b"")
+            if (
+                message.get("more_body", False)
+                or len(body) < self.minimum_size
+                or "content-encoding" in headers
+                or not headers.get("content-type", "").startswith("application/json")
+            ):
+                await send(start)
+                await send(message)
+                return
+            if len(body) >= self.thread_size:
+                body = await asyncio.to_thread(compress, body, encoding)
+            else:
+                body = compress(body, encoding)
+            headers["content-encoding"] = encoding
+            headers["content-length"] = str(len(body))
+            headers.add_vary_header("Accept-Encoding")
+            await send(start)
+            await send({"type": "http.response.body", "body": body})
+
+        await self.app(scope, receive, send_compressed)
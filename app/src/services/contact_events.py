@@ -0,0 +1,226 @@
+"""
+Module of server-sent events of contacts' changes
+"""
+
+
+import asyncio
+from collections import defaultdict
+import json
+import re
+from typing import AsyncIterator, Dict, Iterable, Set
+
+import redis.asyncio as redis
+from redis.asyncio.client import Pipeline
+
+from src.conf.config import settings
+
+
+CHANNEL = "contacts_events"
+EVENT_ID_PATTERN = re.compile(r"^\d+-\d+$")
+READ_COUNT = 100
+
+
+def get_events_key(user_id) -> str:
+    """
+    Gets the key of the Redis stream of the contacts' events of a user.
+
+    :param user_id: The ID of the user.
+    :type user_id: UUID4 | int
+    :return: The key of the stream.
+    :rtype: str
+    """
+    return f"contacts_events: {user_id}"
+
+
+def add_contact_events(
+    pipe: Pipeline, user_id, event: str, contact_ids: Iterable
+) -> None:
+    """
+    Queues the appending of contacts' events to the user's stream and the notification of the workers on a pipeline.
+
+    The stream keeps the last events for resuming, the notification wakes up the workers which hold the user's streams.
+
+    :param pipe: The Redis pipeline.
+    :type pipe: Pipeline
+    :param user_id: The ID of the user.
+    :type user_id: UUID4 | int
+    :param event: The event (created, updated or deleted).
+    :type event: str
+    :param contact_ids: The IDs of the changed contacts.
+    :type contact_ids: Iterable
+    :return: None.
+    :rtype: None
+    """
+    key = get_events_key(user_id)
+    for contact_id in contact_ids:
+        pipe.xadd(
+            key,
+            {"event": event, "id": str(contact_id)},
+            maxlen=settings.contact_events_maxlen,
+            approximate=True,
+        )
+    pipe.publish(CHANNEL, str(user_id))
+
+
+def format_event(event_id: str, fields: Dict[str, str]) -> str:
+    """
+    Formats a contact's event as a server-sent event.
+
+    :param event_id: The ID of the event in the stream.
+    :type event_id: str
+    :param fields: The event and the contact's ID.
+    :type fields: Dict[str, str]
+    :return: The server-sent event.
+    :rtype: str
+    """
+    data = json.dumps({"id": fields["id"]})
+    return f"id: {event_id}\nevent: {fields['event']}\ndata: {data}\n\n"
+
+
+class TooManyStreams(Exception):
+    """
+    Raised when the worker already holds the maximum number of event streams.
+    """
+
+
+class ContactEventsBroker:
+    """
+    Fans the contacts' events out to the event streams held by this worker.
+
+    The worker has one pub/sub subscription for all users. A notification only wakes up the user's streams,
+    which read the new events from the user's Redis stream, so a stream resumes from any event ID it has seen.
+    """
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        max_streams: int = settings.contact_events_max_streams,
+        heartbeat: float = settings.contact_events_heartbeat,
+    ):
+        self.client = client
+        self.max_streams = max_streams
+        self.heartbeat = heartbeat
+        self.streams: Dict[str, Set[asyncio.Event]] = defaultdict(set)
+        self.count = 0
+        self.listener: asyncio.Task | None = None
+
+    def open(self, user_id) -> asyncio.Event:
+        """
+        Registers a new event stream of a user.
+
+        :param user_id: The ID of the user.
+        :type user_id: UUID4 | int
+        :return: The event which is set when the user's contacts change.
+        :rtype: asyncio.Event
+        :raises TooManyStreams: If the worker holds the maximum number of streams.
+        """
+        if self.count >= self.max_streams:
+            raise TooManyStreams()
+        if self.listener is None or self.listener.done():
+            self.listener = asyncio.create_task(self.listen())
+        wake = asyncio.Event()
+        self.streams[str(user_id)].add(wake)
+        self.count += 1
+        return wake
+
+    def close_stream(self, user_id, wake: asyncio.Event) -> None:
+        """
+        Unregisters an event stream of a user.
+
+        :param user_id: The ID of the user.
+        :type user_id: UUID4 | int
+        :param wake: The event returned by open.
+        :type wake: asyncio.Event
+        :return: None.
+        :rtype: None
+        """
+        streams = self.streams.get(str(user_id))
+        if streams is None or wake not in streams:
+            return
+        streams.discard(wake)
+        if not streams:
+            del self.streams[str(user_id)]
+        self.count -= 1
+
+    async def listen(self) -> None:
+        """
+        Subscribes to the notifications and wakes up the streams of the notified users.
+
+        :return: None.
+        :rtype: None
+        """
+        async with self.client.pubsub(ignore_subscribe_messages=True) as pubsub:
+            await pubsub.subscribe(CHANNEL)
+            async for message in pubsub.listen():
+                if message["type"] != "message":
+                    continue
+                for wake in self.streams.get(message["data"], ()):
+                    wake.set()
+
+    async def get_last_event_id(self, user_id) -> str:
+        """
+        Gets the ID of the last event in the user's stream.
+
+        :param user_id: The ID of the user.
+        :type user_id: UUID4 | int
+        :return: The ID of the last event, or 0-0 if there are no events.
+        :rtype: str
+        """
+        entries = await self.client.xrevrange(get_events_key(user_id), count=1)
+        return entries[0][0] if entries else "0-0"
+
+    async def events(
+        self, user_id, wake: asyncio.Event, last_event_id: str | None = None
+    ) -> AsyncIterator[str]:
+        """
+        Streams the contacts' events of a user as server-sent events, with comments as heartbeats.
+
+        :param user_id: The ID of the user.
+        :type user_id: UUID4 | int
+        :param wake: The event returned by open for the stream.
+        :type wake: asyncio.Event
+        :param last_event_id: The ID of the last event the client has received, to resume after it.
+        :type last_event_id: str | None
+        :return: The server-sent events.
+        :rtype: AsyncIterator[str]
+        """
+        try:
+            if last_event_id is None or not EVENT_ID_PATTERN.match(last_event_id):
+                last_event_id = await self.get_last_event_id(user_id)
+            yield ": connected\n\n"
+            while True:
+                entries = await self.client.xrange(
+                    get_events_key(user_id), min=f"({last_event_id}", count=READ_COUNT
+                )
+                for event_id, fields in entries:
+                    yield format_event(event_id, fields)
+                    last_event_id = event_id
+                if len(entries) == READ_COUNT:
+                    continue
+                try:
+                    await asyncio.wait_for(wake.wait(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                wake.clear()
+        finally:
+            self.close_stream(user_id, wake)
+
+    async def close(self) -> None:
+        """
+        Stops the subscription and closes the Redis client.
+
+        :return: None.
+        :rtype: None
+        """
+        if self.listener is not None:
+            self.listener.cancel()
+            try:
+                await self.listener
+            except (asyncio.CancelledError, redis.RedisError):
+                pass
+        await self.client.close()
+
+
+contact_events_broker = ContactEventsBroker(
+    redis.from_url(settings.redis_url, encoding="utf-8", decode_responses=True)
+)
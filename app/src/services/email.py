@@ -3,13 +3,13 @@ Module of email sending functions
 """
 
 
-from pathlib import Path
-
-from fastapi_mail import FastMail, MessageSchema, ConnectionConfig, MessageType
-from fastapi_mail.errors import ConnectionErrors
+from fastapi_mail import ConnectionConfig
 from pydantic import EmailStr, HttpUrl
+from redis.exceptions import RedisError
 
 from src.conf.config import settings
+from src.services.email_queue import enqueue_email
+from src.services.email_templates import TEMPLATE_FOLDER
 
 
 conf = ConnectionConfig(
@@ -23,7 +23,7 @@ conf = ConnectionConfig(
     MAIL_SSL_TLS=True,
     USE_CREDENTIALS=True,
     VALIDATE_CERTS=True,
-    TEMPLATE_FOLDER=Path(__file__).parent / "templates",
+    TEMPLATE_FOLDER=TEMPLATE_FOLDER,
 )
 
 
@@ -31,7 +31,7 @@ async def send_email_for_verification(
     email: EmailStr, username: str, email_verification_token: str, host: HttpUrl
 ):
     """
-    Sends an email for verification of the user's email.
+    Queues an email for verification of the user's email.
 
     :param email: The email to verify.
     :type email: EmailStr
@@ -45,28 +45,25 @@ async def send_email_for_verification(
     :rtype: None
     """
     try:
-        message = MessageSchema(
+        await enqueue_email(
             subject="Confirm your email",
             recipients=[email],
+            template_name="verification_email.html",
             template_body={
-                "host": host,
+                "host": str(host),
                 "username": username,
                 "token": email_verification_token,
             },
-            subtype=MessageType.html,
         )
-
-        fm = FastMail(conf)
-        await fm.send_message(message, template_name="verification_email.html")
-    except ConnectionErrors as error_message:
-        print(f"Connection error: {str(error_message)}")
+    except RedisError as error_message:
+        print(f"Redis error: {str(error_message)}")
 
 
 async def send_email_for_password_reset(
     email: EmailStr, username: str, password_reset_token: str, host: HttpUrl
 ):
     """
-    Sends an email for the user's password reset.
+    Queues an email for the user's password reset.
 
     :param email: The email to reset password.
     :type email: EmailStr
@@ -80,18 +77,15 @@ async def send_email_for_password_reset(
     :rtype: None
     """
     try:
-        message = MessageSchema(
+        await enqueue_email(
             subject="Password reset",
             recipients=[email],
+            template_name="password_reset_email.html",
             template_body={
-                "host": host,
+                "host": str(host),
                 "username": username,
                 "token": password_reset_token,
             },
-            subtype=MessageType.html,
         )
-
-        fm = FastMail(conf)
-        await fm.send_message(message, template_name="password_reset_email.html")
-    except ConnectionErrors as error_message:
-        print(f"Connection error: {str(error_message)}")
+    except RedisError as error_message:
+        print(f"Redis error: {str(error_message)}")
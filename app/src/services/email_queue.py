@@ -0,0 +1,330 @@
+"""
+Module of the outbound email queue and its consumer
+"""
+
+
+import asyncio
+from email.message import EmailMessage
+from email.utils import formataddr, formatdate, make_msgid
+import json
+from time import time
+from typing import List
+from uuid import uuid4
+
+import aiosmtplib
+from fastapi_mail import ConnectionConfig
+from redis.asyncio.client import Redis
+
+from src.conf.config import settings
+from src.database.connect_db import redis_mail_queue
+from src.services.email_templates import EmailTemplates, email_templates
+
+
+EMAIL_QUEUE_KEY = "email_queue: pending"
+EMAIL_PROCESSING_KEY = "email_queue: processing"
+EMAIL_DELAYED_KEY = "email_queue: delayed"
+EMAIL_DEAD_KEY = "email_queue: dead"
+
+
+async def enqueue_email(
+    subject: str,
+    recipients: List[str],
+    template_name: str,
+    template_body: dict,
+    cache: Redis = redis_mail_queue,
+) -> str:
+    """
+    Puts an email job to the queue.
+
+    :param subject: The subject of the email.
+    :type subject: str
+    :param recipients: The recipients of the email.
+    :type recipients: List[str]
+    :param template_name: The name of the template to render the email from.
+    :type template_name: str
+    :param template_body: The data to render the template with.
+    :type template_body: dict
+    :param cache: The Redis client.
+    :type cache: Redis
+    :return: The ID of the queued job.
+    :rtype: str
+    """
+    job = {
+        "id": uuid4().hex,
+        "subject": subject,
+        "recipients": recipients,
+        "template_name": template_name,
+        "template_body": template_body,
+        "attempts": 0,
+    }
+    await cache.lpush(EMAIL_QUEUE_KEY, json.dumps(job))
+    return job["id"]
+
+
+class EmailQueueWorker:
+    """
+    Consumes the email queue in batches over persistent SMTP connections.
+
+    Jobs are moved to the processing list while they are being sent, so jobs of a
+    worker that died are put back to the queue by :meth:`recover`. Failed jobs are
+    retried with exponential backoff and dead-lettered after the last attempt.
+    Only one worker is expected to consume the queue at a time.
+    """
+
+    def __init__(
+        self,
+        config: ConnectionConfig,
+        cache: Redis,
+        batch_size: int = settings.mail_queue_batch_size,
+        connections: int = settings.mail_queue_connections,
+        max_attempts: int = settings.mail_queue_max_attempts,
+        backoff_seconds: float = settings.mail_queue_backoff_seconds,
+        templates: EmailTemplates = email_templates,
+    ):
+        self.config = config
+        self.cache = cache
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.backoff_seconds = backoff_seconds
+        self.templates = templates
+        self.sender = (
+            formataddr((config.MAIL_FROM_NAME, config.MAIL_FROM))
+            if config.MAIL_FROM_NAME
+            else config.MAIL_FROM
+        )
+        credentials = (
+            {
+                "username": config.MAIL_USERNAME,
+                "password": config.MAIL_PASSWORD.get_secret_value(),
+            }
+            if config.USE_CREDENTIALS
+            else {}
+        )
+        self.clients = [
+            aiosmtplib.SMTP(
+                hostname=config.MAIL_SERVER,
+                port=config.MAIL_PORT,
+                timeout=config.TIMEOUT,
+                use_tls=config.MAIL_SSL_TLS,
+                start_tls=config.MAIL_STARTTLS,
+                validate_certs=config.VALIDATE_CERTS,
+                **credentials,
+            )
+            for _ in range(max(connections, 1))
+        ]
+
+    def build_message(self, job: dict) -> EmailMessage:
+        """
+        Builds an email message from the job.
+
+        :param job: The email job.
+        :type job: dict
+        :return: The email message.
+        :rtype: EmailMessage
+        """
+        message = EmailMessage()
+        message["Subject"] = job["subject"]
+        message["From"] = self.sender
+        message["To"] = ", ".join(job["recipients"])
+        message["Date"] = formatdate(localtime=True)
+        message["Message-ID"] = make_msgid()
+        message.set_content(
+            self.templates.render(job["template_name"], job["template_body"]),
+            subtype="html",
+        )
+        return message
+
+    async def recover(self) -> int:
+        """
+        Puts the jobs left in the processing list back to the head of the queue.
+
+        :return: The number of recovered jobs.
+        :rtype: int
+        """
+        recovered = 0
+        while await self.cache.lmove(
+            EMAIL_PROCESSING_KEY, EMAIL_QUEUE_KEY, "RIGHT", "RIGHT"
+        ):
+            recovered += 1
+        return recovered
+
+    async def promote_delayed(self) -> int:
+        """
+        Moves the delayed jobs, which are due for retry, to the queue.
+
+        :return: The number of moved jobs.
+        :rtype: int
+        """
+        jobs = await self.cache.zrangebyscore(EMAIL_DELAYED_KEY, 0, time())
+        if jobs:
+            async with self.cache.pipeline(transaction=True) as pipe:
+                pipe.zrem(EMAIL_DELAYED_KEY, *jobs)
+                pipe.lpush(EMAIL_QUEUE_KEY, *jobs)
+                await pipe.execute()
+        return len(jobs)
+
+    async def fetch_batch(self, timeout: float = 1) -> List[str]:
+        """
+        Moves a batch of jobs from the queue to the processing list.
+
+        :param timeout: The time in seconds to wait for the first job.
+        :type timeout: float
+        :return: The raw jobs of the batch.
+        :rtype: List[str]
+        """
+        job = await self.cache.blmove(
+            EMAIL_QUEUE_KEY, EMAIL_PROCESSING_KEY, timeout, "RIGHT", "LEFT"
+        )
+        if job is None:
+            return []
+        batch = [job]
+        if self.batch_size > 1:
+            async with self.cache.pipeline(transaction=False) as pipe:
+                for _ in range(self.batch_size - 1):
+                    pipe.lmove(EMAIL_QUEUE_KEY, EMAIL_PROCESSING_KEY, "RIGHT", "LEFT")
+                batch.extend(job for job in await pipe.execute() if job is not None)
+        return batch
+
+    async def retry(self, raw_job: str, error: str) -> None:
+        """
+        Schedules a failed job for retry with exponential backoff or dead-letters it after the last attempt.
+
+        :param raw_job: The failed raw job.
+        :type raw_job: str
+        :param error: The error message.
+        :type error: str
+        :return: None.
+        :rtype: None
+        """
+        job = json.loads(raw_job)
+        job["attempts"] += 1
+        job["error"] = error
+        async with self.cache.pipeline(transaction=True) as pipe:
+            pipe.lrem(EMAIL_PROCESSING_KEY, 1, raw_job)
+            if job["attempts"] >= self.max_attempts:
+                pipe.lpush(EMAIL_DEAD_KEY, json.dumps(job))
+            else:
+                delay = self.backoff_seconds * 2 ** (job["attempts"] - 1)
+                pipe.zadd(EMAIL_DELAYED_KEY, {json.dumps(job): time() + delay})
+            await pipe.execute()
+
+    async def _send_message(
+        self, client: aiosmtplib.SMTP, message: EmailMessage
+    ) -> None:
+        """
+        Sends a message over a pooled SMTP connection, reconnecting and resending it once if the server has closed the idle connection.
+
+        :param client: The SMTP connection.
+        :type client: aiosmtplib.SMTP
+        :param message: The message to send.
+        :type message: EmailMessage
+        :return: None.
+        :rtype: None
+        """
+        if client.is_connected:
+            try:
+                await client.send_message(message)
+                return
+            except aiosmtplib.SMTPServerDisconnected:
+                pass
+        # The client keeps its connection lock after losing the connection, so it
+        # is closed first, otherwise connect waits forever.
+        client.close()
+        await client.connect()
+        await client.send_message(message)
+
+    async def _send_chunk(self, client: aiosmtplib.SMTP, chunk: List[str]) -> int:
+        """
+        Sends a chunk of jobs one by one over an SMTP connection, retrying the failed ones later.
+
+        :param client: The SMTP connection.
+        :type client: aiosmtplib.SMTP
+        :param chunk: The raw jobs to send.
+        :type chunk: List[str]
+        :return: The number of sent emails.
+        :rtype: int
+        """
+        sent = 0
+        for raw_job in chunk:
+            try:
+                message = self.build_message(json.loads(raw_job))
+                await self._send_message(client, message)
+            except aiosmtplib.SMTPResponseException as error_message:
+                await self.retry(raw_job, str(error_message))
+            except Exception as error_message:
+                if client.is_connected:
+                    client.close()
+                await self.retry(raw_job, str(error_message))
+            else:
+                await self.cache.lrem(EMAIL_PROCESSING_KEY, 1, raw_job)
+                sent += 1
+        return sent
+
+    async def send_batch(self, batch: List[str]) -> int:
+        """
+        Sends a batch of jobs spread over the SMTP connections.
+
+        :param batch: The raw jobs to send.
+        :type batch: List[str]
+        :return: The number of sent emails.
+        :rtype: int
+        """
+        chunks = [batch[i :: len(self.clients)] for i in range(len(self.clients))]
+        sent = await asyncio.gather(
+            *(
+                self._send_chunk(client, chunk)
+                for client, chunk in zip(self.clients, chunks)
+                if chunk
+            )
+        )
+        return sum(sent)
+
+    async def run_once(self, timeout: float = 1) -> int:
+        """
+        Processes one batch of the queue.
+
+        :param timeout: The time in seconds to wait for a job.
+        :type timeout: float
+        :return: The number of sent emails.
+        :rtype: int
+        """
+        await self.promote_delayed()
+        batch = await self.fetch_batch(timeout)
+        if not batch:
+            return 0
+        return await self.send_batch(batch)
+
+    async def close(self) -> None:
+        """
+        Closes the SMTP connections.
+
+        :return: None.
+        :rtype: None
+        """
+        for client in self.clients:
+            if client.is_connected:
+                try:
+                    await client.quit()
+                except aiosmtplib.SMTPException:
+                    client.close()
+
+    async def run(self) -> None:
+        """
+        Consumes the queue until cancelled.
+
+        :return: None.
+        :rtype: None
+        """
+        self.templates.compile()
+        await self.recover()
+        try:
+            while True:
+                await self.run_once()
+        finally:
+            await self.close()
+
+
+if __name__ == "__main__":
+    from src.services.email import conf
+
+    asyncio.run(EmailQueueWorker(conf, redis_mail_queue).run())
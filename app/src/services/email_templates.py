@@ -0,0 +1,71 @@
+"""
+Module of precompiled email templates
+"""
+
+
+from pathlib import Path
+from typing import Dict
+
+from jinja2 import Environment, FileSystemLoader, Template
+
+
+TEMPLATE_FOLDER = Path(__file__).parent / "templates"
+
+
+class EmailTemplates:
+    """
+    Renders email templates from one shared Jinja environment.
+
+    Templates are compiled once by :meth:`compile` and kept for the lifetime of the
+    process, so a send only runs the compiled render function. The environment does
+    not check the files for changes, and the static parts of a template are constants
+    of its compiled code.
+    """
+
+    def __init__(self, folder: Path = TEMPLATE_FOLDER):
+        self.env = Environment(
+            loader=FileSystemLoader(folder), auto_reload=False, cache_size=-1
+        )
+        self.templates: Dict[str, Template] = {}
+
+    def compile(self) -> None:
+        """
+        Compiles all templates of the folder.
+
+        :return: None.
+        :rtype: None
+        """
+        for template_name in self.env.list_templates(extensions=["html"]):
+            self.templates[template_name] = self.env.get_template(template_name)
+
+    def get_template(self, template_name: str) -> Template:
+        """
+        Gets a compiled template, compiling it on the first use.
+
+        :param template_name: The name of the template.
+        :type template_name: str
+        :return: The compiled template.
+        :rtype: Template
+        """
+        template = self.templates.get(template_name)
+        if template is None:
+            template = self.templates[template_name] = self.env.get_template(
+                template_name
+            )
+        return template
+
+    def render(self, template_name: str, template_body: dict) -> str:
+        """
+        Renders a template.
+
+        :param template_name: The name of the template.
+        :type template_name: str
+        :param template_body: The data to render the template with.
+        :type template_body: dict
+        :return: The rendered template.
+        :rtype: str
+        """
+        return self.get_template(template_name).render(**template_body)
+
+
+email_templates = EmailTemplates()
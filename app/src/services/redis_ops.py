@@ -0,0 +1,71 @@
+"""
+Module of the counting of Redis commands and round trips per request
+"""
+
+
+from contextvars import ContextVar
+from typing import Optional
+
+from redis.asyncio.client import Pipeline, Redis
+
+
+class RedisOps:
+    """
+    The numbers of the Redis commands and round trips of a request.
+    """
+
+    def __init__(self) -> None:
+        """
+        Initializes the counters.
+
+        :return: None.
+        :rtype: None
+        """
+        self.commands = 0
+        self.round_trips = 0
+
+
+redis_ops: ContextVar[RedisOps | None] = ContextVar("redis_ops", default=None)
+
+
+def count_redis_ops(commands: int) -> None:
+    """
+    Counts the commands sent to Redis in one round trip by the current request.
+
+    :param commands: The number of the commands.
+    :type commands: int
+    :return: None.
+    :rtype: None
+    """
+    ops = redis_ops.get()
+    if ops is not None:
+        ops.commands += commands
+        ops.round_trips += 1
+
+
+class InstrumentedPipeline(Pipeline):
+    """
+    The Redis pipeline which counts its commands as one round trip.
+    """
+
+    async def execute(self, raise_on_error: bool = True):
+        if self.command_stack:
+            count_redis_ops(len(self.command_stack))
+        return await super().execute(raise_on_error)
+
+
+class InstrumentedRedis(Redis):
+    """
+    The Redis client which counts its commands and round trips for the current request.
+    """
+
+    async def execute_command(self, *args, **options):
+        count_redis_ops(1)
+        return await super().execute_command(*args, **options)
+
+    def pipeline(
+        self, transaction: bool = True, shard_hint: Optional[str] = None
+    ) -> InstrumentedPipeline:
+        return InstrumentedPipeline(
+            self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
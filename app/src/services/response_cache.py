@@ -0,0 +1,102 @@
+"""
+Module of the Redis cache of serialized responses
+"""
+
+
+from hashlib import sha1
+from typing import Any, Dict, Mapping
+from urllib.parse import urlencode
+
+from redis.asyncio.client import Redis
+
+from src.conf.config import settings
+from src.database.models import User
+
+
+STATS_KEY = "response_cache: stats"
+
+
+def make_response_cache_key(
+    name: str, user: User, version: int, params: Mapping[str, Any]
+) -> str:
+    """
+    Makes a cache key of a response from the user, the version of the user's data and the normalized query parameters.
+
+    The parameters are sorted and the ones which are None are dropped, so equal queries share a key.
+    A new version makes new keys, and the entries of the previous versions expire by themselves.
+
+    :param name: The name of the cached query.
+    :type name: str
+    :param user: The user the response is for.
+    :type user: User
+    :param version: The version of the user's data.
+    :type version: int
+    :param params: The query parameters.
+    :type params: Mapping[str, Any]
+    :return: The cache key.
+    :rtype: str
+    """
+    query = urlencode(
+        sorted((key, value) for key, value in params.items() if value is not None)
+    )
+    digest = sha1(query.encode(), usedforsecurity=False).hexdigest()
+    return f"{name}: {user.id}: {version}: {digest}"
+
+
+async def get_cached_response(
+    key: str, cache: Redis, writes: Redis | None = None
+) -> bytes | None:
+    """
+    Gets a serialized response from cache and counts the hit or the miss.
+
+    :param key: The cache key of the response.
+    :type key: str
+    :param cache: The Redis client.
+    :type cache: Redis
+    :param writes: The pipeline to buffer the count in, or None to count it immediately.
+    :type writes: Redis | None
+    :return: The serialized response, or None if it does not exist in cache.
+    :rtype: bytes | None
+    """
+    body = await cache.get(key)
+    await (cache if writes is None else writes).hincrby(
+        STATS_KEY, "misses" if body is None else "hits", 1
+    )
+    return body
+
+
+async def set_cached_response(key: str, body: bytes, cache: Redis) -> None:
+    """
+    Sets a serialized response in cache.
+
+    :param key: The cache key of the response.
+    :type key: str
+    :param body: The serialized response.
+    :type body: bytes
+    :param cache: The Redis client, or a pipeline to buffer the write in.
+    :type cache: Redis
+    :return: None.
+    :rtype: None
+    """
+    await cache.set(key, body, ex=settings.response_cache_expire)
+
+
+async def get_cache_stats(cache: Redis) -> Dict[str, int | float]:
+    """
+    Gets the numbers of hits and misses of the response cache and their ratios.
+
+    :param cache: The Redis client.
+    :type cache: Redis
+    :return: The hits, misses, hit ratio and miss ratio.
+    :rtype: Dict[str, int | float]
+    """
+    stats = await cache.hgetall(STATS_KEY)
+    hits = int(stats.get(b"hits", 0))
+    misses = int(stats.get(b"misses", 0))
+    total = hits + misses
+    return {
+        "hits": hits,
+        "misses": misses,
+        "hit_ratio": hits / total if total else 0.0,
+        "miss_ratio": misses / total if total else 0.0,
+    }
@@ -0,0 +1,52 @@
+"""
+Module of JSON serializers for responses
+"""
+
+
+from functools import lru_cache
+from typing import Iterable, List, Mapping, Tuple
+
+from pydantic import TypeAdapter
+from typing_extensions import TypedDict
+
+from src.schemas.contacts import ContactResponse, ContactRow
+
+
+contacts_adapter = TypeAdapter(List[ContactRow])
+
+
+@lru_cache(maxsize=128)
+def get_contacts_adapter(fields: Tuple[str, ...] | None = None) -> TypeAdapter:
+    """
+    Gets the type adapter for lists of contacts' rows with the specified fields.
+
+    :param fields: The names of the ContactResponse fields, all of them if None.
+    :type fields: Tuple[str, ...] | None
+    :return: The type adapter.
+    :rtype: TypeAdapter
+    """
+    if fields is None:
+        return contacts_adapter
+    row = TypedDict(
+        "ContactRow",
+        {name: ContactResponse.model_fields[name].annotation for name in fields},
+    )
+    return TypeAdapter(List[row])
+
+
+def serialize_contacts(
+    contacts: Iterable[Mapping], fields: Tuple[str, ...] | None = None
+) -> bytes:
+    """
+    Serializes contacts' rows to JSON without validating them.
+
+    :param contacts: The contacts' rows with the fields of ContactResponse.
+    :type contacts: Iterable[Mapping]
+    :param fields: The names of the fields of the rows, all of ContactResponse if None.
+    :type fields: Tuple[str, ...] | None
+    :return: The JSON-encoded list of contacts.
+    :rtype: bytes
+    """
+    return get_contacts_adapter(fields).dump_json(
+        [dict(contact) for contact in contacts]
+    )
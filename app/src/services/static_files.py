@@ -0,0 +1,196 @@
+"""
+Module of static files applications
+"""
+
+
+from hashlib import md5, sha256
+import mimetypes
+import os
+import re
+import stat
+from typing import Dict, Sequence, Tuple
+
+from fastapi.staticfiles import StaticFiles
+from starlette.datastructures import Headers
+from starlette.responses import FileResponse, Response
+from starlette.staticfiles import NotModifiedResponse
+from starlette.types import Scope
+
+from src.conf.config import settings
+from src.services.compression import parse_accept_encoding
+
+
+# A file name with a content hash before the extension, e.g. app.3f2a9c1d.css.
+FINGERPRINTED = re.compile(r"\.[0-9a-f]{8,64}\.[^./]+$")
+
+
+class ImmutableStaticFiles(StaticFiles):
+    """
+    Serves content-addressed files, which never change under the same path, with long-lived cache headers.
+    """
+
+    cache_control = "public, max-age=31536000, immutable"
+
+    def file_response(
+        self,
+        full_path: str | os.PathLike,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        response = super().file_response(full_path, stat_result, scope, status_code)
+        response.headers["Cache-Control"] = self.cache_control
+        return response
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    Serves the pre-compressed .br or .gz variant of a file, if it exists next to the file and the encoding is accepted.
+
+    ETags are strong: they are derived from the content of the served variant, hashed once when the files are mounted.
+    Fingerprinted files are cached as immutable, the others for STATIC_FILES_MAX_AGE seconds and then revalidated by the ETag.
+    """
+
+    variants = (("br", ".br"), ("gzip", ".gz"))
+    immutable_cache_control = ImmutableStaticFiles.cache_control
+
+    def __init__(self, *args, exclude: Sequence[str] = (), **kwargs):
+        """
+        Initializes the static files and hashes their content.
+
+        :param exclude: The subdirectories served by other mounts, which are not hashed.
+        :type exclude: Sequence[str]
+        """
+        super().__init__(*args, **kwargs)
+        self.cache_control = f"public, max-age={settings.static_files_max_age}"
+        self.etags: Dict[Tuple[str, int, int], str] = {}
+        for directory in self.all_directories:
+            for root, directories, names in os.walk(directory):
+                if root == os.fspath(directory):
+                    directories[:] = [
+                        name for name in directories if name not in exclude
+                    ]
+                for name in names:
+                    path = os.path.join(root, name)
+                    if not os.path.isfile(path):
+                        continue
+                    self.etags[self.get_etag_key(path, os.stat(path))] = self.hash_file(
+                        path
+                    )
+
+    @staticmethod
+    def get_etag_key(path: str, stat_result: os.stat_result) -> Tuple[str, int, int]:
+        """
+        Gets the key of the ETag of a file, which changes with every modification of the file.
+
+        :param path: The path of the file.
+        :type path: str
+        :param stat_result: The stat of the file.
+        :type stat_result: os.stat_result
+        :return: The key of the ETag.
+        :rtype: Tuple[str, int, int]
+        """
+        return os.path.realpath(path), stat_result.st_mtime_ns, stat_result.st_size
+
+    @staticmethod
+    def hash_file(path: str) -> str:
+        """
+        Hashes the content of a file to a strong ETag.
+
+        :param path: The path of the file.
+        :type path: str
+        :return: The ETag.
+        :rtype: str
+        """
+        digest = sha256()
+        with open(path, "rb") as file:
+            while chunk := file.read(64 * 1024):
+                digest.update(chunk)
+        return f'"{digest.hexdigest()}"'
+
+    def etag(self, path: str, stat_result: os.stat_result) -> str:
+        """
+        Gets the ETag of a file: the hash of its content from the mount time, or of its stat if the file changed since then.
+
+        The content is not hashed here, so serving a changed file does not block the event loop.
+
+        :param path: The path of the file.
+        :type path: str
+        :param stat_result: The stat of the file.
+        :type stat_result: os.stat_result
+        :return: The ETag.
+        :rtype: str
+        """
+        etag = self.etags.get(self.get_etag_key(path, stat_result))
+        if etag is None:
+            etag_base = f"{stat_result.st_mtime_ns}-{stat_result.st_size}"
+            etag = f'"{md5(etag_base.encode(), usedforsecurity=False).hexdigest()}"'
+        return etag
+
+    def get_cache_control(self, path: str) -> str:
+        """
+        Gets the Cache-Control of a file: immutable if its name is fingerprinted by the content hash, otherwise short-lived.
+
+        :param path: The path of the file.
+        :type path: str
+        :return: The Cache-Control header.
+        :rtype: str
+        """
+        if FINGERPRINTED.search(path):
+            return self.immutable_cache_control
+        return self.cache_control
+
+    def select_variant(
+        self, full_path: str, stat_result: os.stat_result, request_headers: Headers
+    ) -> Tuple[str, os.stat_result, str | None]:
+        """
+        Selects the pre-compressed variant of a file accepted by the request.
+
+        :param full_path: The path of the file.
+        :type full_path: str
+        :param stat_result: The stat of the file.
+        :type stat_result: os.stat_result
+        :param request_headers: The request headers.
+        :type request_headers: Headers
+        :return: The path, the stat and the encoding of the variant, or of the file itself with None.
+        :rtype: Tuple[str, os.stat_result, str | None]
+        """
+        accepted = parse_accept_encoding(request_headers.get("accept-encoding", ""))
+        for encoding, suffix in self.variants:
+            if accepted.get(encoding, accepted.get("*", 0.0)) <= 0:
+                continue
+            try:
+                variant_stat = os.stat(full_path + suffix)
+            except OSError:
+                continue
+            if stat.S_ISREG(variant_stat.st_mode):
+                return full_path + suffix, variant_stat, encoding
+        return full_path, stat_result, None
+
+    def file_response(
+        self,
+        full_path: str | os.PathLike,
+        stat_result: os.stat_result,
+        scope: Scope,
+        status_code: int = 200,
+    ) -> Response:
+        full_path = os.fspath(full_path)
+        request_headers = Headers(scope=scope)
+        path, stat_result, encoding = self.select_variant(
+            full_path, stat_result, request_headers
+        )
+        response = FileResponse(
+            path,
+            status_code=status_code,
+            stat_result=stat_result,
+            method=scope["method"],
+            media_type=mimetypes.guess_type(full_path)[0] or "text/plain",
+        )
+        response.headers["ETag"] = self.etag(path, stat_result)
+        response.headers["Cache-Control"] = self.get_cache_control(full_path)
+        response.headers["Vary"] = "Accept-Encoding"
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
@@ -0,0 +1,112 @@
+"""
+Module of avatar storage backends
+"""
+
+
+from abc import ABC, abstractmethod
+import asyncio
+import io
+from pathlib import Path
+from urllib.parse import quote
+
+import cloudinary
+import cloudinary.uploader
+
+from src.conf.config import settings
+
+
+LOCAL_STORAGE_DIR = Path(__file__).resolve().parent.parent.parent / "static" / "avatars"
+LOCAL_STORAGE_URL = (
+    f"{settings.api_protocol}://{settings.api_host}:{settings.api_port}/static/avatars"
+)
+
+
+class AvatarStorage(ABC):
+    """
+    Stores processed avatars and returns their public urls.
+
+    Avatars are content-addressed: a public ID always refers to the same content, so
+    stored avatars are never overwritten and can be cached forever.
+    """
+
+    @abstractmethod
+    async def save(self, public_id: str, data: bytes) -> str:
+        """
+        Saves an avatar.
+
+        :param public_id: The public ID of the avatar.
+        :type public_id: str
+        :param data: The PNG-encoded avatar.
+        :type data: bytes
+        :return: The url of the saved avatar.
+        :rtype: str
+        """
+
+
+class CloudinaryAvatarStorage(AvatarStorage):
+    """
+    Stores avatars in Cloudinary.
+    """
+
+    def __init__(self):
+        cloudinary.config(
+            cloud_name=settings.cloudinary_cloud_name,
+            api_key=settings.cloudinary_api_key,
+            api_secret=settings.cloudinary_api_secret,
+            secure=True,
+        )
+
+    async def save(self, public_id: str, data: bytes) -> str:
+        r = await asyncio.to_thread(
+            cloudinary.uploader.upload,
+            io.BytesIO(data),
+            public_id=public_id,
+            overwrite=False,
+        )
+        return cloudinary.CloudinaryImage(public_id).build_url(version=r.get("version"))
+
+
+class LocalAvatarStorage(AvatarStorage):
+    """
+    Stores avatars in a local directory, served by the static files route by default.
+    """
+
+    def __init__(
+        self, directory: Path = LOCAL_STORAGE_DIR, base_url: str = LOCAL_STORAGE_URL
+    ):
+        self.directory = Path(directory).resolve()
+        self.base_url = base_url
+
+    @staticmethod
+    def _write(path: Path, data: bytes) -> None:
+        if path.exists():
+            return
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = path.with_suffix(".tmp")
+        tmp_path.write_bytes(data)
+        tmp_path.replace(path)
+
+    async def save(self, public_id: str, data: bytes) -> str:
+        path = (self.directory / f"{public_id}.png").resolve()
+        if not path.is_relative_to(self.directory):
+            raise ValueError(f"Invalid public ID: {public_id}")
+        await asyncio.to_thread(self._write, path, data)
+        return f"{self.base_url}/{quote(public_id)}.png"
+
+
+AVATAR_STORAGES = {
+    "cloudinary": CloudinaryAvatarStorage,
+    "local": LocalAvatarStorage,
+}
+
+avatar_storage = AVATAR_STORAGES[settings.avatar_storage]()
+
+
+def get_avatar_storage() -> AvatarStorage:
+    """
+    Gets the avatar storage selected in the settings.
+
+    :return: The avatar storage.
+    :rtype: AvatarStorage
+    """
+    return avatar_storage
@@ -0,0 +1,78 @@
+"""
+Module of opaque cursors for incremental reads
+"""
+
+
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+import json
+from typing import Dict, Tuple
+from uuid import UUID
+
+
+Position = Tuple[datetime, UUID | int]
+
+
+def encode_cursor(positions: Dict[str, Position | None]) -> str:
+    """
+    Encodes the last read positions of ordered streams, e.g. of (updated_at, id), to an opaque cursor.
+
+    :param positions: The last read positions by the names of the streams, None for streams without a position.
+    :type positions: Dict[str, Position | None]
+    :return: The URL-safe cursor.
+    :rtype: str
+    """
+    data = {
+        name: None
+        if position is None
+        else [
+            position[0].isoformat(),
+            position[1] if isinstance(position[1], int) else str(position[1]),
+        ]
+        for name, position in positions.items()
+    }
+    return urlsafe_b64encode(json.dumps(data, separators=(",", ":")).encode()).decode()
+
+
+def decode_position(position) -> Position | None:
+    """
+    Decodes a position of a stream from its JSON form [ISO datetime, ID] or null.
+
+    :param position: The decoded JSON value of the position.
+    :return: The position, or None for a stream without a position.
+    :rtype: Position | None
+    :raises ValueError: If the position is malformed.
+    """
+    if position is None:
+        return None
+    if (
+        not isinstance(position, list)
+        or len(position) != 2
+        or not isinstance(position[0], str)
+        or isinstance(position[1], bool)
+        or not isinstance(position[1], (int, str))
+    ):
+        raise ValueError("Invalid cursor position")
+    return (
+        datetime.fromisoformat(position[0]),
+        position[1] if isinstance(position[1], int) else UUID(position[1]),
+    )
+
+
+def decode_cursor(cursor: str) -> Dict[str, Position | None]:
+    """
+    Decodes an opaque cursor to the last read positions of ordered streams.
+
+    :param cursor: The cursor made by encode_cursor.
+    :type cursor: str
+    :return: The last read positions by the names of the streams.
+    :rtype: Dict[str, Position | None]
+    :raises ValueError: If the cursor is malformed.
+    """
+    try:
+        data = json.loads(urlsafe_b64decode(cursor.encode()))
+        if not isinstance(data, dict):
+            raise ValueError("Invalid cursor")
+        return {name: decode_position(position) for name, position in data.items()}
+    except (TypeError, ValueError) as error:
+        raise ValueError("Invalid cursor") from error
@@ -0,0 +1,55 @@
+"""
+Module of entity tags for conditional requests
+"""
+
+
+from typing import List
+
+
+def make_weak_etag(*parts) -> str:
+    """
+    Makes a weak entity tag from the parts identifying a version of a resource.
+
+    :param parts: The parts of the version, e.g. the time of the last update.
+    :type parts: Any
+    :return: The weak entity tag.
+    :rtype: str
+    """
+    return 'W/"' + "-".join(str(part) for part in parts) + '"'
+
+
+def is_etag_matched(if_none_match: str | None, etag: str) -> bool:
+    """
+    Checks if an If-None-Match header matches an entity tag by the weak comparison.
+
+    :param if_none_match: The value of the If-None-Match header.
+    :type if_none_match: str | None
+    :param etag: The current entity tag of the resource.
+    :type etag: str
+    :return: True if the client's representation is up to date, otherwise False.
+    :rtype: bool
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque_tag = etag.removeprefix("W/")
+    return any(
+        tag.strip().removeprefix("W/") == opaque_tag for tag in if_none_match.split(",")
+    )
+
+
+def parse_etags(header: str) -> List[str]:
+    """
+    Parses a list of entity tags, e.g. of an If-Match header, to their opaque values.
+
+    :param header: The comma-separated entity tags.
+    :type header: str
+    :return: The values of the tags without the weakness indicator and the quotes.
+    :rtype: List[str]
+    """
+    return [
+        tag.strip().removeprefix("W/").strip('"')
+        for tag in header.split(",")
+        if tag.strip()
+    ]
@@ -0,0 +1,42 @@
+"""
+Module of the normalization of emails and phones for exact-match lookups
+"""
+
+
+import re
+
+
+NON_DIGITS = re.compile(r"[^0-9]")
+
+
+def normalize_email(email: str | None) -> str | None:
+    """
+    Normalizes an email to lowercase without surrounding whitespace.
+
+    :param email: The email.
+    :type email: str | None
+    :return: The normalized email, or None if the email is None.
+    :rtype: str | None
+    """
+    if email is None:
+        return None
+    return email.strip().lower()
+
+
+def normalize_phone(phone: str | None) -> str | None:
+    """
+    Normalizes a phone to the digits of the E.164 format, without the plus sign, spaces, dashes and brackets.
+
+    The international call prefix 00 is equal to the plus sign, so it is removed too.
+
+    :param phone: The phone.
+    :type phone: str | None
+    :return: The normalized phone, or None if the phone is None or has no digits.
+    :rtype: str | None
+    """
+    if phone is None:
+        return None
+    digits = NON_DIGITS.sub("", phone)
+    if digits.startswith("00"):
+        digits = digits[2:]
+    return digits or None
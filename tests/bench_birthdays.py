@@ -0,0 +1,49 @@
+import os
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(f"{os.path.dirname(SCRIPT_DIR)}/app")
+
+from datetime import date, timedelta
+import random
+from time import perf_counter
+
+from src.repository.contacts import get_upcoming_birthdays
+from src.services.birthday_batch import encode_birthdays, get_upcoming_birthdays_batch
+
+
+NUMBER_OF_BIRTHDAYS = 1_000_000
+NUMBER_OF_DAYS = 7
+TODAY = date(2023, 2, 27)
+
+
+def main() -> None:
+    rng = random.Random(0)
+    first = date(1950, 1, 1)
+    birthdays = [
+        first + timedelta(days=rng.randrange(366 * 60))
+        for _ in range(NUMBER_OF_BIRTHDAYS)
+    ]
+    rows = [{"birthday": birthday} for birthday in birthdays]
+
+    start = perf_counter()
+    expected = get_upcoming_birthdays(rows, TODAY, NUMBER_OF_DAYS)
+    print(f"per-row loop: {(perf_counter() - start) * 1e3:.0f} ms")
+
+    start = perf_counter()
+    scores = encode_birthdays(birthdays)
+    print(f"encoding: {(perf_counter() - start) * 1e3:.0f} ms")
+
+    start = perf_counter()
+    deltas, positions = get_upcoming_birthdays_batch(scores, TODAY, NUMBER_OF_DAYS)
+    print(f"batch: {(perf_counter() - start) * 1e3:.0f} ms")
+
+    assert list(deltas) == [delta_days for delta_days, _ in expected]
+    assert [rows[position] for position in positions] == [row for _, row in expected]
+    print(
+        f"{len(positions)} of {NUMBER_OF_BIRTHDAYS} birthdays in {NUMBER_OF_DAYS} days"
+    )
+
+
+if __name__ == "__main__":
+    main()
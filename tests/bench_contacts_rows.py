@@ -0,0 +1,63 @@
+import os
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(f"{os.path.dirname(SCRIPT_DIR)}/app")
+
+import asyncio
+from time import perf_counter
+import tracemalloc
+
+from sqlalchemy import select
+
+from bench_contacts_serialization import (
+    AsyncDBSession,
+    NUMBER_OF_CONTACTS,
+    NUMBER_OF_ROUNDS,
+    engine,
+    seed,
+)
+from src.database.models import Base, Contact
+from src.repository.contacts import select_contact_rows
+
+
+# Run with TEST=True in .env, the models use integer IDs for SQLite then.
+
+
+async def load_page(stmt) -> None:
+    async with AsyncDBSession() as session:
+        result = await session.execute(stmt.offset(0).limit(NUMBER_OF_CONTACTS))
+        result.all()
+
+
+async def measure(label: str, stmt) -> None:
+    await load_page(stmt)
+    start = perf_counter()
+    for _ in range(NUMBER_OF_ROUNDS):
+        await load_page(stmt)
+    seconds = (perf_counter() - start) / NUMBER_OF_ROUNDS
+    tracemalloc.start()
+    async with AsyncDBSession() as session:
+        result = await session.execute(stmt.offset(0).limit(NUMBER_OF_CONTACTS))
+        page = result.all()
+        _, peak = tracemalloc.get_traced_memory()
+        identity_map = len(session.identity_map)
+    tracemalloc.stop()
+    print(
+        f"{label}: {seconds * 1e3:.1f} ms per page, {peak / 1024:.0f} KiB peak, "
+        f"{len(page)} rows, {identity_map} objects in the identity map"
+    )
+
+
+async def main() -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncDBSession() as session:
+        await seed(session)
+    await measure("ORM entities", select(Contact))
+    await measure("rows", select_contact_rows())
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
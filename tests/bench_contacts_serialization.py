@@ -0,0 +1,103 @@
+import os
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(f"{os.path.dirname(SCRIPT_DIR)}/app")
+
+import asyncio
+from datetime import date, timedelta
+from time import perf_counter
+from typing import List
+
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import (
+    create_async_engine,
+    AsyncSession,
+    AsyncEngine,
+    async_sessionmaker,
+)
+
+from src.database.models import Base, Contact, User
+from src.repository.contacts import read_contacts
+from src.schemas.contacts import ContactResponse
+from src.services.serializers import serialize_contacts
+
+
+# Run with TEST=True in .env, the models use integer IDs for SQLite then.
+
+NUMBER_OF_CONTACTS = 1000
+NUMBER_OF_ROUNDS = 20
+
+engine: AsyncEngine = create_async_engine("sqlite+aiosqlite:///:memory:", echo=False)
+
+AsyncDBSession = async_sessionmaker(
+    engine, autoflush=False, expire_on_commit=False, class_=AsyncSession
+)
+
+response_field = create_response_field(
+    name="Response_Read_Contacts", type_=List[ContactResponse], mode="serialization"
+)
+
+
+async def seed(session: AsyncSession) -> User:
+    user = User(username="test", email="test@test.com", password="1234567890")
+    session.add(user)
+    await session.flush()
+    session.add_all(
+        Contact(
+            first_name=f"first_name_{i}",
+            last_name=f"last_name_{i}",
+            email=f"test{i}@test.com",
+            phone=f"{i:010}",
+            birthday=date(2000, 1, 1) + timedelta(days=i),
+            address=f"address_{i}",
+            user_id=user.id,
+        )
+        for i in range(NUMBER_OF_CONTACTS)
+    )
+    await session.commit()
+    return user
+
+
+async def orm_path(user: User) -> bytes:
+    """
+    The path before: ORM entities validated by the response model and encoded by JSONResponse.
+    """
+    async with AsyncDBSession() as session:
+        stmt = select(Contact).filter(Contact.user_id == user.id)
+        stmt = stmt.offset(0).limit(NUMBER_OF_CONTACTS)
+        contacts = (await session.execute(stmt)).scalars()
+        content = await serialize_response(
+            field=response_field, response_content=contacts
+        )
+        return JSONResponse(content).body
+
+
+async def rows_path(user: User) -> bytes:
+    async with AsyncDBSession() as session:
+        contacts = await read_contacts(
+            0, NUMBER_OF_CONTACTS, None, None, None, user, session
+        )
+        return serialize_contacts(contacts)
+
+
+async def main() -> None:
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    async with AsyncDBSession() as session:
+        user = await seed(session)
+    for label, path in (("ORM + response model", orm_path), ("rows", rows_path)):
+        await path(user)
+        start = perf_counter()
+        for _ in range(NUMBER_OF_ROUNDS):
+            body = await path(user)
+        seconds = (perf_counter() - start) / NUMBER_OF_ROUNDS
+        print(f"{label}: {seconds * 1e3:.1f} ms per page, {len(body)} bytes")
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,38 @@
+import os
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(f"{os.path.dirname(SCRIPT_DIR)}/app")
+
+from timeit import timeit
+
+from src.services.email import conf
+from src.services.email_templates import EmailTemplates
+
+
+NUMBER_OF_RENDERS = 10000
+
+TEMPLATE_NAME = "verification_email.html"
+TEMPLATE_BODY = {"host": "http://127.0.0.1:8000/", "username": "test", "token": "token"}
+
+
+def render_per_send():
+    """
+    Renders the template the way FastMail.send_message does: a new environment per email.
+    """
+    conf.template_engine().get_template(TEMPLATE_NAME).render(**TEMPLATE_BODY)
+
+
+def main() -> None:
+    templates = EmailTemplates(conf.TEMPLATE_FOLDER)
+    templates.compile()
+    for label, func in (
+        ("environment per send", render_per_send),
+        ("precompiled", lambda: templates.render(TEMPLATE_NAME, TEMPLATE_BODY)),
+    ):
+        seconds = timeit(func, number=NUMBER_OF_RENDERS)
+        print(f"{label}: {seconds / NUMBER_OF_RENDERS * 1e6:.1f} us per render")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import os
+import sys
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(f"{os.path.dirname(SCRIPT_DIR)}/app")
+
+import asyncio
+from datetime import date
+import json
+from typing import Iterator, List, Tuple
+
+import redis.asyncio as redis
+from sqlalchemy import delete, event
+
+from src.conf.config import settings
+from src.database.connect_db import AsyncDBSession, engine, pool_redis_db
+from src.database.models import ContactDeletion, User
+from src.repository import contacts as repository_contacts
+from src.schemas.contacts import ContactModel, ContactUpdateModel
+from src.services.birthday_digest import build_birthday_digests
+from src.services.birthday_index import rebuild_birthday_index
+
+
+# Run with TEST=False in .env against a PostgreSQL database migrated to head:
+# every query of the repository on contacts must scan one partition only.
+
+statements: List[Tuple[str, tuple]] = []
+
+
+def record(conn, cursor, statement, parameters, context, executemany):
+    if " contacts" in statement and not statement.startswith(("INSERT", "EXPLAIN")):
+        statements.append((statement, parameters))
+
+
+def find_partitions(plan) -> Iterator[str]:
+    if isinstance(plan, dict):
+        if plan.get("Relation Name", "").startswith("contacts_p"):
+            yield plan["Relation Name"]
+        for value in plan.values():
+            yield from find_partitions(value)
+    elif isinstance(plan, list):
+        for value in plan:
+            yield from find_partitions(value)
+
+
+async def run_repository(user: User) -> None:
+    cache = redis.Redis(connection_pool=pool_redis_db)
+    body = ContactModel(
+        first_name="partition",
+        last_name="partition",
+        email="partition@test.com",
+        phone="+380000000000",
+        birthday=date(2000, 1, 1),
+        address="partition",
+    )
+    async with AsyncDBSession() as session:
+        contact = await repository_contacts.create_contact(body, user, session, cache)
+        await repository_contacts.read_contacts(
+            0, 10, "part", "part", "part", user, session
+        )
+        await repository_contacts.count_contacts(
+            "part", None, None, user, session, cache
+        )
+        await repository_contacts.get_contacts_count(user, session, cache)
+        await repository_contacts.read_contacts_by_ids([contact.id], user, session)
+        await repository_contacts.read_contact_stats(
+            date(2000, 1, 3), 2, False, user, session, cache
+        )
+        exact_count_max = settings.contacts_exact_count_max
+        settings.contacts_exact_count_max = 0
+        await repository_contacts.read_contact_stats(
+            date(2000, 1, 3), 2, True, user, session, cache
+        )
+        settings.contacts_exact_count_max = exact_count_max
+        until = await repository_contacts.read_changes_horizon(session)
+        await repository_contacts.read_contact_changes(
+            None, None, until, 10, user, session
+        )
+        await repository_contacts.read_last_contact_deletion(until, user, session)
+        await repository_contacts.read_contact(contact.id, user, session)
+        await repository_contacts.read_contact_updated_at(contact.id, user, session)
+        await repository_contacts.update_contact(contact.id, body, user, session, cache)
+        await repository_contacts.patch_contact(
+            contact.id,
+            ContactUpdateModel(address="patched"),
+            user,
+            session,
+            cache,
+        )
+        await rebuild_birthday_index([user.id], session, cache)
+        await build_birthday_digests([(user.id, date.today())], session, cache)
+        await repository_contacts.delete_contact(contact.id, user, session, cache)
+        contact = await repository_contacts.create_contact(body, user, session, cache)
+        await repository_contacts.delete_contacts_by_ids(
+            [contact.id], user, session, cache
+        )
+    await cache.close()
+
+
+async def main() -> None:
+    async with AsyncDBSession() as session:
+        user = User(username="partition", email="partition@test.com", password="1")
+        session.add(user)
+        await session.commit()
+    event.listen(engine.sync_engine, "before_cursor_execute", record)
+    try:
+        await run_repository(user)
+    finally:
+        event.remove(engine.sync_engine, "before_cursor_execute", record)
+        async with AsyncDBSession() as session:
+            await session.execute(
+                delete(ContactDeletion).filter(ContactDeletion.user_id == user.id)
+            )
+            await session.execute(delete(User).filter(User.id == user.id))
+            await session.commit()
+    failed = 0
+    async with engine.connect() as conn:
+        for statement, parameters in statements:
+            plan = await conn.exec_driver_sql(
+                "EXPLAIN (FORMAT JSON) " + statement, parameters
+            )
+            plan = plan.scalar()
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            partitions = set(find_partitions(plan))
+            if len(partitions) != 1:
+                failed += 1
+            print(f"{len(partitions)} partition(s): {' '.join(statement.split())}")
+    await engine.dispose()
+    print(f"{len(statements) - failed} of {len(statements)} queries are pruned")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
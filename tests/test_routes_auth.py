@@ -207,6 +207,18 @@ async def test_login_user(client, user):
     assert data["token_type"] == "bearer"
 
 
+@pytest.mark.anyio
+async def test_login_user_email_case(client, user):
+    response = await client.post(
+        "/api/auth/login",
+        data={
+            "username": user.get("email").upper(),
+            "password": user.get("password"),
+        },
+    )
+    assert response.status_code == 200, response.text
+
+
 @pytest.mark.anyio
 async def test_refresh_token(client, user):
     response = await client.post(
@@ -1,5 +1,10 @@
+from base64 import urlsafe_b64encode
+
 import pytest
 
+from src.conf.config import settings
+from src.services.contact_events import contact_events_broker
+
 
 @pytest.mark.anyio
 async def test_create_contact(client, contact_to_create, token):
@@ -31,6 +36,42 @@ async def test_repeat_create_contact(client, contact_to_create, token):
     assert data["detail"] == "The contact's email and/or phone already exist"
 
 
+@pytest.mark.anyio
+async def test_repeat_create_contact_normalized(client, contact_to_create, token):
+    response = await client.post(
+        "/api/contacts",
+        json={
+            **contact_to_create,
+            "email": contact_to_create["email"].upper(),
+            "phone": "+1 (234) 567-89-0",
+        },
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 409, response.text
+
+
+@pytest.mark.anyio
+async def test_create_contacts_phone_without_digits(client, contact_to_create, token):
+    ids = []
+    for number, phone in enumerate(["n/a", "-"]):
+        response = await client.post(
+            "/api/contacts",
+            json={
+                **contact_to_create,
+                "email": f"nophone{number}@test.com",
+                "phone": phone,
+            },
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        assert response.status_code == 201, response.text
+        ids.append(response.json()["id"])
+    for contact_id in ids:
+        response = await client.delete(
+            f"/api/contacts/{contact_id}", headers={"Authorization": f"Bearer {token}"}
+        )
+        assert response.status_code == 204, response.text
+
+
 @pytest.mark.anyio
 async def test_read_contact(client, token, contact_to_create):
     response = await client.get(
@@ -47,6 +88,22 @@ async def test_read_contact(client, token, contact_to_create):
     assert "id" in data
 
 
+@pytest.mark.anyio
+async def test_read_contact_not_modified(client, token):
+    response = await client.get(
+        "/api/contacts/1", headers={"Authorization": f"Bearer {token}"}
+    )
+    etag = response.headers["ETag"]
+    assert etag.startswith('W/"')
+    response = await client.get(
+        "/api/contacts/1",
+        headers={"Authorization": f"Bearer {token}", "If-None-Match": etag},
+    )
+    assert response.status_code == 304, response.text
+    assert response.headers["ETag"] == etag
+    assert response.content == b""
+
+
 @pytest.mark.anyio
 async def test_read_contact_not_found(client, token):
     response = await client.get(
@@ -57,6 +114,31 @@ async def test_read_contact_not_found(client, token):
     assert data["detail"] == "Contact not found"
 
 
+@pytest.mark.anyio
+async def test_batch_get_contacts(client, token, contact_to_create):
+    response = await client.post(
+        "/api/contacts/batch_get",
+        json={"ids": [2, 1, 1]},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert len(data["found"]) == 1
+    assert data["found"][0]["id"] == 1
+    assert data["found"][0]["email"] == contact_to_create["email"]
+    assert data["missing"] == [2]
+
+
+@pytest.mark.anyio
+async def test_batch_get_contacts_too_many(client, token):
+    response = await client.post(
+        "/api/contacts/batch_get",
+        json={"ids": list(range(1, 1000))},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 422, response.text
+
+
 @pytest.mark.anyio
 async def test_read_contacts(client, token, contact_to_create):
     response = await client.get(
@@ -74,6 +156,78 @@ async def test_read_contacts(client, token, contact_to_create):
     assert "id" in data[0]
 
 
+@pytest.mark.anyio
+async def test_read_contacts_redis_ops(client, token):
+    response = await client.get(
+        "/api/contacts", headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 200, response.text
+    commands = int(response.headers["API-Redis-Commands"])
+    round_trips = int(response.headers["API-Redis-Round-Trips"])
+    assert 0 < round_trips < commands
+
+
+@pytest.mark.anyio
+async def test_read_contacts_not_modified(client, token):
+    response = await client.get(
+        "/api/contacts", headers={"Authorization": f"Bearer {token}"}
+    )
+    etag = response.headers["ETag"]
+    response = await client.get(
+        "/api/contacts",
+        headers={"Authorization": f"Bearer {token}", "If-None-Match": etag},
+    )
+    assert response.status_code == 304, response.text
+    assert response.headers["ETag"] == etag
+
+
+@pytest.mark.anyio
+async def test_read_contacts_cached(client, token, contact_to_create):
+    response = await client.get(
+        "/api/cache_stats", headers={"Authorization": f"Bearer {token}"}
+    )
+    hits = response.json()["hits"]
+    response = await client.get(
+        "/api/contacts?limit=5", headers={"Authorization": f"Bearer {token}"}
+    )
+    first = response.content
+    response = await client.get(
+        "/api/contacts?limit=5", headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 200, response.text
+    assert response.content == first
+    assert response.json()[0]["first_name"] == contact_to_create["first_name"]
+    response = await client.get(
+        "/api/cache_stats", headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["hits"] == hits + 1
+    assert 0 < data["hit_ratio"] <= 1
+
+
+@pytest.mark.anyio
+async def test_read_contacts_with_total(client, token):
+    response = await client.get(
+        "/api/contacts",
+        params={"with_total": True},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 200, response.text
+    assert response.headers["X-Total-Count"] == "1"
+    assert response.headers["X-Total-Count-Exact"] == "true"
+    response = await client.get(
+        "/api/contacts",
+        params={"with_total": True, "first_name": "missing"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.headers["X-Total-Count"] == "0"
+    response = await client.get(
+        "/api/contacts", headers={"Authorization": f"Bearer {token}"}
+    )
+    assert "X-Total-Count" not in response.headers
+
+
 @pytest.mark.anyio
 async def test_read_contacts_search(
     client,
@@ -101,6 +255,31 @@ async def test_read_contacts_search(
     assert "id" in data[0]
 
 
+@pytest.mark.anyio
+async def test_read_contacts_fields(client, token, contact_to_create):
+    response = await client.get(
+        "/api/contacts?fields=phone,id,first_name,last_name",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert isinstance(data, list)
+    assert set(data[0]) == {"id", "first_name", "last_name", "phone"}
+    assert data[0]["first_name"] == contact_to_create["first_name"]
+    assert data[0]["phone"] == contact_to_create["phone"]
+
+
+@pytest.mark.anyio
+async def test_read_contacts_invalid_fields(client, token):
+    response = await client.get(
+        "/api/contacts?fields=id,password",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 422, response.text
+    data = response.json()
+    assert data["detail"] == "Invalid fields: password"
+
+
 @pytest.mark.anyio
 async def test_read_contacts_birthdays_in_n_days(client, token, contact_to_create):
     response = await client.get(
@@ -144,8 +323,106 @@ async def test_read_contacts_birthdays_in_n_days_ext(
     assert "id" in data[0]
 
 
+@pytest.mark.anyio
+async def test_read_contact_changes(client, token, contact_to_create, monkeypatch):
+    monkeypatch.setattr(settings, "contact_changes_lag", 0)
+    response = await client.get(
+        "/api/contacts/changes", headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["contacts"][0]["email"] == contact_to_create["email"]
+    assert data["deleted"] == []
+    assert data["has_more"] is False
+    response = await client.get(
+        "/api/contacts/changes",
+        params={"since": data["cursor"]},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["contacts"] == []
+    assert data["deleted"] == []
+
+
+@pytest.mark.anyio
+async def test_read_contact_changes_invalid_cursor(client, token):
+    response = await client.get(
+        "/api/contacts/changes?since=invalid",
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 422, response.text
+    data = response.json()
+    assert data["detail"] == "Invalid cursor"
+
+
+@pytest.mark.anyio
+async def test_read_contact_changes_malformed_cursor(client, token):
+    since = urlsafe_b64encode(b'{"contacts":{"a":1}}').decode()
+    response = await client.get(
+        "/api/contacts/changes",
+        params={"since": since},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 422, response.text
+    assert response.json()["detail"] == "Invalid cursor"
+
+
+@pytest.mark.anyio
+async def test_read_contact_changes_lag(client, token, monkeypatch):
+    monkeypatch.setattr(settings, "contact_changes_lag", 3600)
+    response = await client.get(
+        "/api/contacts/changes", headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 200, response.text
+    assert response.json()["contacts"] == []
+
+
+@pytest.mark.anyio
+async def test_read_contact_stats(client, token, contact_to_create):
+    response = await client.get(
+        "/api/contacts/stats",
+        params={"weeks": 2, "approximate": True},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["total"] == 1
+    assert data["missing_email"] == 0
+    assert data["missing_phone"] == 0
+    month = contact_to_create["birthday"][5:7].lstrip("0")
+    assert data["by_birth_month"][month] == 1
+    assert sum(data["by_birth_month"].values()) == 1
+    assert [week["count"] for week in data["growth_per_week"]] == [0, 1]
+    assert data["approximate"] is False
+    response = await client.get(
+        "/api/contacts/stats",
+        params={"weeks": 2, "approximate": True},
+        headers={
+            "Authorization": f"Bearer {token}",
+            "If-None-Match": response.headers["ETag"],
+        },
+    )
+    assert response.status_code == 304, response.text
+
+
+@pytest.mark.anyio
+async def test_read_contact_events_too_many_streams(client, token, monkeypatch):
+    monkeypatch.setattr(contact_events_broker, "max_streams", 0)
+    response = await client.get(
+        "/api/contacts/events", headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 503, response.text
+    data = response.json()
+    assert data["detail"] == "Too many event streams"
+
+
 @pytest.mark.anyio
 async def test_update_contact(client, token, contact_to_update):
+    response = await client.get(
+        "/api/contacts", headers={"Authorization": f"Bearer {token}"}
+    )
+    etag = response.headers["ETag"]
     response = await client.put(
         "/api/contacts/1",
         json=contact_to_update,
@@ -160,6 +437,12 @@ async def test_update_contact(client, token, contact_to_update):
     assert data["birthday"] == contact_to_update["birthday"]
     assert data["address"] == contact_to_update["address"]
     assert "id" in data
+    response = await client.get(
+        "/api/contacts",
+        headers={"Authorization": f"Bearer {token}", "If-None-Match": etag},
+    )
+    assert response.status_code == 200, response.text
+    assert response.headers["ETag"] != etag
 
 
 @pytest.mark.anyio
@@ -175,11 +458,128 @@ async def test_update_contact_not_found(client, token, contact_to_update):
 
 
 @pytest.mark.anyio
-async def test_delete_contact(client, token):
+async def test_patch_contact(client, token, contact_to_update):
+    response = await client.get(
+        "/api/contacts/1", headers={"Authorization": f"Bearer {token}"}
+    )
+    etag = response.headers["ETag"]
+    response = await client.patch(
+        "/api/contacts/1",
+        json={"address": "patched"},
+        headers={"Authorization": f"Bearer {token}", "If-Match": etag},
+    )
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["address"] == "patched"
+    assert data["first_name"] == contact_to_update["first_name"]
+    assert data["email"] == contact_to_update["email"]
+    assert "ETag" in response.headers
+
+
+@pytest.mark.anyio
+async def test_patch_contact_precondition_failed(client, token):
+    response = await client.patch(
+        "/api/contacts/1",
+        json={"address": "conflict"},
+        headers={
+            "Authorization": f"Bearer {token}",
+            "If-Match": 'W/"2000-01-01T00:00:00"',
+        },
+    )
+    assert response.status_code == 412, response.text
+    data = response.json()
+    assert data["detail"] == "The contact has been changed"
+
+
+@pytest.mark.anyio
+async def test_patch_contact_not_found(client, token):
+    response = await client.patch(
+        "/api/contacts/2",
+        json={"address": "patched"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 404, response.text
+    data = response.json()
+    assert data["detail"] == "Contact not found"
+
+
+@pytest.mark.anyio
+async def test_patch_contact_no_fields(client, token):
+    response = await client.patch(
+        "/api/contacts/1", json={}, headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 422, response.text
+    data = response.json()
+    assert data["detail"] == "No fields to update"
+
+
+@pytest.mark.anyio
+async def test_patch_contact_null(client, token):
+    for field in ("first_name", "last_name", "birthday"):
+        response = await client.patch(
+            "/api/contacts/1",
+            json={field: None},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        assert response.status_code == 422, response.text
+
+
+@pytest.mark.anyio
+async def test_patch_contact_duplicate(client, token, contact_to_create):
+    response = await client.post(
+        "/api/contacts",
+        json={**contact_to_create, "email": "other@test.com", "phone": "555"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 201, response.text
+    other_id = response.json()["id"]
+    response = await client.patch(
+        "/api/contacts/1",
+        json={"email": "OTHER@test.com"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 409, response.text
+    response = await client.patch(
+        "/api/contacts/1",
+        json={"phone": "+555"},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 409, response.text
+    response = await client.get(
+        "/api/contacts/1", headers={"Authorization": f"Bearer {token}"}
+    )
+    response = await client.patch(
+        "/api/contacts/1",
+        json={"email": response.json()["email"]},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 200, response.text
+    response = await client.delete(
+        f"/api/contacts/{other_id}", headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 204, response.text
+
+
+@pytest.mark.anyio
+async def test_delete_contact(client, token, monkeypatch):
+    monkeypatch.setattr(settings, "contact_changes_lag", 0)
+    response = await client.get(
+        "/api/contacts/changes", headers={"Authorization": f"Bearer {token}"}
+    )
+    cursor = response.json()["cursor"]
     response = await client.delete(
         "/api/contacts/1", headers={"Authorization": f"Bearer {token}"}
     )
     assert response.status_code == 204, response.text
+    response = await client.get(
+        "/api/contacts/changes",
+        params={"since": cursor},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["contacts"] == []
+    assert data["deleted"] == [1]
 
 
 @pytest.mark.anyio
@@ -190,3 +590,26 @@ async def test_repeat_delete_contact(client, token):
     assert response.status_code == 404, response.text
     data = response.json()
     assert data["detail"] == "Contact not found"
+
+
+@pytest.mark.anyio
+async def test_batch_delete_contacts(client, token, contact_to_create):
+    response = await client.post(
+        "/api/contacts",
+        json=contact_to_create,
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    contact_id = response.json()["id"]
+    response = await client.post(
+        "/api/contacts/batch_delete",
+        json={"ids": [contact_id, contact_id + 1]},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["deleted"] == [contact_id]
+    assert data["missing"] == [contact_id + 1]
+    response = await client.get(
+        f"/api/contacts/{contact_id}", headers={"Authorization": f"Bearer {token}"}
+    )
+    assert response.status_code == 404, response.text
@@ -1,8 +1,30 @@
+import io
 from unittest.mock import MagicMock
 
 import cloudinary
+from httpx import AsyncClient
+from PIL import Image
 import pytest
 
+from main import app
+from src.services.static_files import ImmutableStaticFiles
+from src.services.storage import (
+    CloudinaryAvatarStorage,
+    LocalAvatarStorage,
+    get_avatar_storage,
+)
+
+
+def create_image(color: str) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (640, 480), color).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+@pytest.fixture(scope="module")
+def image():
+    return create_image("red")
+
 
 @pytest.mark.anyio
 async def test_read_me(client, user, token):
@@ -15,17 +37,86 @@ async def test_read_me(client, user, token):
 
 
 @pytest.mark.anyio
-async def test_update_avatar(client, token):
+async def test_update_avatar(client, token, image, tmp_path):
+    storage = LocalAvatarStorage(tmp_path, "http://test.com/avatars")
+    app.dependency_overrides[get_avatar_storage] = lambda: storage
+    response = await client.patch(
+        "/api/users/avatar",
+        files={"file": ("avatar.jpg", image, "image/jpeg")},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    del app.dependency_overrides[get_avatar_storage]
+    assert response.status_code == 200, response.text
+    data = response.json()
+    assert data["avatar"].startswith("http://test.com/avatars/")
+    avatars = list(tmp_path.rglob("*.png"))
+    assert len(avatars) == 1
+    with Image.open(avatars[0]) as avatar:
+        assert avatar.size == (250, 250)
+
+
+@pytest.mark.anyio
+async def test_update_avatar_same_image(client, token, tmp_path):
+    image = create_image("green")
+    storage = LocalAvatarStorage(tmp_path, "http://test.com/avatars")
+    storage.save = MagicMock(wraps=storage.save)
+    app.dependency_overrides[get_avatar_storage] = lambda: storage
+    responses = [
+        await client.patch(
+            "/api/users/avatar",
+            files={"file": ("avatar.jpg", image, "image/jpeg")},
+            headers={"Authorization": f"Bearer {token}"},
+        )
+        for _ in range(2)
+    ]
+    del app.dependency_overrides[get_avatar_storage]
+    assert responses[1].status_code == 200, responses[1].text
+    assert responses[0].json()["avatar"] == responses[1].json()["avatar"]
+    storage.save.assert_called_once()
+
+
+@pytest.mark.anyio
+async def test_read_avatar_cache_headers(tmp_path):
+    (tmp_path / "avatar.png").write_bytes(b"avatar")
+    async with AsyncClient(
+        app=ImmutableStaticFiles(directory=tmp_path), base_url="http://test"
+    ) as static_client:
+        response = await static_client.get("/avatar.png")
+    assert response.status_code == 200, response.text
+    assert response.headers["cache-control"] == "public, max-age=31536000, immutable"
+
+
+@pytest.mark.anyio
+async def test_update_avatar_cloudinary(client, token, monkeypatch):
+    image = create_image("blue")
     avatar_url = "http://test.com/avatar"
-    cloudinary.config = MagicMock()
-    cloudinary.uploader.upload = MagicMock()
-    cloudinary.CloudinaryImage = MagicMock()
+    mock_upload = MagicMock(return_value={"version": 1})
+    monkeypatch.setattr("cloudinary.config", MagicMock())
+    monkeypatch.setattr("cloudinary.uploader.upload", mock_upload)
+    monkeypatch.setattr("cloudinary.CloudinaryImage", MagicMock())
     cloudinary.CloudinaryImage.return_value.build_url.return_value = avatar_url
+    app.dependency_overrides[get_avatar_storage] = CloudinaryAvatarStorage
     response = await client.patch(
         "/api/users/avatar",
-        files={"file": __file__},
+        files={"file": ("avatar.jpg", image, "image/jpeg")},
         headers={"Authorization": f"Bearer {token}"},
     )
+    del app.dependency_overrides[get_avatar_storage]
     assert response.status_code == 200, response.text
+    mock_upload.assert_called_once()
     data = response.json()
     assert data["avatar"] == avatar_url
+
+
+@pytest.mark.anyio
+async def test_update_avatar_not_image(client, token, tmp_path):
+    storage = LocalAvatarStorage(tmp_path, "http://test.com/avatars")
+    app.dependency_overrides[get_avatar_storage] = lambda: storage
+    response = await client.patch(
+        "/api/users/avatar",
+        files={"file": __file__},
+        headers={"Authorization": f"Bearer {token}"},
+    )
+    del app.dependency_overrides[get_avatar_storage]
+    assert response.status_code == 400, response.text
+    assert response.json()["detail"].startswith("Upload image error")
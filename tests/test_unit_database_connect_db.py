@@ -0,0 +1,180 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+import redis.asyncio as redis
+from sqlalchemy.exc import OperationalError, ProgrammingError
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+
+from src.conf.config import settings
+from src.database import connect_db
+from src.database.connect_db import (
+    ReplicaMonitor,
+    ReplicaSession,
+    check_mail_queue_location,
+    get_read_your_writes_key,
+    open_replica_session,
+)
+
+
+class MockRedis:
+    async def exists(*args):
+        pass
+
+
+def mock_engine(lag: float | None) -> MagicMock:
+    conn = MagicMock()
+    conn.scalar = AsyncMock(return_value=lag)
+    engine = MagicMock()
+    engine.connect.return_value.__aenter__ = AsyncMock(return_value=conn)
+    engine.connect.return_value.__aexit__ = AsyncMock(return_value=False)
+    return engine
+
+
+class TestReplicaMonitor(unittest.IsolatedAsyncioTestCase):
+    async def test_is_available(self):
+        monitor = ReplicaMonitor(mock_engine(0.5), 1, 60)
+        self.assertTrue(await monitor.is_available())
+
+    async def test_is_available_lag(self):
+        monitor = ReplicaMonitor(mock_engine(2), 1, 60)
+        self.assertFalse(await monitor.is_available())
+
+    async def test_is_available_unknown_lag(self):
+        monitor = ReplicaMonitor(mock_engine(None), 1, 60)
+        self.assertFalse(await monitor.is_available())
+
+    async def test_is_available_failure(self):
+        engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        monitor = ReplicaMonitor(engine, 1, 60)
+        self.assertFalse(await monitor.is_available())
+        await engine.dispose()
+
+    async def test_is_available_timeout(self):
+        engine = mock_engine(0)
+        engine.connect.return_value.__aenter__.side_effect = asyncio.TimeoutError()
+        monitor = ReplicaMonitor(engine, 1, 60)
+        self.assertFalse(await monitor.is_available())
+
+    async def test_is_available_check_interval(self):
+        engine = mock_engine(0)
+        monitor = ReplicaMonitor(engine, 1, 60)
+        await monitor.is_available()
+        await monitor.is_available()
+        engine.connect.assert_called_once()
+        monitor.mark_unavailable()
+        self.assertFalse(await monitor.is_available())
+        engine.connect.assert_called_once()
+
+
+class TestOpenReplicaSession(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.cache = MagicMock(spec=MockRedis)
+        self.cache.exists.return_value = 0
+        self.monitor = ReplicaMonitor(mock_engine(0), 1, 60)
+        self.session = MagicMock(spec=AsyncSession)
+
+    async def test_open_replica_session_without_replica(self):
+        with patch.object(connect_db, "replica_monitor", None):
+            result = await open_replica_session("test@test.com", self.cache)
+        self.assertIsNone(result)
+        self.cache.exists.assert_not_called()
+
+    async def test_open_replica_session(self):
+        with patch.object(connect_db, "replica_monitor", self.monitor), patch.object(
+            connect_db, "AsyncReplicaDBSession", return_value=self.session
+        ):
+            result = await open_replica_session("test@test.com", self.cache)
+        self.assertIs(result, self.session)
+        self.session.connection.assert_awaited_once()
+        self.cache.exists.assert_awaited_once_with(
+            get_read_your_writes_key("test@test.com")
+        )
+
+    async def test_open_replica_session_recent_write(self):
+        self.cache.exists.return_value = 1
+        with patch.object(connect_db, "replica_monitor", self.monitor), patch.object(
+            connect_db, "AsyncReplicaDBSession", return_value=self.session
+        ):
+            result = await open_replica_session("test@test.com", self.cache)
+        self.assertIsNone(result)
+        self.session.connection.assert_not_called()
+
+    async def test_open_replica_session_failure(self):
+        self.session.connection.side_effect = OperationalError("", {}, OSError())
+        with patch.object(connect_db, "replica_monitor", self.monitor), patch.object(
+            connect_db, "AsyncReplicaDBSession", return_value=self.session
+        ):
+            result = await open_replica_session("test@test.com", self.cache)
+        self.assertIsNone(result)
+        self.session.close.assert_awaited_once()
+        self.assertFalse(self.monitor.available)
+
+    async def test_open_replica_session_timeout(self):
+        self.session.connection.side_effect = TimeoutError()
+        with patch.object(connect_db, "replica_monitor", self.monitor), patch.object(
+            connect_db, "AsyncReplicaDBSession", return_value=self.session
+        ):
+            result = await open_replica_session("test@test.com", self.cache)
+        self.assertIsNone(result)
+        self.session.close.assert_awaited_once()
+        self.assertFalse(self.monitor.available)
+
+
+class TestReplicaSession(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.monitor = ReplicaMonitor(mock_engine(0), 1, 60)
+        self.monitor.available = True
+        self.replica = MagicMock(spec=AsyncSession)
+        self.primary = MagicMock(spec=AsyncSession)
+        self.session = ReplicaSession(self.replica, self.primary)
+
+    async def test_execute(self):
+        self.replica.execute.return_value = "replica"
+        result = await self.session.execute("query")
+        self.assertEqual(result, "replica")
+        self.primary.execute.assert_not_called()
+
+    async def test_execute_replica_failure(self):
+        self.replica.execute.side_effect = OperationalError("", {}, OSError())
+        self.primary.execute.return_value = "primary"
+        with patch.object(connect_db, "replica_monitor", self.monitor):
+            result = await self.session.execute("query")
+            await self.session.scalar("query")
+        self.assertEqual(result, "primary")
+        self.replica.execute.assert_awaited_once_with("query")
+        self.replica.close.assert_awaited_once()
+        self.replica.scalar.assert_not_called()
+        self.primary.scalar.assert_awaited_once_with("query")
+        self.assertIs(self.session.current, self.primary)
+        self.assertFalse(self.monitor.available)
+
+    async def test_execute_query_error(self):
+        self.replica.execute.side_effect = ProgrammingError("", {}, Exception())
+        with patch.object(connect_db, "replica_monitor", self.monitor):
+            with self.assertRaises(ProgrammingError):
+                await self.session.execute("query")
+        self.primary.execute.assert_not_called()
+        self.assertTrue(self.monitor.available)
+
+    async def test_close(self):
+        await self.session.rollback()
+        await self.session.close()
+        self.replica.rollback.assert_awaited_once()
+        self.replica.close.assert_awaited_once()
+        self.primary.close.assert_not_called()
+
+
+class TestCheckMailQueueLocation(unittest.TestCase):
+    def test_check_mail_queue_location(self):
+        check_mail_queue_location()
+
+    def test_check_mail_queue_location_shared(self):
+        queue = redis.from_url(f"{settings.redis_url}/0", db=2)
+        with patch.object(connect_db, "redis_mail_queue", queue):
+            with self.assertRaises(RuntimeError):
+                check_mail_queue_location()
+
+
+if __name__ == "__main__":
+    unittest.main()
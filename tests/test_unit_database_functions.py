@@ -0,0 +1,22 @@
+import unittest
+
+from sqlalchemy import column, select
+from sqlalchemy.dialects import postgresql, sqlite
+
+from src.database.functions import week_start
+
+
+class TestWeekStart(unittest.TestCase):
+    def test_week_start_postgresql(self):
+        stmt = select(week_start(column("created_at")))
+        self.assertIn(
+            "CAST(date_trunc('week', created_at AT TIME ZONE 'UTC') AS DATE)",
+            str(stmt.compile(dialect=postgresql.dialect())),
+        )
+
+    def test_week_start_sqlite(self):
+        stmt = select(week_start(column("created_at")))
+        self.assertIn(
+            "date(created_at, 'weekday 0', '-6 days')",
+            str(stmt.compile(dialect=sqlite.dialect())),
+        )
@@ -1,26 +1,86 @@
-from datetime import date
+from datetime import date, datetime, timedelta, timezone
+import random
 import unittest
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
+import redis.asyncio as redis
 from sqlalchemy.engine.result import ChunkedIteratorResult
-from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
 
-from src.database.models import Contact, User
-from src.schemas.contacts import ContactModel
+from src.conf.config import settings
+from src.database.models import Base, Contact, User
+from src.schemas.contacts import ContactModel, ContactUpdateModel
 from src.repository.contacts import (
+    get_contacts_version,
+    bump_contacts_version,
     read_contacts,
-    read_contacts_with_birthdays_in_n_days,
+    count_contacts,
+    get_contacts_count,
+    get_upcoming_birthdays,
+    read_contacts_by_ids,
+    read_changes_horizon,
+    read_contact_changes,
+    read_contact_stats,
+    read_last_contact_deletion,
     read_contact,
+    read_contact_updated_at,
     create_contact,
     update_contact,
+    patch_contact,
     delete_contact,
+    delete_contacts_by_ids,
 )
 
 
+class MockPipeline:
+    def set(*args, **kwargs):
+        pass
+
+    def incr(*args):
+        pass
+
+    def xadd(*args, **kwargs):
+        pass
+
+    def publish(*args):
+        pass
+
+    def zadd(*args):
+        pass
+
+    def zrem(*args):
+        pass
+
+    def eval(*args):
+        pass
+
+    async def execute(*args):
+        pass
+
+
+class MockRedis:
+    async def get(*args):
+        pass
+
+    async def set(*args, **kwargs):
+        pass
+
+    def pipeline(*args, **kwargs):
+        pass
+
+
 class TestContacts(unittest.IsolatedAsyncioTestCase):
     def setUp(self):
         self.user = User(id=1)
         self.session = MagicMock(spec=AsyncSession)
+        self.cache = MagicMock(spec=MockRedis)
+        self.pipe = MagicMock(spec=MockPipeline)
+        self.pipe.execute.return_value = [None, 2]
+        self.cache.pipeline.return_value.__aenter__.return_value = self.pipe
         self.body = ContactModel(
             first_name="test",
             last_name="test",
@@ -30,10 +90,40 @@ class TestContacts(unittest.IsolatedAsyncioTestCase):
             address="test",
         )
 
+    async def test_get_contacts_version(self):
+        self.cache.get.return_value = b"1"
+        result = await get_contacts_version(user=self.user, cache=self.cache)
+        self.assertEqual(result, 1)
+        self.cache.set.assert_not_called()
+
+    async def test_get_contacts_version_missing(self):
+        self.cache.get.side_effect = [None, b"1"]
+        result = await get_contacts_version(user=self.user, cache=self.cache)
+        self.assertEqual(result, 1)
+        self.cache.set.assert_awaited_once()
+
+    async def test_bump_contacts_version(self):
+        result = await bump_contacts_version(user=self.user, cache=self.cache)
+        self.assertEqual(result, 2)
+        self.pipe.incr.assert_called_once_with("contacts_version: 1")
+        self.pipe.set.assert_called_once()
+
+    async def test_bump_contacts_version_with_replica(self):
+        self.user.email = "test@test.com"
+        with patch.object(
+            settings, "sqlalchemy_database_url_replica", "postgresql+asyncpg://replica"
+        ):
+            await bump_contacts_version(user=self.user, cache=self.cache)
+        self.pipe.set.assert_called_with(
+            "read_your_writes: test@test.com",
+            1,
+            ex=settings.read_your_writes_seconds,
+        )
+
     async def test_read_contacts(self):
-        contacts = [Contact(), Contact(), Contact()]
+        contacts = [{"id": 1}, {"id": 2}, {"id": 3}]
         self.session.execute.return_value = MagicMock(spec=ChunkedIteratorResult)
-        self.session.execute.return_value.scalars.return_value = contacts
+        self.session.execute.return_value.mappings.return_value = contacts
         result = await read_contacts(
             offset=0,
             limit=10,
@@ -45,22 +135,171 @@ class TestContacts(unittest.IsolatedAsyncioTestCase):
         )
         self.assertEqual(result, contacts)
 
-    async def test_read_contacts_with_birthdays_in_n_days(self):
-        contacts = [
-            Contact(birthday=date.today()),
-            Contact(birthday=date.today()),
-            Contact(birthday=date.today()),
+    async def test_count_contacts_exact(self):
+        self.cache.get.return_value = b"3"
+        self.session.execute.return_value = MagicMock(spec=ChunkedIteratorResult)
+        self.session.execute.return_value.scalar.return_value = 2
+        result = await count_contacts(
+            first_name="test",
+            last_name=None,
+            email=None,
+            user=self.user,
+            session=self.session,
+            cache=self.cache,
+        )
+        self.assertEqual(result, (2, True))
+
+    async def test_count_contacts_counter(self):
+        self.cache.get.return_value = b"100000"
+        result = await count_contacts(
+            first_name=None,
+            last_name=None,
+            email=None,
+            user=self.user,
+            session=self.session,
+            cache=self.cache,
+        )
+        self.assertEqual(result, (100000, False))
+        self.session.execute.assert_not_called()
+
+    async def test_count_contacts_estimated(self):
+        self.cache.get.return_value = b"100000"
+        self.session.get_bind.return_value.dialect.name = "postgresql"
+        self.session.execute.return_value = MagicMock(spec=ChunkedIteratorResult)
+        self.session.execute.return_value.scalar.return_value = (
+            '[{"Plan": {"Plan Rows": 1234}}]'
+        )
+        result = await count_contacts(
+            first_name="test",
+            last_name=None,
+            email=None,
+            user=self.user,
+            session=self.session,
+            cache=self.cache,
+        )
+        self.assertEqual(result, (1234, False))
+
+    async def test_get_contacts_count_missing(self):
+        self.cache.get.return_value = None
+        self.session.execute.return_value = MagicMock(spec=ChunkedIteratorResult)
+        self.session.execute.return_value.scalar.return_value = 5
+        result = await get_contacts_count(
+            user=self.user, session=self.session, cache=self.cache
+        )
+        self.assertEqual(result, 5)
+        self.cache.set.assert_awaited_once()
+
+    def test_get_upcoming_birthdays_leap_day(self):
+        leap_day = {"birthday": date(2000, 2, 29)}
+        march_1 = {"birthday": date(1990, 3, 1)}
+        march_3 = {"birthday": date(1990, 3, 3)}
+        result = get_upcoming_birthdays(
+            [march_3, march_1, leap_day], date(2023, 2, 28), 3
+        )
+        self.assertEqual(result, [(1, leap_day), (1, march_1)])
+        result = get_upcoming_birthdays([leap_day], date(2023, 2, 28), 3)
+        self.assertEqual(result, [(1, leap_day)])
+
+    def test_get_upcoming_birthdays_next_year(self):
+        january_2 = {"birthday": date(1990, 1, 2)}
+        december_31 = {"birthday": date(1990, 12, 31)}
+        result = get_upcoming_birthdays([january_2, december_31], date(2023, 12, 30), 5)
+        self.assertEqual(result, [(1, december_31), (3, january_2)])
+
+    async def test_read_contacts_by_ids(self):
+        contacts = [{"id": 1}, {"id": 3}]
+        self.session.execute.return_value = MagicMock(spec=ChunkedIteratorResult)
+        self.session.execute.return_value.mappings.return_value.all.return_value = (
+            contacts
+        )
+        result = await read_contacts_by_ids(
+            contact_ids=[1, 2, 3], user=self.user, session=self.session
+        )
+        self.assertEqual(result, contacts)
+
+    async def test_read_contact_stats(self):
+        rows = [
+            {
+                "month": 1,
+                "week": None,
+                "count": 3,
+                "missing_email": 1,
+                "missing_phone": 0,
+            },
+            {
+                "month": 1,
+                "week": date(2000, 1, 10),
+                "count": 2,
+                "missing_email": 0,
+                "missing_phone": 1,
+            },
+            {
+                "month": 5,
+                "week": date(2000, 1, 3),
+                "count": 1,
+                "missing_email": 0,
+                "missing_phone": 0,
+            },
         ]
         self.session.execute.return_value = MagicMock(spec=ChunkedIteratorResult)
-        self.session.execute.return_value.scalars.return_value = contacts
-        result = await read_contacts_with_birthdays_in_n_days(
-            n=1,
-            offset=0,
+        self.session.execute.return_value.mappings.return_value = rows
+        self.cache.get.return_value = b"6"
+        result = await read_contact_stats(
+            since=date(2000, 1, 3),
+            weeks=2,
+            approximate=True,
+            user=self.user,
+            session=self.session,
+            cache=self.cache,
+        )
+        self.assertEqual(result["total"], 6)
+        self.assertEqual(result["missing_email"], 1)
+        self.assertEqual(result["missing_phone"], 1)
+        self.assertEqual(result["by_birth_month"][1], 5)
+        self.assertEqual(result["by_birth_month"][5], 1)
+        self.assertEqual(
+            result["growth_per_week"],
+            [
+                {"week": date(2000, 1, 3), "count": 1},
+                {"week": date(2000, 1, 10), "count": 2},
+            ],
+        )
+        self.assertFalse(result["approximate"])
+
+    async def test_read_contact_changes(self):
+        contacts = [{"id": 1, "updated_at": datetime.now()}]
+        deletions = [{"id": 1, "contact_id": 2, "deleted_at": datetime.now()}]
+        contacts_result = MagicMock(spec=ChunkedIteratorResult)
+        contacts_result.mappings.return_value.all.return_value = contacts
+        deletions_result = MagicMock(spec=ChunkedIteratorResult)
+        deletions_result.mappings.return_value.all.return_value = deletions
+        self.session.execute.side_effect = [contacts_result, deletions_result]
+        result = await read_contact_changes(
+            contacts_after=(datetime.now(), 1),
+            deletions_after=None,
+            until=datetime.now(),
             limit=10,
             user=self.user,
             session=self.session,
         )
-        self.assertEqual(result, contacts)
+        self.assertEqual(result, (contacts, deletions))
+
+    async def test_read_last_contact_deletion(self):
+        deletion = {"id": 1, "contact_id": 2, "deleted_at": datetime.now()}
+        self.session.execute.return_value = MagicMock(spec=ChunkedIteratorResult)
+        self.session.execute.return_value.mappings.return_value.first.return_value = (
+            deletion
+        )
+        result = await read_last_contact_deletion(
+            until=datetime.now(), user=self.user, session=self.session
+        )
+        self.assertEqual(result, deletion)
+
+    async def test_read_changes_horizon(self):
+        now = datetime.now()
+        self.session.scalar.return_value = now
+        result = await read_changes_horizon(self.session)
+        self.assertEqual(result, now - timedelta(seconds=settings.contact_changes_lag))
 
     async def test_read_contact(self):
         contact = Contact()
@@ -83,28 +322,56 @@ class TestContacts(unittest.IsolatedAsyncioTestCase):
         )
         self.assertIsNone(result)
 
+    async def test_read_contact_updated_at(self):
+        updated_at = datetime.now()
+        self.session.execute.return_value = MagicMock(spec=ChunkedIteratorResult)
+        self.session.execute.return_value.scalar.return_value = updated_at
+        result = await read_contact_updated_at(
+            contact_id=1, user=self.user, session=self.session
+        )
+        self.assertEqual(result, updated_at)
+
     async def test_create_contact(self):
         self.session.execute.return_value = MagicMock(spec=ChunkedIteratorResult)
-        self.session.execute.return_value.scalar.return_value = None
+        self.session.execute.return_value.first.return_value = None
         result = await create_contact(
-            body=self.body, user=self.user, session=self.session
+            body=self.body, user=self.user, session=self.session, cache=self.cache
         )
+        self.pipe.incr.assert_called_once()
+        self.pipe.xadd.assert_called_once()
+        self.pipe.publish.assert_called_once()
         self.assertEqual(result.first_name, self.body.first_name)
         self.assertEqual(result.last_name, self.body.last_name)
         self.assertEqual(result.email, self.body.email)
         self.assertEqual(result.phone, self.body.phone)
         self.assertEqual(result.birthday, self.body.birthday)
         self.assertEqual(result.address, self.body.address)
+        self.assertEqual(result.email_normalized, "test@test.com")
+        self.assertEqual(result.phone_normalized, "1234567890")
         self.assertTrue(hasattr(result, "id"))
 
+    async def test_create_contact_duplicate(self):
+        self.session.execute.return_value = MagicMock(spec=ChunkedIteratorResult)
+        self.session.execute.return_value.first.return_value = (1,)
+        result = await create_contact(
+            body=self.body, user=self.user, session=self.session, cache=self.cache
+        )
+        self.assertIsNone(result)
+        self.session.add.assert_not_called()
+
     async def test_update_contact_found(self):
         contact = Contact()
         self.session.execute.return_value = MagicMock(spec=ChunkedIteratorResult)
         self.session.execute.return_value.scalar.return_value = contact
         result = await update_contact(
-            contact_id=contact.id, body=self.body, user=self.user, session=self.session
+            contact_id=contact.id,
+            body=self.body,
+            user=self.user,
+            session=self.session,
+            cache=self.cache,
         )
         self.assertEqual(result, contact)
+        self.pipe.incr.assert_called_once()
 
     async def test_update_contact_not_found(self):
         self.session.execute.return_value = MagicMock(spec=ChunkedIteratorResult)
@@ -114,25 +381,151 @@ class TestContacts(unittest.IsolatedAsyncioTestCase):
             body=self.body,
             user=self.user,
             session=self.session,
+            cache=self.cache,
         )
         self.assertIsNone(result)
+        self.pipe.incr.assert_not_called()
+
+    async def test_patch_contact_found(self):
+        contact = {"id": 1, "address": "patched", "birthday": date(2000, 1, 1)}
+        self.session.execute.return_value = MagicMock(spec=ChunkedIteratorResult)
+        self.session.execute.return_value.mappings.return_value.first.return_value = (
+            contact
+        )
+        result = await patch_contact(
+            contact_id=1,
+            body=ContactUpdateModel(address="patched"),
+            user=self.user,
+            session=self.session,
+            cache=self.cache,
+            updated_at=[datetime.now()],
+        )
+        self.assertEqual(result, contact)
+        self.pipe.incr.assert_called_once()
+
+    async def test_patch_contact_not_found(self):
+        self.session.execute.return_value = MagicMock(spec=ChunkedIteratorResult)
+        self.session.execute.return_value.mappings.return_value.first.return_value = (
+            None
+        )
+        result = await patch_contact(
+            contact_id=2,
+            body=ContactUpdateModel(address="patched"),
+            user=self.user,
+            session=self.session,
+            cache=self.cache,
+        )
+        self.assertIsNone(result)
+        self.pipe.incr.assert_not_called()
 
     async def test_delete_contact_found(self):
         contact = Contact()
         self.session.execute.return_value = MagicMock(spec=ChunkedIteratorResult)
         self.session.execute.return_value.scalar.return_value = contact
         result = await delete_contact(
-            contact_id=contact.id, user=self.user, session=self.session
+            contact_id=contact.id,
+            user=self.user,
+            session=self.session,
+            cache=self.cache,
         )
         self.assertEqual(result, contact)
+        self.pipe.incr.assert_called_once()
 
     async def test_delete_contact_not_found(self):
         self.session.execute.return_value = MagicMock(spec=ChunkedIteratorResult)
         self.session.execute.return_value.scalar.return_value = None
         result = await delete_contact(
-            contact_id=2, user=self.user, session=self.session
+            contact_id=2, user=self.user, session=self.session, cache=self.cache
         )
         self.assertIsNone(result)
+        self.pipe.incr.assert_not_called()
+
+    async def test_delete_contacts_by_ids(self):
+        self.session.execute.return_value = MagicMock(spec=ChunkedIteratorResult)
+        self.session.execute.return_value.scalars.return_value.all.return_value = [1]
+        result = await delete_contacts_by_ids(
+            contact_ids=[1, 2], user=self.user, session=self.session, cache=self.cache
+        )
+        self.assertEqual(result, [1])
+        self.assertEqual(self.session.execute.await_count, 2)
+        self.pipe.incr.assert_called_once()
+
+    async def test_delete_contacts_by_ids_not_found(self):
+        self.session.execute.return_value = MagicMock(spec=ChunkedIteratorResult)
+        self.session.execute.return_value.scalars.return_value.all.return_value = []
+        result = await delete_contacts_by_ids(
+            contact_ids=[2], user=self.user, session=self.session, cache=self.cache
+        )
+        self.assertEqual(result, [])
+        self.assertEqual(self.session.execute.await_count, 1)
+        self.pipe.incr.assert_not_called()
+
+
+class TestContactStatsSample(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.cache = redis.from_url(settings.redis_url, db=15)
+        await self.cache.flushdb()
+        self.engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        self.session = async_sessionmaker(
+            self.engine, expire_on_commit=False, class_=AsyncSession
+        )()
+        self.user = User(id=1, username="stats", email="stats@test.com", password="1")
+        self.session.add(self.user)
+        self.since = date(2000, 1, 3)
+        rng = random.Random(42)
+        self.session.add_all(
+            Contact(
+                first_name="stats",
+                last_name="stats",
+                email=None if rng.random() < 0.3 else f"{i}@test.com",
+                phone=f"{i}",
+                birthday=date(1990, rng.randint(1, 12), 1),
+                created_at=datetime.combine(
+                    self.since, datetime.min.time(), timezone.utc
+                )
+                + timedelta(days=rng.randrange(28)),
+                user_id=1,
+            )
+            for i in range(2000)
+        )
+        await self.session.commit()
+
+    async def asyncTearDown(self):
+        await self.session.close()
+        await self.engine.dispose()
+        await self.cache.flushdb()
+        await self.cache.close()
+
+    async def test_read_contact_stats_approximate(self):
+        exact = await read_contact_stats(
+            self.since, 4, False, self.user, self.session, self.cache
+        )
+        with patch.object(settings, "contacts_exact_count_max", 100), patch.object(
+            settings, "contacts_stats_sample_size", 500
+        ):
+            result = await read_contact_stats(
+                self.since, 4, True, self.user, self.session, self.cache
+            )
+        self.assertFalse(exact["approximate"])
+        self.assertTrue(result["approximate"])
+        self.assertEqual(result["total"], 2000)
+        self.assertAlmostEqual(
+            result["missing_email"], exact["missing_email"], delta=0.05 * 2000
+        )
+        for month in range(1, 13):
+            self.assertAlmostEqual(
+                result["by_birth_month"][month],
+                exact["by_birth_month"][month],
+                delta=0.04 * 2000,
+            )
+        for week, exact_week in zip(
+            result["growth_per_week"], exact["growth_per_week"]
+        ):
+            self.assertAlmostEqual(
+                week["count"], exact_week["count"], delta=0.06 * 2000
+            )
 
 
 if __name__ == "__main__":
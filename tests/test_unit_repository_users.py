@@ -1,4 +1,3 @@
-import pickle
 import unittest
 from unittest.mock import MagicMock
 
@@ -7,8 +6,9 @@ from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.database.models import User
 from src.schemas.users import UserModel
+from src.conf.config import settings
 from src.repository.users import (
-    get_user_by_email_from_cache,
+    set_user_in_cache,
     get_user_by_email,
     create_user,
     update_avatar,
@@ -37,12 +37,13 @@ class TestUsers(unittest.IsolatedAsyncioTestCase):
         self.session = MagicMock(spec=AsyncSession)
         self.redis_db = MagicMock(spec=MockRedis)
 
-    async def test_get_user_by_email_from_cache(self):
-        user = pickle.dumps(self.user)
-        self.redis_db.get.return_value = user
-        result = await get_user_by_email_from_cache(self.user.email, self.redis_db)
-        self.assertEqual(result.id, self.user.id)
-        self.assertEqual(result.email, self.user.email)
+    async def test_set_user_in_cache(self):
+        await set_user_in_cache(self.user, self.redis_db)
+        self.redis_db.set.assert_awaited_once()
+        self.assertEqual(
+            self.redis_db.set.await_args.kwargs, {"ex": settings.redis_expire}
+        )
+        self.redis_db.expire.assert_not_called()
 
     async def test_get_user_by_email(self):
         self.session.execute.return_value = MagicMock(spec=ChunkedIteratorResult)
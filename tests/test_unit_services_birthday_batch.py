@@ -0,0 +1,55 @@
+from datetime import date, timedelta
+import random
+import unittest
+
+from src.repository.contacts import get_upcoming_birthdays
+from src.services.birthday_batch import (
+    encode_birthdays,
+    get_upcoming_birthdays_batch,
+)
+
+
+class TestBirthdayBatch(unittest.TestCase):
+    def test_encode_birthdays(self):
+        scores = encode_birthdays(
+            [date(1990, 1, 1), date(1992, 2, 29), date(1990, 3, 1), date(1990, 12, 31)]
+        )
+        self.assertEqual(list(scores), [1, 60, 61, 366])
+
+    def test_leap_day_first(self):
+        birthdays = [date(1990, 3, 1), date(1992, 2, 29), date(1990, 3, 2)]
+        deltas, positions = get_upcoming_birthdays_batch(
+            encode_birthdays(birthdays), date(2023, 3, 1), 2
+        )
+        self.assertEqual(list(deltas), [0, 0, 1])
+        self.assertEqual(list(positions), [1, 0, 2])
+
+    def test_same_as_get_upcoming_birthdays(self):
+        rng = random.Random(42)
+        first = date(1960, 1, 1)
+        for _ in range(300):
+            birthdays = [
+                first + timedelta(days=rng.randrange(366 * 40))
+                for _ in range(rng.randrange(50))
+            ]
+            if rng.random() < 0.3:
+                birthdays += [date(1992, 2, 29), date(1990, 3, 1), date(1990, 2, 28)]
+                rng.shuffle(birthdays)
+            today = date(2000, 1, 1) + timedelta(days=rng.randrange(366 * 30))
+            n = rng.randint(1, 31)
+            rows = [
+                {"id": position, "birthday": birthday}
+                for position, birthday in enumerate(birthdays)
+            ]
+            expected = [
+                (delta_days, row["id"])
+                for delta_days, row in get_upcoming_birthdays(rows, today, n)
+            ]
+            deltas, positions = get_upcoming_birthdays_batch(
+                encode_birthdays(birthdays), today, n
+            )
+            self.assertEqual(list(zip(deltas, positions)), expected, (today, n))
+
+
+if __name__ == "__main__":
+    unittest.main()
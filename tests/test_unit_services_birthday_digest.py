@@ -0,0 +1,99 @@
+from datetime import date, timedelta
+import unittest
+
+import redis.asyncio as redis
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from src.conf.config import settings
+from src.database.models import Base, Contact, User
+from src.repository.contacts import get_contacts_version
+from src.services.birthday_digest import (
+    BirthdayDigestScheduler,
+    dump_digest,
+    load_digest,
+    read_birthday_digest,
+)
+
+
+class TestBirthdayDigest(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.cache = redis.from_url(settings.redis_url, db=15)
+        await self.cache.flushdb()
+        self.engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        self.session_maker = async_sessionmaker(
+            self.engine, expire_on_commit=False, class_=AsyncSession
+        )
+        self.today = date.today()
+        async with self.session_maker() as session:
+            session.add_all(
+                [
+                    User(id=1, username="one", email="one@test.com", password="1"),
+                    User(
+                        id=2,
+                        username="two",
+                        email="two@test.com",
+                        password="2",
+                        timezone="Pacific/Kiritimati",
+                    ),
+                ]
+            )
+            session.add_all(
+                [
+                    Contact(
+                        id=1,
+                        first_name="in",
+                        last_name="two days",
+                        birthday=self.today.replace(year=2000) + timedelta(days=2),
+                        user_id=1,
+                    ),
+                    Contact(
+                        id=2,
+                        first_name="today",
+                        last_name="today",
+                        birthday=self.today.replace(year=2000),
+                        user_id=1,
+                    ),
+                    Contact(
+                        id=3,
+                        first_name="yesterday",
+                        last_name="yesterday",
+                        birthday=self.today.replace(year=2000) - timedelta(days=1),
+                        user_id=1,
+                    ),
+                ]
+            )
+            await session.commit()
+
+    async def asyncTearDown(self):
+        await self.cache.flushdb()
+        await self.cache.close()
+        await self.engine.dispose()
+
+    def test_dump_load_digest(self):
+        data = dump_digest(self.today, 5, [(0, 2), (2, 1)])
+        self.assertEqual(load_digest(data, self.today, 5), [(0, 2), (2, 1)])
+        self.assertIsNone(load_digest(data, self.today, 6))
+        self.assertIsNone(load_digest(data, self.today + timedelta(days=1), 5))
+
+    async def test_scheduler_run_once(self):
+        scheduler = BirthdayDigestScheduler(self.session_maker, self.cache, interval=1)
+        follower = BirthdayDigestScheduler(self.session_maker, self.cache, interval=1)
+        self.assertEqual(await scheduler.run_once(), 2)
+        self.assertEqual(await follower.run_once(), 0)
+        self.assertEqual(await scheduler.run_once(), 0)
+        user = User(id=1)
+        version = await get_contacts_version(user, self.cache)
+        digest = await read_birthday_digest(user, self.today, version, self.cache)
+        self.assertEqual(digest[:2], [(0, 2), (2, 1)])
+        await scheduler.stop()
+        self.assertEqual(await follower.run_once(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,126 @@
+from datetime import date
+import unittest
+
+import redis.asyncio as redis
+from sqlalchemy.ext.asyncio import (
+    AsyncSession,
+    async_sessionmaker,
+    create_async_engine,
+)
+
+from src.conf.config import settings
+from src.database.models import Base, Contact, User
+from src.services.birthday_index import (
+    BUILT_MEMBER,
+    add_birthdays,
+    get_birthday_index_key,
+    get_birthday_windows,
+    read_upcoming_birthday_ids,
+    rebuild_all,
+    remove_birthdays,
+)
+
+
+class TestBirthdayIndex(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.cache = redis.from_url(settings.redis_url, db=15)
+        await self.cache.flushdb()
+        self.engine = create_async_engine("sqlite+aiosqlite:///:memory:")
+        async with self.engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+        self.session_maker = async_sessionmaker(
+            self.engine, expire_on_commit=False, class_=AsyncSession
+        )
+        self.user = User(id=1, username="one", email="one@test.com", password="1")
+        async with self.session_maker() as session:
+            session.add(self.user)
+            session.add_all(
+                [
+                    Contact(
+                        id=1,
+                        first_name="new",
+                        last_name="year",
+                        birthday=date(1990, 1, 1),
+                        user_id=1,
+                    ),
+                    Contact(
+                        id=2,
+                        first_name="leap",
+                        last_name="day",
+                        birthday=date(1992, 2, 29),
+                        user_id=1,
+                    ),
+                    Contact(
+                        id=3,
+                        first_name="new year's",
+                        last_name="eve",
+                        birthday=date(1990, 12, 31),
+                        user_id=1,
+                    ),
+                ]
+            )
+            await session.commit()
+
+    async def asyncTearDown(self):
+        await self.cache.flushdb()
+        await self.cache.close()
+        await self.engine.dispose()
+
+    def test_get_birthday_windows(self):
+        self.assertEqual(get_birthday_windows(date(2023, 1, 1), 7), [(1, 7)])
+        self.assertEqual(
+            get_birthday_windows(date(2023, 12, 30), 3), [(365, 366), (1, 1)]
+        )
+        self.assertEqual(get_birthday_windows(date(2023, 3, 1), 1), [(60, 61)])
+        self.assertEqual(get_birthday_windows(date(2024, 3, 1), 1), [(61, 61)])
+
+    async def test_add_remove_birthdays(self):
+        key = get_birthday_index_key(1)
+        async with self.cache.pipeline(transaction=True) as pipe:
+            add_birthdays(pipe, 1, {1: date(1990, 1, 2), 2: date(1992, 2, 29)})
+            remove_birthdays(pipe, 1, [1])
+            remove_birthdays(pipe, 1, [])
+            await pipe.execute()
+        self.assertEqual(
+            await self.cache.zrange(key, 0, -1, withscores=True), [(b"2", 60.0)]
+        )
+
+    async def test_read_upcoming_birthday_ids_rebuilds(self):
+        async with self.session_maker() as session:
+            result = await read_upcoming_birthday_ids(
+                self.user, date(2023, 12, 31), 2, session, self.cache
+            )
+        self.assertEqual(result, [3, 1])
+        self.assertEqual(
+            await self.cache.zscore(get_birthday_index_key(1), BUILT_MEMBER), 0
+        )
+
+    async def test_read_upcoming_birthday_ids_leap_day(self):
+        async with self.session_maker() as session:
+            result = await read_upcoming_birthday_ids(
+                self.user, date(2023, 3, 1), 1, session, self.cache
+            )
+        self.assertEqual(result, [2])
+
+    async def test_read_upcoming_birthday_ids_built(self):
+        key = get_birthday_index_key(1)
+        await self.cache.zadd(key, {BUILT_MEMBER: 0, "3": 366})
+        async with self.session_maker() as session:
+            result = await read_upcoming_birthday_ids(
+                self.user, date(2023, 12, 31), 2, session, self.cache
+            )
+        self.assertEqual(result, [3])
+
+    async def test_rebuild_all(self):
+        key = get_birthday_index_key(1)
+        await self.cache.zadd(key, {"4": 100})
+        count = await rebuild_all(self.session_maker, self.cache, batch_size=1)
+        self.assertEqual(count, 1)
+        self.assertEqual(
+            await self.cache.zrange(key, 0, -1),
+            [BUILT_MEMBER.encode(), b"1", b"2", b"3"],
+        )
+
+
+if __name__ == "__main__":
+    unittest.main()
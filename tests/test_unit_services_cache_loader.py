@@ -0,0 +1,150 @@
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, patch
+
+import redis.asyncio as redis
+from redis.asyncio.lock import Lock
+
+from src.conf.config import settings
+from src.services.cache_loader import CacheLoader
+
+
+class TestCacheLoader(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.cache = redis.from_url(settings.redis_url, db=15)
+        await self.cache.flushdb()
+        self.loader = CacheLoader(lock_timeout=1, poll_interval=0.01)
+
+    async def asyncTearDown(self):
+        await self.cache.flushdb()
+        await self.cache.close()
+
+    async def test_get_hit(self):
+        await self.cache.set("key", b"cached", ex=60)
+        load = AsyncMock(return_value=b"loaded")
+        result = await self.loader.get("key", load, self.cache, 60)
+        self.assertEqual(result, b"cached")
+        load.assert_not_awaited()
+
+    async def test_get_miss(self):
+        load = AsyncMock(return_value=b"loaded")
+        result = await self.loader.get("key", load, self.cache, 60)
+        self.assertEqual(result, b"loaded")
+        self.assertEqual(await self.cache.get("key"), b"loaded")
+        self.assertGreater(await self.cache.ttl("key"), 0)
+        self.assertFalse(await self.cache.exists("lock: key"))
+        self.assertEqual(self.loader.flights, {})
+
+    async def test_get_missing_value(self):
+        load = AsyncMock(return_value=None)
+        result = await self.loader.get("key", load, self.cache, 60)
+        self.assertIsNone(result)
+        self.assertFalse(await self.cache.exists("key"))
+
+    async def test_get_concurrent_misses(self):
+        async def load():
+            await asyncio.sleep(0.05)
+            return b"loaded"
+
+        load = AsyncMock(side_effect=load)
+        results = await asyncio.gather(
+            *(self.loader.get("key", load, self.cache, 60) for _ in range(10))
+        )
+        self.assertEqual(results, [b"loaded"] * 10)
+        load.assert_awaited_once()
+
+    async def test_get_owner_cancelled(self):
+        started = asyncio.Event()
+
+        async def load_forever():
+            started.set()
+            await asyncio.sleep(60)
+
+        load = AsyncMock(return_value=b"loaded")
+        owner = asyncio.ensure_future(
+            self.loader.get("key", load_forever, self.cache, 60)
+        )
+        await started.wait()
+        waiter = asyncio.ensure_future(self.loader.get("key", load, self.cache, 60))
+        await asyncio.sleep(0.01)
+        owner.cancel()
+        self.assertEqual(await waiter, b"loaded")
+        load.assert_awaited_once()
+        with self.assertRaises(asyncio.CancelledError):
+            await owner
+        self.assertEqual(self.loader.flights, {})
+
+    async def test_get_waiter_cancelled(self):
+        async def load():
+            await asyncio.sleep(0.05)
+            return b"loaded"
+
+        owner = asyncio.ensure_future(self.loader.get("key", load, self.cache, 60))
+        await asyncio.sleep(0.01)
+        waiter = asyncio.ensure_future(self.loader.get("key", load, self.cache, 60))
+        await asyncio.sleep(0.01)
+        waiter.cancel()
+        self.assertEqual(await owner, b"loaded")
+        with self.assertRaises(asyncio.CancelledError):
+            await waiter
+
+    async def test_get_locked_by_another_worker(self):
+        lock = Lock(self.cache, "lock: key", timeout=1)
+        await lock.acquire(blocking=False)
+        load = AsyncMock(return_value=b"loaded")
+
+        async def load_by_another_worker():
+            await asyncio.sleep(0.05)
+            await self.cache.set("key", b"another", ex=60)
+            await lock.release()
+
+        result, _ = await asyncio.gather(
+            self.loader.get("key", load, self.cache, 60), load_by_another_worker()
+        )
+        self.assertEqual(result, b"another")
+        load.assert_not_awaited()
+
+    async def test_get_locked_without_value(self):
+        lock = Lock(self.cache, "lock: key", timeout=1)
+        await lock.acquire(blocking=False)
+        load = AsyncMock(return_value=b"loaded")
+
+        async def fail_in_another_worker():
+            await asyncio.sleep(0.05)
+            await lock.release()
+
+        result, _ = await asyncio.gather(
+            self.loader.get("key", load, self.cache, 60), fail_in_another_worker()
+        )
+        self.assertEqual(result, b"loaded")
+        load.assert_awaited_once()
+
+    async def test_get_expiring(self):
+        await self.cache.set("key", b"cached", ex=60)
+        load = AsyncMock(return_value=b"loaded")
+        with patch.object(self.loader, "is_expiring", return_value=True):
+            result = await self.loader.get("key", load, self.cache, 60)
+        self.assertEqual(result, b"loaded")
+        self.assertEqual(await self.cache.get("key"), b"loaded")
+
+    async def test_get_expiring_locked(self):
+        await self.cache.set("key", b"cached", ex=60)
+        await Lock(self.cache, "lock: key", timeout=1).acquire(blocking=False)
+        load = AsyncMock(return_value=b"loaded")
+        with patch.object(self.loader, "is_expiring", return_value=True):
+            result = await self.loader.get("key", load, self.cache, 60)
+        self.assertEqual(result, b"cached")
+        load.assert_not_awaited()
+
+    def test_is_expiring(self):
+        self.assertFalse(self.loader.is_expiring(-1))
+        self.loader.load_time = 0.1
+        with patch("src.services.cache_loader.random", return_value=0.99):
+            self.assertTrue(self.loader.is_expiring(100))
+            self.assertFalse(self.loader.is_expiring(10000))
+        with patch("src.services.cache_loader.random", return_value=0):
+            self.assertFalse(self.loader.is_expiring(100))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import gzip
+import json
+import unittest
+
+import brotli
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse, PlainTextResponse
+from httpx import AsyncClient
+
+from src.services.compression import (
+    CompressionMiddleware,
+    parse_accept_encoding,
+    select_encoding,
+)
+
+
+app = FastAPI()
+app.add_middleware(CompressionMiddleware, minimum_size=1024, thread_size=4096)
+
+CONTENT = [{"id": i, "first_name": "test"} for i in range(200)]
+
+
+@app.get("/json")
+async def read_json(number: int = 200):
+    return JSONResponse(CONTENT[:number])
+
+
+@app.get("/text")
+async def read_text():
+    return PlainTextResponse("test" * 1000)
+
+
+class TestCompression(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.client = AsyncClient(app=app, base_url="http://test")
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+
+    def test_parse_accept_encoding(self):
+        result = parse_accept_encoding("gzip, br;q=0.5, *;q=0")
+        self.assertEqual(result, {"gzip": 1.0, "br": 0.5, "*": 0.0})
+
+    def test_select_encoding(self):
+        self.assertEqual(select_encoding("gzip, deflate, br"), "br")
+        self.assertEqual(select_encoding("gzip, br;q=0"), "gzip")
+        self.assertEqual(select_encoding("*"), "br")
+        self.assertIsNone(select_encoding("identity"))
+        self.assertIsNone(select_encoding(""))
+
+    async def test_brotli(self):
+        async with self.client.stream(
+            "GET", "/json", headers={"Accept-Encoding": "br"}
+        ) as response:
+            body = b"".join([chunk async for chunk in response.aiter_raw()])
+        self.assertEqual(response.headers["content-encoding"], "br")
+        self.assertEqual(response.headers["vary"], "Accept-Encoding")
+        self.assertEqual(int(response.headers["content-length"]), len(body))
+        self.assertEqual(json.loads(brotli.decompress(body)), CONTENT)
+
+    async def test_gzip(self):
+        async with self.client.stream(
+            "GET", "/json", headers={"Accept-Encoding": "gzip"}
+        ) as response:
+            body = b"".join([chunk async for chunk in response.aiter_raw()])
+        self.assertEqual(response.headers["content-encoding"], "gzip")
+        self.assertEqual(json.loads(gzip.decompress(body)), CONTENT)
+
+    async def test_below_minimum_size(self):
+        response = await self.client.get(
+            "/json?number=1", headers={"Accept-Encoding": "gzip, br"}
+        )
+        self.assertNotIn("content-encoding", response.headers)
+        self.assertEqual(response.json(), CONTENT[:1])
+
+    async def test_not_json(self):
+        response = await self.client.get(
+            "/text", headers={"Accept-Encoding": "gzip, br"}
+        )
+        self.assertNotIn("content-encoding", response.headers)
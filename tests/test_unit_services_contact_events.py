@@ -0,0 +1,80 @@
+import unittest
+
+import redis.asyncio as redis
+
+from src.conf.config import settings
+from src.services.contact_events import (
+    ContactEventsBroker,
+    TooManyStreams,
+    add_contact_events,
+    get_events_key,
+)
+
+
+class TestContactEvents(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.cache = redis.from_url(
+            settings.redis_url, db=15, encoding="utf-8", decode_responses=True
+        )
+        await self.cache.flushdb()
+        self.broker = ContactEventsBroker(
+            redis.from_url(
+                settings.redis_url, db=15, encoding="utf-8", decode_responses=True
+            ),
+            max_streams=2,
+            heartbeat=0.5,
+        )
+
+    async def asyncTearDown(self):
+        await self.broker.close()
+        await self.cache.flushdb()
+        await self.cache.close()
+
+    async def publish(self, event, contact_ids):
+        async with self.cache.pipeline(transaction=True) as pipe:
+            add_contact_events(pipe, 1, event, contact_ids)
+            await pipe.execute()
+
+    async def test_events(self):
+        wake = self.broker.open(1)
+        events = self.broker.events(1, wake)
+        self.assertEqual(await anext(events), ": connected\n\n")
+        await self.publish("created", [5])
+        event = await anext(events)
+        self.assertIn("event: created\n", event)
+        self.assertIn('data: {"id": "5"}\n\n', event)
+        await events.aclose()
+        self.assertEqual(self.broker.count, 0)
+
+    async def test_events_resume(self):
+        await self.publish("created", [5])
+        await self.publish("deleted", [5])
+        [(first_id, _), (second_id, _)] = await self.cache.xrange(get_events_key(1))
+        wake = self.broker.open(1)
+        events = self.broker.events(1, wake, first_id)
+        self.assertEqual(await anext(events), ": connected\n\n")
+        event = await anext(events)
+        self.assertTrue(event.startswith(f"id: {second_id}\nevent: deleted\n"))
+        await events.aclose()
+
+    async def test_heartbeat(self):
+        self.broker.heartbeat = 0.05
+        wake = self.broker.open(1)
+        events = self.broker.events(1, wake)
+        self.assertEqual(await anext(events), ": connected\n\n")
+        self.assertEqual(await anext(events), ": heartbeat\n\n")
+        await events.aclose()
+
+    async def test_max_streams(self):
+        wake = self.broker.open(1)
+        self.broker.open(2)
+        with self.assertRaises(TooManyStreams):
+            self.broker.open(3)
+        self.broker.close_stream(1, wake)
+        self.broker.close_stream(1, wake)
+        self.assertEqual(self.broker.count, 1)
+        self.broker.open(3)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+import asyncio
+import json
+import unittest
+
+from fastapi_mail import ConnectionConfig
+import redis.asyncio as redis
+
+from src.conf.config import settings
+from src.services.email import conf
+from src.services.email_queue import (
+    EMAIL_DEAD_KEY,
+    EMAIL_DELAYED_KEY,
+    EMAIL_PROCESSING_KEY,
+    EMAIL_QUEUE_KEY,
+    EmailQueueWorker,
+    enqueue_email,
+)
+
+
+class SMTPStub:
+    def __init__(self, reject: bool = False, disconnect: bool = False):
+        self.reject = reject
+        self.disconnect = disconnect
+        self.connections = 0
+        self.messages = []
+
+    async def handle(self, reader, writer):
+        self.connections += 1
+        writer.write(b"220 stub ESMTP\r\n")
+        while line := await reader.readline():
+            command = line.decode().strip().upper()
+            if command.startswith(("EHLO", "HELO")):
+                writer.write(b"250 stub\r\n")
+            elif command == "DATA":
+                writer.write(b"354 End data with <CR><LF>.<CR><LF>\r\n")
+                await writer.drain()
+                data = []
+                while (line := await reader.readline()) != b".\r\n":
+                    data.append(line)
+                if self.reject:
+                    writer.write(b"451 Try again later\r\n")
+                else:
+                    self.messages.append(b"".join(data))
+                    writer.write(b"250 OK\r\n")
+                    if self.disconnect:
+                        await writer.drain()
+                        break
+            elif command == "QUIT":
+                writer.write(b"221 Bye\r\n")
+                await writer.drain()
+                break
+            else:
+                writer.write(b"250 OK\r\n")
+            await writer.drain()
+        writer.close()
+
+
+class TestEmailQueue(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.smtp = SMTPStub()
+        self.server = await asyncio.start_server(self.smtp.handle, "127.0.0.1", 0)
+        self.cache = redis.from_url(
+            settings.redis_url, db=15, encoding="utf-8", decode_responses=True
+        )
+        await self.cache.flushdb()
+        self.config = ConnectionConfig(
+            MAIL_SERVER="127.0.0.1",
+            MAIL_PORT=self.server.sockets[0].getsockname()[1],
+            MAIL_USERNAME="",
+            MAIL_PASSWORD="",
+            MAIL_FROM="test@test.com",
+            MAIL_FROM_NAME="test",
+            MAIL_STARTTLS=False,
+            MAIL_SSL_TLS=False,
+            USE_CREDENTIALS=False,
+            VALIDATE_CERTS=False,
+            TEMPLATE_FOLDER=conf.TEMPLATE_FOLDER,
+        )
+        self.worker = EmailQueueWorker(
+            self.config, self.cache, batch_size=10, connections=1, max_attempts=2
+        )
+
+    async def asyncTearDown(self):
+        await self.worker.close()
+        self.server.close()
+        await self.server.wait_closed()
+        await self.cache.flushdb()
+        await self.cache.close()
+
+    async def enqueue(self, number: int):
+        for i in range(number):
+            await enqueue_email(
+                subject="Confirm your email",
+                recipients=[f"test{i}@test.com"],
+                template_name="verification_email.html",
+                template_body={"host": "http://test/", "username": "test", "token": i},
+                cache=self.cache,
+            )
+
+    async def test_send_batch_over_one_connection(self):
+        await self.enqueue(3)
+        result = await self.worker.run_once()
+        self.assertEqual(result, 3)
+        self.assertEqual(len(self.smtp.messages), 3)
+        self.assertEqual(self.smtp.connections, 1)
+        self.assertEqual(await self.cache.llen(EMAIL_QUEUE_KEY), 0)
+        self.assertEqual(await self.cache.llen(EMAIL_PROCESSING_KEY), 0)
+
+    async def test_send_batch_reconnect(self):
+        self.smtp.disconnect = True
+        await self.enqueue(3)
+        result = await asyncio.wait_for(self.worker.run_once(), 5)
+        self.assertEqual(result, 3)
+        self.assertEqual(len(self.smtp.messages), 3)
+        self.assertEqual(self.smtp.connections, 3)
+        self.assertEqual(await self.cache.zcard(EMAIL_DELAYED_KEY), 0)
+        self.assertEqual(await self.cache.llen(EMAIL_PROCESSING_KEY), 0)
+
+    async def test_retry_and_dead_letter(self):
+        self.smtp.reject = True
+        self.worker.backoff_seconds = 0
+        await self.enqueue(1)
+        result = await self.worker.run_once()
+        self.assertEqual(result, 0)
+        delayed = await self.cache.zrange(EMAIL_DELAYED_KEY, 0, -1)
+        self.assertEqual(json.loads(delayed[0])["attempts"], 1)
+        result = await self.worker.run_once()
+        self.assertEqual(result, 0)
+        self.assertEqual(await self.cache.zcard(EMAIL_DELAYED_KEY), 0)
+        dead = await self.cache.lrange(EMAIL_DEAD_KEY, 0, -1)
+        self.assertEqual(json.loads(dead[0])["attempts"], 2)
+        self.assertEqual(await self.cache.llen(EMAIL_PROCESSING_KEY), 0)
+
+    async def test_recover(self):
+        await self.enqueue(2)
+        await self.worker.fetch_batch()
+        self.assertEqual(await self.cache.llen(EMAIL_PROCESSING_KEY), 2)
+        result = await self.worker.recover()
+        self.assertEqual(result, 2)
+        self.assertEqual(await self.cache.llen(EMAIL_QUEUE_KEY), 2)
+        result = await self.worker.run_once()
+        self.assertEqual(result, 2)
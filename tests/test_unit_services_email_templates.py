@@ -0,0 +1,33 @@
+import unittest
+
+from src.services.email import conf
+from src.services.email_templates import EmailTemplates
+
+
+class TestEmailTemplates(unittest.TestCase):
+    def setUp(self):
+        self.templates = EmailTemplates(conf.TEMPLATE_FOLDER)
+        self.template_body = {
+            "host": "http://test/",
+            "username": "test",
+            "token": "token",
+        }
+
+    def test_compile(self):
+        self.templates.compile()
+        self.assertIn("verification_email.html", self.templates.templates)
+        self.assertIn("password_reset_email.html", self.templates.templates)
+
+    def test_render(self):
+        for template_name in ("verification_email.html", "password_reset_email.html"):
+            expected = (
+                conf.template_engine()
+                .get_template(template_name)
+                .render(**self.template_body)
+            )
+            result = self.templates.render(template_name, self.template_body)
+            self.assertEqual(result, expected)
+
+    def test_get_template_is_cached(self):
+        template = self.templates.get_template("verification_email.html")
+        self.assertIs(self.templates.get_template("verification_email.html"), template)
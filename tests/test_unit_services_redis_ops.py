@@ -0,0 +1,48 @@
+import unittest
+
+from src.conf.config import settings
+from src.services.redis_ops import InstrumentedRedis, RedisOps, redis_ops
+
+
+class TestRedisOps(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.cache = InstrumentedRedis.from_url(settings.redis_url, db=15)
+        await self.cache.flushdb()
+        self.ops = RedisOps()
+        self.token = redis_ops.set(self.ops)
+
+    async def asyncTearDown(self):
+        redis_ops.reset(self.token)
+        await self.cache.flushdb()
+        await self.cache.close()
+
+    async def test_count_commands(self):
+        await self.cache.set("key", b"value", ex=60)
+        await self.cache.get("key")
+        self.assertEqual(self.ops.commands, 2)
+        self.assertEqual(self.ops.round_trips, 2)
+
+    async def test_count_pipeline(self):
+        async with self.cache.pipeline(transaction=False) as pipe:
+            pipe.set("key", b"value", ex=60)
+            pipe.hincrby("stats", "hits", 1)
+            pipe.get("key")
+            result = await pipe.execute()
+        self.assertEqual(result[-1], b"value")
+        self.assertEqual(self.ops.commands, 3)
+        self.assertEqual(self.ops.round_trips, 1)
+
+    async def test_count_empty_pipeline(self):
+        async with self.cache.pipeline(transaction=False) as pipe:
+            await pipe.execute()
+        self.assertEqual(self.ops.round_trips, 0)
+
+    async def test_count_outside_request(self):
+        redis_ops.reset(self.token)
+        self.token = redis_ops.set(None)
+        await self.cache.get("key")
+        self.assertEqual(self.ops.commands, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+from unittest.mock import MagicMock
+
+from src.database.models import User
+from src.services.response_cache import (
+    STATS_KEY,
+    get_cache_stats,
+    get_cached_response,
+    make_response_cache_key,
+    set_cached_response,
+)
+
+
+class MockRedis:
+    async def get(*args):
+        pass
+
+    async def set(*args, **kwargs):
+        pass
+
+    async def hincrby(*args):
+        pass
+
+    async def hgetall(*args):
+        pass
+
+
+class TestResponseCache(unittest.IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.user = User(id=1)
+        self.cache = MagicMock(spec=MockRedis)
+
+    def test_make_response_cache_key(self):
+        key = make_response_cache_key(
+            "contacts", self.user, 5, {"limit": 10, "offset": 0, "email": None}
+        )
+        self.assertTrue(key.startswith("contacts: 1: 5: "))
+        self.assertEqual(
+            key,
+            make_response_cache_key(
+                "contacts", self.user, 5, {"offset": 0, "limit": 10}
+            ),
+        )
+        self.assertNotEqual(
+            key,
+            make_response_cache_key(
+                "contacts", self.user, 6, {"offset": 0, "limit": 10}
+            ),
+        )
+
+    async def test_get_cached_response_hit(self):
+        self.cache.get.return_value = b"[]"
+        result = await get_cached_response("key", self.cache)
+        self.assertEqual(result, b"[]")
+        self.cache.hincrby.assert_awaited_once_with(STATS_KEY, "hits", 1)
+
+    async def test_get_cached_response_miss(self):
+        self.cache.get.return_value = None
+        result = await get_cached_response("key", self.cache)
+        self.assertIsNone(result)
+        self.cache.hincrby.assert_awaited_once_with(STATS_KEY, "misses", 1)
+
+    async def test_get_cached_response_buffered_count(self):
+        writes = MagicMock(spec=MockRedis)
+        self.cache.get.return_value = b"[]"
+        result = await get_cached_response("key", self.cache, writes)
+        self.assertEqual(result, b"[]")
+        self.cache.hincrby.assert_not_called()
+        writes.hincrby.assert_awaited_once_with(STATS_KEY, "hits", 1)
+
+    async def test_set_cached_response(self):
+        await set_cached_response("key", b"[]", self.cache)
+        self.cache.set.assert_awaited_once()
+
+    async def test_get_cache_stats(self):
+        self.cache.hgetall.return_value = {b"hits": b"3", b"misses": b"1"}
+        result = await get_cache_stats(self.cache)
+        self.assertEqual(
+            result, {"hits": 3, "misses": 1, "hit_ratio": 0.75, "miss_ratio": 0.25}
+        )
+
+    async def test_get_cache_stats_empty(self):
+        self.cache.hgetall.return_value = {}
+        result = await get_cache_stats(self.cache)
+        self.assertEqual(result["hit_ratio"], 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
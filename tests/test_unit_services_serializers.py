@@ -0,0 +1,44 @@
+from datetime import date, datetime
+import json
+from typing import List
+import unittest
+
+from fastapi.encoders import jsonable_encoder
+from pydantic import TypeAdapter
+
+from src.schemas.contacts import ContactResponse
+from src.services.serializers import serialize_contacts
+
+
+class TestSerializers(unittest.TestCase):
+    def setUp(self):
+        self.contacts = [
+            {
+                "id": i,
+                "first_name": "test",
+                "last_name": "тест",
+                "email": "test@test.com",
+                "phone": "1234567890",
+                "birthday": date(2000, 2, 29),
+                "address": "test",
+                "created_at": datetime(2023, 12, 7, 3, 39, 45, 486732),
+                "updated_at": datetime(2023, 12, 7, 3, 39, 45),
+                "user_id": 1,
+            }
+            for i in range(3)
+        ]
+
+    def test_serialize_contacts(self):
+        expected = jsonable_encoder(
+            TypeAdapter(List[ContactResponse]).validate_python(self.contacts)
+        )
+        result = serialize_contacts(self.contacts)
+        self.assertEqual(json.loads(result), expected)
+
+    def test_serialize_contacts_fields(self):
+        fields = ("id", "first_name")
+        contacts = [
+            {name: contact[name] for name in fields} for contact in self.contacts
+        ]
+        result = serialize_contacts(contacts, fields)
+        self.assertEqual(json.loads(result), contacts)
@@ -0,0 +1,89 @@
+import gzip
+import tempfile
+import unittest
+from unittest.mock import patch
+from pathlib import Path
+
+from httpx import AsyncClient
+
+from src.conf.config import settings
+from src.services.static_files import PrecompressedStaticFiles
+
+
+class TestPrecompressedStaticFiles(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        path = Path(self.directory.name)
+        self.content = b"body { color: red; }" * 100
+        (path / "style.css").write_bytes(self.content)
+        (path / "style.css.gz").write_bytes(gzip.compress(self.content))
+        (path / "style.0123abcd.css").write_bytes(self.content)
+        (path / "avatars").mkdir()
+        (path / "avatars" / "avatar.png").write_bytes(b"avatar")
+        self.path = path
+        self.static_files = PrecompressedStaticFiles(
+            directory=path, exclude=("avatars",)
+        )
+        self.client = AsyncClient(app=self.static_files, base_url="http://test")
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+        self.directory.cleanup()
+
+    async def test_precompressed_variant(self):
+        response = await self.client.get(
+            "/style.css", headers={"Accept-Encoding": "gzip, br"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.headers["content-encoding"], "gzip")
+        self.assertTrue(response.headers["content-type"].startswith("text/css"))
+        self.assertEqual(
+            response.headers["cache-control"],
+            f"public, max-age={settings.static_files_max_age}",
+        )
+        self.assertEqual(response.content, self.content)
+
+    async def test_fingerprinted(self):
+        response = await self.client.get("/style.0123abcd.css")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.headers["cache-control"], "public, max-age=31536000, immutable"
+        )
+
+    async def test_identity(self):
+        response = await self.client.get(
+            "/style.css", headers={"Accept-Encoding": "identity"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn("content-encoding", response.headers)
+        self.assertEqual(response.content, self.content)
+
+    async def test_not_modified(self):
+        response = await self.client.get(
+            "/style.css", headers={"Accept-Encoding": "gzip"}
+        )
+        etag = response.headers["etag"]
+        self.assertFalse(etag.startswith("W/"))
+        response = await self.client.get(
+            "/style.css", headers={"Accept-Encoding": "gzip", "If-None-Match": etag}
+        )
+        self.assertEqual(response.status_code, 304)
+        response = await self.client.get(
+            "/style.css", headers={"Accept-Encoding": "identity", "If-None-Match": etag}
+        )
+        self.assertEqual(response.status_code, 200)
+
+    async def test_etags_hashed_at_mount(self):
+        self.assertEqual(len(self.static_files.etags), 3)
+        with patch.object(PrecompressedStaticFiles, "hash_file") as hash_file:
+            response = await self.client.get(
+                "/style.css", headers={"Accept-Encoding": "identity"}
+            )
+            etag = response.headers["etag"]
+            (self.path / "style.css").write_bytes(b"changed")
+            response = await self.client.get(
+                "/style.css", headers={"Accept-Encoding": "identity"}
+            )
+        hash_file.assert_not_called()
+        self.assertEqual(response.content, b"changed")
+        self.assertNotEqual(response.headers["etag"], etag)
@@ -0,0 +1,37 @@
+from base64 import urlsafe_b64encode
+from datetime import datetime
+import unittest
+from uuid import uuid4
+
+from src.utils.cursors import decode_cursor, encode_cursor
+
+
+def encode(data: bytes) -> str:
+    return urlsafe_b64encode(data).decode()
+
+
+class TestCursors(unittest.TestCase):
+    def test_encode_decode_cursor(self):
+        positions = {
+            "contacts": (datetime(2023, 12, 7, 3, 39, 45, 486732), 1),
+            "deleted": (datetime(2023, 12, 8), uuid4()),
+            "other": None,
+        }
+        self.assertEqual(decode_cursor(encode_cursor(positions)), positions)
+
+    def test_decode_invalid_cursor(self):
+        for cursor in (
+            "invalid",
+            "W10=",
+            "eyJhIjpbMV19",
+            encode(b'{"contacts":{"a":1}}'),
+            encode(b'{"contacts":["2023-12-07T03:39:45",1,2]}'),
+            encode(b'{"contacts":["2023-12-07T03:39:45",true]}'),
+            encode(b'{"contacts":[1,1]}'),
+        ):
+            with self.assertRaises(ValueError):
+                decode_cursor(cursor)
+
+
+if __name__ == "__main__":
+    unittest.main()
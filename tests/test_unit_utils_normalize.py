@@ -0,0 +1,21 @@
+import unittest
+
+from src.utils.normalize import normalize_email, normalize_phone
+
+
+class TestNormalize(unittest.TestCase):
+    def test_normalize_email(self):
+        self.assertEqual(normalize_email(" Test@Test.COM "), "test@test.com")
+        self.assertIsNone(normalize_email(None))
+
+    def test_normalize_phone(self):
+        self.assertEqual(normalize_phone("+38 (050) 123-45-67"), "380501234567")
+        self.assertEqual(normalize_phone("0038 050 123 45 67"), "380501234567")
+        self.assertEqual(normalize_phone("050.123.45.67"), "0501234567")
+        self.assertIsNone(normalize_phone(None))
+        self.assertIsNone(normalize_phone("n/a"))
+        self.assertIsNone(normalize_phone("00"))
+
+
+if __name__ == "__main__":
+    unittest.main()